@@ -0,0 +1,16 @@
+from codespace.tokens import CodeSpaceAccessToken
+
+
+class CodeSpaceAccessTokenConverter:
+    """
+    Path converter matching codespace access tokens. Tokens have
+    fixed length, so they are matched without backtracking
+    """
+
+    regex = f"[a-zA-Z0-9_-]{{{CodeSpaceAccessToken.token_length}}}"
+
+    def to_python(self, value: str) -> str:
+        return value
+
+    def to_url(self, value: str) -> str:
+        return value
@@ -1,6 +1,7 @@
 from rest_framework import permissions
 from datetime import datetime
-from codespace.tokens import codespace_access_token_generator
+from codespace.tokens import codespace_access_token_generator, decrypted_token_cache
+from codespace.revocation import codespace_access_revocations
 from django.http import HttpRequest
 from django.views import View
 
@@ -28,12 +29,18 @@ class IsCodeSpaceOwner(IsObjectOwner):
 
     object_owner_field = "created_by"
 
+    def has_object_permission(
+        self, request: HttpRequest, view: View, obj: object
+    ) -> bool:
+        # compare ids, so owner isn't loaded from database
+        return str(obj.created_by_id) == str(request.user.pk)
+
 
 class IsCodeSpaceAccessTokenValid(permissions.BasePermission):
     """
-    Permission used to check if codespace access token is valid and not expired.
-    Token can be send as url parameter or post data. If token is valid view kwargs
-    will be updated with codespace_uuid and mode
+    Permission used to check if codespace access token is valid, not expired
+    and not revoked. Token can be send as url parameter or post data. If token
+    is valid view kwargs will be updated with codespace_uuid and mode
     """
 
     message = "Codespace access token is not valid or expired"
@@ -42,15 +49,15 @@ class IsCodeSpaceAccessTokenValid(permissions.BasePermission):
         token = view.kwargs.get("token", "") or request.data.get("token", "")
 
         try:
-            (
-                codespace_uuid,
-                expire_ts,
-                mode,
-            ) = codespace_access_token_generator.decrypt_token(token)
+            codespace_uuid, expire_ts, mode = self.get_token_data(token)
         except Exception:
             return False
 
-        if datetime.now() > datetime.fromtimestamp(int(expire_ts)):
+        if datetime.now() > datetime.fromtimestamp(expire_ts):
+            return False
+
+        # checked on every request (also for cached tokens)
+        if codespace_access_revocations.is_revoked(token, codespace_uuid):
             return False
 
         # update view kwargs with decrypted token data
@@ -65,3 +72,24 @@ class IsCodeSpaceAccessTokenValid(permissions.BasePermission):
             }
         )
         return True
+
+    def get_token_data(self, token: str) -> tuple[str, int, str]:
+        """
+        Return decrypted token data (uuid, expire_ts, mode). Valid tokens
+        are cached until they expire, so they are decrypted only once
+        """
+
+        if (data := decrypted_token_cache.get(token)) is not None:
+            return data
+
+        (
+            codespace_uuid,
+            expire_ts,
+            mode,
+        ) = codespace_access_token_generator.decrypt_token(token)
+        data = (codespace_uuid, int(expire_ts), mode)
+
+        if datetime.now() <= datetime.fromtimestamp(data[1]):
+            decrypted_token_cache.set(token, data)
+
+        return data
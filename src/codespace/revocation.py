@@ -0,0 +1,179 @@
+from django.conf import settings
+from codespace.tokens import CodeSpaceAccessToken
+from src import REDIS
+from typing import Union
+import redis
+import hashlib
+import logging
+import math
+import threading
+import time
+
+
+class BloomFilter:
+    """
+    Probabilistic set that can return false positives but never
+    false negatives, used to check membership without network call
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.__bits = bytearray(math.ceil(self.size / 8))
+
+    def add(self, item: str) -> None:
+        for position in self.__get_positions(item):
+            self.__bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.__bits[position >> 3] & (1 << (position & 7))
+            for position in self.__get_positions(item)
+        )
+
+    def __get_positions(self, item: str) -> list[int]:
+        """Return bit positions of item (double hashing)"""
+
+        digest = hashlib.blake2b(item.encode("utf8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big")
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+
+class CodeSpaceAccessRevocations:
+    """
+    Class used to revoke codespace access tokens. Revocations are stored
+    in redis (single tokens until they expire, whole codespaces until
+    sharing is restored). Each process keeps bloom filter of revoked keys
+    updated through redis pub/sub, so checking tokens that aren't revoked
+    doesn't need redis call
+    """
+
+    token_key_prefix = "revoked_access_token:"
+    codespace_key_prefix = "revoked_codespace_access:"
+    channel = "codespace_access_revocations"
+    # published when revocation is removed (bloom filter can't remove
+    # items, so it is rebuilt by every process)
+    rebuild_message = "rebuild"
+
+    def __init__(self) -> None:
+        self.__bloom = None
+        self.__listener = None
+        self.__lock = threading.Lock()
+
+    def get_token_key(self, token: str) -> str:
+        """Return redis key of revoked token"""
+
+        token_id = CodeSpaceAccessToken.get_token_id(token)
+        return f"{self.token_key_prefix}{token_id}"
+
+    def get_codespace_key(self, codespace_uuid: str) -> str:
+        """Return redis key of codespace with revoked access"""
+
+        return f"{self.codespace_key_prefix}{codespace_uuid}"
+
+    def revoke_token(self, token: str, expire_ts: int) -> None:
+        """Revoke single token until it expires"""
+
+        key = self.get_token_key(token)
+        REDIS.set(key, 1, exat=expire_ts)
+        REDIS.publish(self.channel, key)
+
+    def revoke_codespace(self, codespace_uuid: str) -> None:
+        """Revoke all tokens of codespace until access is restored"""
+
+        key = self.get_codespace_key(codespace_uuid)
+        REDIS.set(key, 1)
+        REDIS.publish(self.channel, key)
+
+    def restore_codespace(self, codespace_uuid: str) -> None:
+        """Restore access to codespace with not revoked tokens"""
+
+        REDIS.delete(self.get_codespace_key(codespace_uuid))
+        REDIS.publish(self.channel, self.rebuild_message)
+
+    def is_revoked(self, token: str, codespace_uuid: str) -> bool:
+        """
+        Check if token or codespace access was revoked. Redis is queried
+        only if bloom filter contains one of keys
+        """
+
+        keys = [self.get_token_key(token), self.get_codespace_key(codespace_uuid)]
+
+        if (bloom := self.__get_bloom()) is not None:
+            if not (keys := [key for key in keys if key in bloom]):
+                return False
+
+        return bool(REDIS.exists(*keys))
+
+    def rebuild(self) -> None:
+        """Build bloom filter from revocations stored in redis"""
+
+        bloom = BloomFilter(
+            capacity=settings.CODESPACE_REVOCATION_BLOOM_CAPACITY,
+            error_rate=settings.CODESPACE_REVOCATION_BLOOM_ERROR_RATE,
+        )
+        for prefix in (self.token_key_prefix, self.codespace_key_prefix):
+            for key in REDIS.scan_iter(match=f"{prefix}*", count=1000):
+                bloom.add(key)
+
+        self.__bloom = bloom
+
+    def __get_bloom(self) -> Union[BloomFilter, None]:
+        """
+        Return bloom filter (None until it is built). Listener is
+        started lazily, so it runs in every worker process after fork
+        """
+
+        if self.__listener is None and settings.CODESPACE_REVOCATION_BLOOM_ENABLED:
+            with self.__lock:
+                if self.__listener is None:
+                    self.__listener = threading.Thread(
+                        target=self.__listen, name="revocations-listener", daemon=True
+                    )
+                    self.__listener.start()
+
+        return self.__bloom
+
+    def __listen(self) -> None:
+        """
+        Add published revocations to bloom filter. Filter is rebuilt after
+        subscription, so no revocation is missed, when revocation is
+        removed and periodically to drop expired revocations. On error
+        listener stops and is started again by next check
+        """
+
+        pubsub = None
+        try:
+            pubsub = REDIS.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+            self.rebuild()
+            rebuilt_at = time.monotonic()
+
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message["data"] != self.rebuild_message:
+                    self.__bloom.add(message["data"])
+                elif message or (
+                    time.monotonic() - rebuilt_at
+                    > settings.CODESPACE_REVOCATION_BLOOM_REBUILD_INTERVAL
+                ):
+                    self.rebuild()
+                    rebuilt_at = time.monotonic()
+        except Exception as e:
+            # check revocations in redis until listener is started again
+            self.__bloom = None
+            logging.error(f"Revocations listener error: {e}")
+            # don't resubscribe on every check while redis is unavailable
+            time.sleep(1)
+        finally:
+            self.__bloom = None
+            self.__listener = None
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except redis.RedisError:
+                    pass
+
+
+codespace_access_revocations = CodeSpaceAccessRevocations()
@@ -1,5 +1,6 @@
-from rest_framework import serializers
-from core.models import CodeSpace, TmpCodeSpace
+from rest_framework import serializers, exceptions
+from django.conf import settings
+from core.models import CodeSpace, TmpCodeSpace, CodeRevision
 from codespace.tokens import codespace_access_token_generator
 from collections import OrderedDict
 from typing import Union
@@ -17,6 +18,9 @@ class CodeSpaceSerializer(serializers.ModelSerializer):
             "uuid",
             "name",
             "code",
+            "code_lines",
+            "code_size",
+            "code_preview",
             "created_by",
             "created_at",
             "updated_at",
@@ -24,6 +28,9 @@ class CodeSpaceSerializer(serializers.ModelSerializer):
         read_only_fields = (
             "uuid",
             "code",  # code should be updated only through websockets
+            "code_lines",
+            "code_size",
+            "code_preview",
             "created_by",
             "created_at",
             "updated_at",
@@ -97,6 +104,40 @@ class CodeSpaceTokenSerializer(CodeSpaceSerializer):
         return self.context["view"].kwargs.get("mode")
 
 
+class CodeRevisionSerializer(serializers.ModelSerializer):
+    """Serialize CodeRevision Model (without code)"""
+
+    class Meta:
+        model = CodeRevision
+        fields = (
+            "number",
+            "created_at",
+        )
+        read_only_fields = fields
+
+
+class CodeRevisionDetailSerializer(CodeRevisionSerializer):
+    """
+    Serialize CodeRevision Model with code reconstructed
+    from revision history
+    """
+
+    code = serializers.SerializerMethodField()
+
+    class Meta(CodeRevisionSerializer.Meta):
+        fields = (
+            "number",
+            "created_at",
+            "code",
+        )
+        read_only_fields = fields
+
+    def get_code(self, obj: CodeRevision) -> str:
+        """Return code of revision"""
+
+        return CodeRevision.objects.get_code(obj.codespace_id, obj.number)
+
+
 class TmpCodeSpaceSerializer(serializers.Serializer):
     """
     Temporary codespace is used to store only code without
@@ -123,17 +164,28 @@ class TmpCodeSpaceSerializer(serializers.Serializer):
         return data
 
 
-class TokenAccessCodeSpaceSerializer(serializers.Serializer):
+class CodeSpaceAccessSerializer(serializers.Serializer):
     """
-    Serializer for codespace access token
+    Serializer for codespace access token data
     """
 
-    token_generator = codespace_access_token_generator
     # fields
     codespace_uuid = serializers.UUIDField(required=True)
-    expire_time = serializers.IntegerField(required=True)
+    expire_time = serializers.IntegerField(
+        required=True,
+        min_value=1,
+        max_value=settings.CODESPACE_ACCESS_TOKEN_MAX_EXPIRE_TIME,
+    )
     mode = serializers.ChoiceField(required=True, choices=["edit", "view_only"])
 
+
+class TokenAccessCodeSpaceSerializer(CodeSpaceAccessSerializer):
+    """
+    Serializer for codespace access token
+    """
+
+    token_generator = codespace_access_token_generator
+
     @classmethod
     def get_token(cls, codespace_uuid: str, expire_time: int, mode: str) -> str:
         """
@@ -154,3 +206,82 @@ class TokenAccessCodeSpaceSerializer(serializers.Serializer):
         data = {"token": token}
 
         return data
+
+
+class BatchTokenAccessCodeSpaceSerializer(serializers.Serializer):
+    """
+    Serializer for list of codespace access tokens
+    """
+
+    token_generator = codespace_access_token_generator
+    # fields
+    tokens = CodeSpaceAccessSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.CODESPACE_ACCESS_TOKEN_BATCH_MAX_SIZE,
+    )
+
+    def validate_tokens(self, value: list) -> list:
+        """
+        Check if all codespaces exist and request.user is their owner
+        (using single query)
+        """
+
+        uuids = {entry["codespace_uuid"] for entry in value}
+        owners = dict(
+            CodeSpace.objects.filter(uuid__in=uuids).values_list("uuid", "created_by")
+        )
+
+        if len(owners) != len(uuids):
+            raise exceptions.NotFound(detail="CodeSpace does not exists")
+
+        if any(owner != self.context["request"].user.pk for owner in owners.values()):
+            raise exceptions.PermissionDenied()
+
+        return value
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Validate given data and if it is valid, add generated token
+        to each entry
+        """
+
+        data = super().validate(attrs)
+        tokens = self.token_generator.make_tokens(
+            [
+                (entry["codespace_uuid"], entry["expire_time"], entry["mode"])
+                for entry in data["tokens"]
+            ]
+        )
+        for entry, token in zip(data["tokens"], tokens):
+            entry["token"] = token
+
+        return data
+
+
+class RevokeTokenAccessCodeSpaceSerializer(serializers.Serializer):
+    """
+    Serializer used to validate codespace access token that will be revoked
+    """
+
+    token_generator = codespace_access_token_generator
+    # fields
+    token = serializers.CharField(required=True)
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Validate token and add codespace uuid and expire timestamp
+        decrypted from it
+        """
+
+        data = super().validate(attrs)
+
+        try:
+            codespace_uuid, expire_ts, _ = self.token_generator.decrypt_token(
+                data["token"]
+            )
+        except Exception:
+            raise serializers.ValidationError({"token": "Token is not valid"})
+
+        data.update({"codespace_uuid": codespace_uuid, "expire_ts": int(expire_ts)})
+        return data
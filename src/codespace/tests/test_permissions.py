@@ -1,6 +1,7 @@
 from django.test import SimpleTestCase, RequestFactory
 from unittest.mock import patch, MagicMock
 from codespace.permissions import IsObjectOwner, IsCodeSpaceAccessTokenValid
+from codespace.tokens import decrypted_token_cache
 import datetime
 
 
@@ -37,6 +38,7 @@ class TestIsCodeSpaceAccessTokenValid(SimpleTestCase):
         self.permission = IsCodeSpaceAccessTokenValid()
         self.request = RequestFactory().get(path="/some_path/")
         self.view = MagicMock()
+        decrypted_token_cache.clear()
 
     def create_timestamp(self, hours: int = 0):
         """Helper function to crate timestamp"""
@@ -74,3 +76,33 @@ class TestIsCodeSpaceAccessTokenValid(SimpleTestCase):
         self.assertTrue(self.permission.has_permission(self.request, self.view))
         self.assertEqual(self.view.kwargs.get("uuid"), "codespace_uuid")
         self.assertEqual(self.view.kwargs.get("mode"), "edit")
+
+    @patch("codespace.permissions.codespace_access_token_generator.decrypt_token")
+    def test_valid_token_is_decrypted_once(self, patched_decrypt_token):
+        """Repeated checks of valid token should use cache"""
+
+        patched_decrypt_token.return_value = (
+            "codespace_uuid",
+            self.create_timestamp(hours=1),
+            "edit",
+        )
+        self.view.kwargs = {"token": "token"}
+        self.assertTrue(self.permission.has_permission(self.request, self.view))
+        self.view.kwargs = {"token": "token"}
+        self.assertTrue(self.permission.has_permission(self.request, self.view))
+        self.assertEqual(patched_decrypt_token.call_count, 1)
+
+    @patch("codespace.permissions.codespace_access_revocations.is_revoked")
+    @patch("codespace.permissions.codespace_access_token_generator.decrypt_token")
+    def test_with_revoked_token(self, patched_decrypt_token, patched_is_revoked):
+        """Permission should return False"""
+
+        patched_decrypt_token.return_value = (
+            "codespace_uuid",
+            self.create_timestamp(hours=1),
+            "edit",
+        )
+        patched_is_revoked.return_value = True
+        self.view.kwargs = {"token": "token"}
+        self.assertFalse(self.permission.has_permission(self.request, self.view))
+        patched_is_revoked.assert_called_once_with("token", "codespace_uuid")
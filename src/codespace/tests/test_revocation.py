@@ -0,0 +1,106 @@
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import MagicMock, patch
+from codespace.revocation import BloomFilter, CodeSpaceAccessRevocations
+from src import REDIS
+import threading
+import time
+
+
+class TestBloomFilter(SimpleTestCase):
+    """Test BloomFilter Class"""
+
+    def test_added_items_are_contained(self):
+        bloom = BloomFilter(capacity=100, error_rate=0.01)
+        items = [f"item_{i}" for i in range(100)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_error_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"item_{i}")
+
+        false_positives = sum(f"other_{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(CODESPACE_REVOCATION_BLOOM_ENABLED=False)
+class TestCodeSpaceAccessRevocations(SimpleTestCase):
+    """Test CodeSpaceAccessRevocations Class"""
+
+    def setUp(self):
+        self.revocations = CodeSpaceAccessRevocations()
+        self.token = "token"
+        self.codespace_uuid = "codespace_uuid"
+
+    def tearDown(self):
+        REDIS.delete(
+            self.revocations.get_token_key(self.token),
+            self.revocations.get_codespace_key(self.codespace_uuid),
+        )
+
+    def test_revoke_token(self):
+        self.assertFalse(self.revocations.is_revoked(self.token, self.codespace_uuid))
+        self.revocations.revoke_token(self.token, int(time.time()) + 60)
+        self.assertTrue(self.revocations.is_revoked(self.token, self.codespace_uuid))
+        self.assertFalse(self.revocations.is_revoked("other", self.codespace_uuid))
+
+    def test_revoked_token_variants_are_revoked(self):
+        # "AAE=", "AAE" and "AAF" decode to the same token bytes
+        self.token = "AAE="
+        self.revocations.revoke_token(self.token, int(time.time()) + 60)
+        for variant in ("AAE", "AAF"):
+            self.assertTrue(self.revocations.is_revoked(variant, self.codespace_uuid))
+
+    def test_revoke_and_restore_codespace(self):
+        self.revocations.revoke_codespace(self.codespace_uuid)
+        self.assertTrue(self.revocations.is_revoked(self.token, self.codespace_uuid))
+        self.assertTrue(self.revocations.is_revoked("other", self.codespace_uuid))
+
+        self.revocations.restore_codespace(self.codespace_uuid)
+        self.assertFalse(self.revocations.is_revoked(self.token, self.codespace_uuid))
+
+    def test_restore_codespace_is_published(self):
+        with patch("codespace.revocation.REDIS.publish") as patched_publish:
+            self.revocations.restore_codespace(self.codespace_uuid)
+
+        patched_publish.assert_called_once_with(
+            self.revocations.channel, self.revocations.rebuild_message
+        )
+
+    @override_settings(CODESPACE_REVOCATION_BLOOM_ENABLED=True)
+    @patch("codespace.revocation.time.sleep")
+    @patch("codespace.revocation.REDIS.pubsub")
+    def test_listener_restarted_after_error(self, patched_pubsub, patched_sleep):
+        # restore message rebuilds filter, then message can't be handled
+        patched_pubsub.return_value.get_message.side_effect = [
+            {"data": self.revocations.rebuild_message},
+            {"data": MagicMock(encode=MagicMock(side_effect=ValueError))},
+        ]
+
+        with patch.object(
+            self.revocations, "rebuild", wraps=self.revocations.rebuild
+        ) as patched_rebuild, self.assertLogs(level="ERROR"):
+            self.revocations.is_revoked(self.token, self.codespace_uuid)
+            for _ in range(500):
+                if self.revocations._CodeSpaceAccessRevocations__listener is None:
+                    break
+                threading.Event().wait(0.01)
+
+        self.assertEqual(patched_rebuild.call_count, 2)
+        # filter is dropped and listener is started again by next check
+        self.assertIsNone(self.revocations._CodeSpaceAccessRevocations__bloom)
+        self.assertIsNone(self.revocations._CodeSpaceAccessRevocations__listener)
+        patched_pubsub.return_value.close.assert_called_once()
+
+    def test_not_revoked_token_is_checked_without_redis(self):
+        self.revocations.revoke_token(self.token, int(time.time()) + 60)
+        self.revocations.rebuild()
+
+        with patch("codespace.revocation.REDIS.exists") as patched_exists:
+            self.assertFalse(self.revocations.is_revoked("other", "other_uuid"))
+            patched_exists.assert_not_called()
+
+        self.assertTrue(self.revocations.is_revoked(self.token, self.codespace_uuid))
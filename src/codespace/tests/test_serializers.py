@@ -144,6 +144,22 @@ class TestTokenAccessCodeSpaceSerializer(SimpleTestCase):
         with self.assertRaises(serializers.ValidationError):
             serializer.is_valid(raise_exception=True)
 
+    @patch("codespace.serializers.codespace_access_token_generator.make_token")
+    def test_get_token_with_invalid_expire_time(self, patched_make_token):
+        """Test if validation error will be raised"""
+
+        for expire_time in (0, -120, 2**32):
+            serializer = self.serializer(
+                data={
+                    "codespace_uuid": self.codespace_uuid,
+                    "expire_time": expire_time,
+                    "mode": "edit",
+                }
+            )
+            with self.assertRaises(serializers.ValidationError):
+                serializer.is_valid(raise_exception=True)
+        patched_make_token.assert_not_called()
+
     @patch(
         "codespace.serializers.codespace_access_token_generator.make_token",
         return_value="token",
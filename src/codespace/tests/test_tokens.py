@@ -1,5 +1,15 @@
-from django.test import SimpleTestCase
-from codespace.tokens import codespace_access_token_generator
+from django.test import SimpleTestCase, override_settings
+from django.conf import settings
+from codespace.tokens import (
+    codespace_access_token_generator,
+    get_cipher,
+    DecryptedTokenCache,
+)
+import time
+from cryptography.exceptions import InvalidTag
+import base64
+import uuid as uuid_lib
+import secrets
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
@@ -9,9 +19,9 @@ class TestCodeSpaceAccessToken(SimpleTestCase):
 
     def setUp(self):
         self.cur_datetime = datetime.now()
-        self.uuid = "test_uuid"
+        self.uuid = str(uuid_lib.uuid4())
         self.expire_time = 120
-        self.mode = "view_onlye"
+        self.mode = "view_only"
         self.token_generator = codespace_access_token_generator
 
     def create_timestamp(self, seconds: int = 0):
@@ -31,3 +41,108 @@ class TestCodeSpaceAccessToken(SimpleTestCase):
             int(self.create_timestamp(self.expire_time)),
         )
         self.assertEqual(mode, self.mode)
+
+    def test_token_is_compact(self):
+        token = self.token_generator.make_token(self.uuid, self.expire_time, self.mode)
+        self.assertEqual(len(token), self.token_generator.token_length)
+
+    def test_decrypt_string_payload_token(self):
+        """Token with "uuid:timestamp:mode" payload should be decrypted"""
+
+        nonce = secrets.token_bytes(12)
+        key_id = settings.CODESPACE_ACCESS_TOKEN_ACTIVE_KEY_ID
+        token = base64.urlsafe_b64encode(
+            bytes([key_id])
+            + nonce
+            + get_cipher(settings.CODESPACE_ACCESS_TOKEN_KEYS[key_id]).encrypt(
+                nonce, f"{self.uuid}:1:{self.mode}".encode(), b""
+            )
+        ).decode()
+        self.assertEqual(
+            self.token_generator.decrypt_token(token), [self.uuid, "1", self.mode]
+        )
+
+    def test_cipher_is_cached(self):
+        self.assertIs(get_cipher("secret"), get_cipher("secret"))
+
+    def test_decrypt_token_after_key_rotation(self):
+        """Token created with old key should be valid until key is removed"""
+
+        with override_settings(
+            CODESPACE_ACCESS_TOKEN_KEYS={1: "old"},
+            CODESPACE_ACCESS_TOKEN_ACTIVE_KEY_ID=1,
+        ):
+            token = self.token_generator.make_token(self.uuid, 120, self.mode)
+
+        with override_settings(
+            CODESPACE_ACCESS_TOKEN_KEYS={1: "old", 2: "new"},
+            CODESPACE_ACCESS_TOKEN_ACTIVE_KEY_ID=2,
+        ):
+            uuid, _, mode = self.token_generator.decrypt_token(token)
+            self.assertEqual(uuid, self.uuid)
+            new_token = self.token_generator.make_token(self.uuid, 120, self.mode)
+            self.assertEqual(base64.urlsafe_b64decode(new_token)[0], 2)
+
+        with override_settings(
+            CODESPACE_ACCESS_TOKEN_KEYS={2: "new"},
+            CODESPACE_ACCESS_TOKEN_ACTIVE_KEY_ID=2,
+            CODESPACE_ACCESS_TOKEN_ACCEPT_LEGACY=False,
+        ):
+            with self.assertRaises(InvalidTag):
+                self.token_generator.decrypt_token(token)
+
+    def test_decrypt_legacy_token(self):
+        """Token without key id should be decrypted with SECRET_KEY"""
+
+        nonce = secrets.token_bytes(12)
+        token = base64.urlsafe_b64encode(
+            nonce
+            + get_cipher(settings.SECRET_KEY).encrypt(
+                nonce, f"{self.uuid}:1:{self.mode}".encode(), b""
+            )
+        ).decode()
+        self.assertEqual(
+            self.token_generator.decrypt_token(token), [self.uuid, "1", self.mode]
+        )
+
+
+class TestDecryptedTokenCache(SimpleTestCase):
+    """Test DecryptedTokenCache Class"""
+
+    def setUp(self):
+        self.cache = DecryptedTokenCache(maxsize=2)
+        self.data = ("uuid", int(time.time()) + 60, "edit")
+
+    def test_get_cached_token(self):
+        self.cache.set("token", self.data)
+        self.assertEqual(self.cache.get("token"), self.data)
+        self.assertIsNone(self.cache.get("other_token"))
+        self.assertEqual(self.cache.get_stats(), {"hits": 1, "misses": 1, "size": 1})
+
+    def test_token_variants_share_entry(self):
+        # "AAE=", "AAE" and "AAF" decode to the same token bytes
+        self.cache.set("AAE=", self.data)
+        self.assertEqual(self.cache.get("AAF"), self.data)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_expired_token_is_evicted(self):
+        self.cache.set("token", ("uuid", int(time.time()) - 1, "edit"))
+        self.assertIsNone(self.cache.get("token"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_token_is_evicted(self):
+        self.cache.set("first", self.data)
+        self.cache.set("second", self.data)
+        self.cache.get("first")
+        self.cache.set("third", self.data)
+        self.assertIsNone(self.cache.get("second"))
+        self.assertEqual(self.cache.get("first"), self.data)
+
+    def test_stats_are_logged(self):
+        cache = DecryptedTokenCache(maxsize=2, log_interval=0)
+        with self.assertLogs("codespace.tokens", level="INFO") as logs:
+            cache.get("token")
+        self.assertIn("'misses': 1", logs.output[0])
+
+        with self.assertNoLogs("codespace.tokens", level="INFO"):
+            self.cache.get("token")
@@ -3,6 +3,8 @@ from unittest.mock import patch, Mock, MagicMock
 from rest_framework.test import APIClient
 from rest_framework import exceptions
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import uuid
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
@@ -19,23 +21,15 @@ class TestTokenCodeSpaceAccessCreateView(SimpleTestCase):
 
     def setUp(self):
         self.client = APIClient()
-        self.is_codespace_owner_patcher = patch(
-            "codespace.views.share.IsCodeSpaceOwner.has_object_permission"
-        )
-        self.is_authenticated_patcher = patch(
-            "codespace.views.share.permissions.IsAuthenticated.has_permission"
-        )
-        self.get_object_or_404_patcher = patch(
-            "codespace.views.share.generics.get_object_or_404"
+        self.client.force_authenticate(user=MagicMock(pk="owner_id"))
+        self.get_owner_id_patcher = patch(
+            "codespace.views.mixins.CodeSpace.get_owner_id"
         )
+        self.get_owner_id_mock = self.get_owner_id_patcher.start()
+        self.get_owner_id_mock.return_value = "owner_id"
 
-        self.is_codespace_owner_mock = self.is_codespace_owner_patcher.start()
-        self.is_authenticated_mock = self.is_authenticated_patcher.start()
-        self.get_object_or_404_mock = self.get_object_or_404_patcher.start()
-
-        self.is_codespace_owner_mock.return_value = True
-        self.is_authenticated_mock.return_value = True
-        self.get_object_or_404_mock.return_value = MagicMock(spec=CodeSpace)
+    def tearDown(self):
+        self.get_owner_id_patcher.stop()
 
     def send_request(self, **kwargs):
         """Helper method that send post request to endpoint"""
@@ -72,7 +66,7 @@ class TestTokenCodeSpaceAccessCreateView(SimpleTestCase):
 
     def test_request_without_not_as_codespace_owner(self):
 
-        self.is_codespace_owner_mock.return_value = False
+        self.get_owner_id_mock.return_value = "other_owner_id"
         r = self.send_request(
             data={
                 "codespace_uuid": str(uuid.uuid4()),
@@ -81,7 +75,115 @@ class TestTokenCodeSpaceAccessCreateView(SimpleTestCase):
             },
         )
 
-        self.assertEqual(r.status_code, 401)
+        self.assertEqual(r.status_code, 403)
+
+
+class TestBatchTokenCodeSpaceAccessCreateView(TestCase):
+    """Test BatchTokenCodeSpaceAccessCreateView"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="test_password"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.codespaces = [
+            CodeSpace.objects.create(created_by=self.user) for _ in range(3)
+        ]
+
+    def send_request(self, entries: list):
+        return self.client.post(
+            reverse("codespace:batch_token_codespace_access"),
+            data={"tokens": entries},
+            format="json",
+        )
+
+    def test_valid_post_request(self):
+        """Test if token is returned for each entry using single query"""
+
+        entries = [
+            {"codespace_uuid": str(codespace.uuid), "expire_time": 120, "mode": mode}
+            for codespace in self.codespaces
+            for mode in ("edit", "view_only")
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            r = self.send_request(entries)
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(r.data["tokens"]), len(entries))
+        for entry, data in zip(entries, r.data["tokens"]):
+            uuid_, _, mode = codespace_access_token_generator.decrypt_token(
+                data["token"]
+            )
+            self.assertEqual((uuid_, mode), (entry["codespace_uuid"], entry["mode"]))
+
+    def test_request_as_not_codespace_owner(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="test_password"
+        )
+        codespace = CodeSpace.objects.create(created_by=other_user)
+
+        r = self.send_request(
+            [
+                {"codespace_uuid": str(uuid_), "expire_time": 120, "mode": "edit"}
+                for uuid_ in (self.codespaces[0].uuid, codespace.uuid)
+            ]
+        )
+        self.assertEqual(r.status_code, 403)
+
+    def test_request_with_not_existing_codespace(self):
+        r = self.send_request(
+            [{"codespace_uuid": str(uuid.uuid4()), "expire_time": 120, "mode": "edit"}]
+        )
+        self.assertEqual(r.status_code, 404)
+
+    def test_request_with_too_long_expire_time(self):
+        r = self.send_request(
+            [
+                {
+                    "codespace_uuid": str(self.codespaces[0].uuid),
+                    "expire_time": 2**32,
+                    "mode": "edit",
+                }
+            ]
+        )
+        self.assertEqual(r.status_code, 400)
+
+
+class TestTokenCodeSpaceAccessRevokeView(SimpleTestCase):
+    """Test TokenCodeSpaceAccessRevokeView"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @patch("codespace.views.share.codespace_access_revocations.revoke_token")
+    @patch("codespace.views.mixins.CodeSpace.get_owner_id", return_value="owner_id")
+    def test_valid_post_request(self, patched_get_owner_id, patched_revoke_token):
+        """Test if token is revoked until it expires"""
+
+        self.client.force_authenticate(user=MagicMock(pk="owner_id"))
+        codespace_uuid = str(uuid.uuid4())
+        token = codespace_access_token_generator.make_token(codespace_uuid, 120, "edit")
+        r = self.client.post(
+            reverse("codespace:revoke_token_codespace_access"), data={"token": token}
+        )
+
+        self.assertEqual(r.status_code, 200)
+        patched_get_owner_id.assert_called_once_with(codespace_uuid)
+        patched_revoke_token.assert_called_once()
+        self.assertEqual(patched_revoke_token.call_args.args[0], token)
+
+    @patch("codespace.views.share.permissions.IsAuthenticated.has_permission")
+    def test_invalid_token(self, _):
+        """Test if invalid token returns bad request"""
+
+        r = self.client.post(
+            reverse("codespace:revoke_token_codespace_access"),
+            data={"token": "invalid_token"},
+        )
+        self.assertEqual(r.status_code, 400)
 
 
 class TestCreateCodeSpaceView(TestCase):
@@ -209,6 +311,23 @@ class TestCodeSpaceListView(TestCase):
         self.assertEqual(r.status_code, 200)
         self.assertEqual(len(r.data), 2)
 
+    def test_retrieve_codespaces_summary(self):
+        """Test if summary fields are returned without loading code"""
+
+        self.create_codespace(user=self.user, code="first line\nsecond line\n")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        with CaptureQueriesContext(connection) as queries:
+            r = self.client.get(
+                reverse("codespace:list_codespaces"),
+                {"fields": "uuid,code_lines,code_size,code_preview"},
+            )
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data[0]["code_lines"], 2)
+        self.assertEqual(r.data[0]["code_size"], 23)
+        self.assertEqual(r.data[0]["code_preview"], "first line\nsecond line\n")
+        self.assertFalse(any("core_codeblob" in q["sql"] for q in queries))
+
 
 class TestRetrieveCodeSpaceAccessTokenView(TestCase):
     """Test RetrieveCodeSpaceAccessTokenView"""
@@ -238,14 +357,14 @@ class TestRetrieveCodeSpaceAccessTokenView(TestCase):
 
         patched_get_object_or_404.return_value = mocked_codespace
 
-        r = self.client.get(
-            reverse(
-                "codespace:retrieve_codespace_access_token", kwargs={"token": token}
-            )
-        )
+        for url_name in ("share_codespace", "retrieve_codespace_access_token"):
+            with self.subTest(url_name=url_name):
+                r = self.client.get(
+                    reverse(f"codespace:{url_name}", kwargs={"token": token})
+                )
 
-        self.assertEqual(r.status_code, 200)
-        self.assertEqual(r.data.get("uuid"), str(codespace_uuid))
+                self.assertEqual(r.status_code, 200)
+                self.assertEqual(r.data.get("uuid"), str(codespace_uuid))
 
 
 class TestCodeSpaceSaveChangesView(TestCase):
@@ -262,15 +381,12 @@ class TestCodeSpaceSaveChangesView(TestCase):
         self.codespace = CodeSpace.objects.create(created_by=self.user)
         self.ViewClass = codespace_views.CodeSpaceSaveChangesView
 
-    @patch(
-        "codespace.views.codespace.CodeSpaceSaveChangesView.check_object_permissions"
-    )
-    def test_get_object_method(self, *mocks):
+    def test_get_object_method(self):
         """
         Test if return CodeSpace, or raise exception if codespace does not exists
         """
 
-        view = self.ViewClass(request=MagicMock())
+        view = self.ViewClass(request=MagicMock(user=self.user))
         view.kwargs = {"uuid": str(self.codespace.uuid)}
         obj = view.get_object()
         self.assertEqual(str(obj.uuid), str(self.codespace.uuid))
@@ -317,3 +433,80 @@ class TestCodeSpaceSaveChangesView(TestCase):
         )
 
         self.assertEqual(r.status_code, 200)
+
+    def test_ownership_is_checked_without_database(self):
+        """
+        Test if owner is read from redis when codespace is cached
+        """
+
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="test_password"
+        )
+        self.client.force_authenticate(user=other_user)
+
+        with self.assertNumQueries(0):
+            r = self.client.patch(
+                reverse(
+                    "codespace:save_changes_codespace",
+                    kwargs={"uuid": str(self.codespace.uuid)},
+                ),
+            )
+
+        self.assertEqual(r.status_code, 403)
+
+
+class TestCodeRevisionViews(TestCase):
+    """Test CodeRevisionListView and RetrieveCodeRevisionView"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="test_password"
+        )
+        self.token = AccessToken().for_user(self.user)
+        self.client = APIClient()
+        self.codespace = CodeSpace.objects.create(created_by=self.user, code="old")
+        self.codespace.code = "new"
+        self.codespace.save()
+
+    def test_list_revisions(self):
+        """Test if revisions are listed from newest"""
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        r = self.client.get(
+            reverse(
+                "codespace:list_codespace_revisions",
+                kwargs={"uuid": str(self.codespace.uuid)},
+            )
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual([rev["number"] for rev in r.data], [2, 1])
+
+    def test_retrieve_revision(self):
+        """Test if revision code is returned"""
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        r = self.client.get(
+            reverse(
+                "codespace:retrieve_codespace_revision",
+                kwargs={"uuid": str(self.codespace.uuid), "number": 1},
+            )
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["code"], "old")
+
+    def test_retrieve_revision_as_not_owner(self):
+        """Test if only codespace owner can retrieve revisions"""
+
+        user = get_user_model().objects.create_user(
+            email="other@example.com", password="test_password"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken().for_user(user)}"
+        )
+        r = self.client.get(
+            reverse(
+                "codespace:retrieve_codespace_revision",
+                kwargs={"uuid": str(self.codespace.uuid), "number": 1},
+            )
+        )
+        self.assertEqual(r.status_code, 403)
@@ -1,27 +1,63 @@
 from django.conf import settings
 from typing import Tuple, Union
 import hashlib
+import math
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.exceptions import InvalidTag
+from functools import lru_cache
+from collections import OrderedDict
+import logging
+import threading
+import time
 import base64
 import secrets
+import struct
+import uuid as uuid_lib
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_cipher(secret: str) -> AESGCM:
+    """
+    Return AESGCM cipher with key derived from given secret (hashed
+    using sha256 as 32 bytes). Ciphers are built once per process
+    """
+
+    return AESGCM(hashlib.sha256(secret.encode("utf8")).digest())
+
 
 class CodeSpaceAccessToken:
     """
     Class that can be used to check/create codespace
-    access token
+    access token. Tokens are prefixed with id of key used to encrypt
+    them, new tokens are created with active key and tokens created
+    with other keys from keyring can be decrypted until key is removed.
+    Encrypted payload is binary (version, uuid bytes, expire timestamp
+    and mode index), tokens with "uuid:timestamp:mode" string payload
+    are still decrypted
     """
 
+    payload_version = 1
+    payload_struct = struct.Struct(">B16sIB")
+    modes = ("edit", "view_only")
+    # length of base64 encoded token (without padding)
+    token_length = 4 * math.ceil((13 + payload_struct.size + 16) / 3)
+
     @property
-    def __secret(self) -> bytes:
+    def __keyring(self) -> dict[int, str]:
         """
-        Return django secret key hashed using sha256
-        as 32 bytes
+        Return dict of key id and secret used to derive encryption key
         """
 
-        secret = hashlib.sha256(settings.SECRET_KEY.encode("utf8")).digest()
-        return secret
+        return settings.CODESPACE_ACCESS_TOKEN_KEYS
+
+    @property
+    def __active_key_id(self) -> int:
+        """Return id of key used to create new tokens"""
+
+        return settings.CODESPACE_ACCESS_TOKEN_ACTIVE_KEY_ID
 
     def make_token(self, uuid: str, expire_time: int, mode: str) -> str:
         """
@@ -32,34 +68,104 @@ class CodeSpaceAccessToken:
         - mode - share mode (edit, view_only)
         """
 
-        token_hash = self.__make_token_hash(uuid, expire_time, mode)
-        nonce = secrets.token_bytes(12)
-        token = nonce + AESGCM(self.__secret).encrypt(
-            nonce=nonce,
-            data=str.encode(token_hash),
-            associated_data=b"",
-        )
-        b64_token = base64.urlsafe_b64encode(token)
-        return b64_token.decode()
+        return self.make_tokens([(uuid, expire_time, mode)])[0]
+
+    def make_tokens(self, entries: list[Tuple[str, int, str]]) -> list[str]:
+        """
+        Create tokens for list of (uuid, expire_time, mode) entries.
+        Cipher and current time are taken once for whole batch
+        """
+
+        key_id = self.__active_key_id
+        cipher = get_cipher(self.__keyring[key_id])
+        now = self._now()
+
+        tokens = []
+        for uuid, expire_time, mode in entries:
+            payload = self.payload_struct.pack(
+                self.payload_version,
+                uuid_lib.UUID(str(uuid)).bytes,
+                self._expire_ts(expire_time, now),
+                self.modes.index(mode),
+            )
+            nonce = secrets.token_bytes(12)
+            token = (
+                bytes([key_id])
+                + nonce
+                + cipher.encrypt(nonce=nonce, data=payload, associated_data=b"")
+            )
+            tokens.append(base64.urlsafe_b64encode(token).decode().rstrip("="))
 
-    def decrypt_token(self, token: str) -> Union[Tuple[str, int], Tuple[None, None]]:
+        return tokens
+
+    def decrypt_token(self, token: str) -> list[str]:
         """
-        Return encrypted values (uuid, timestampe)
+        Return encrypted values (uuid, timestamp, mode)
         """
 
-        token = base64.urlsafe_b64decode(token.encode())
-        decrypted_token = AESGCM(self.__secret).decrypt(token[:12], token[12:], b"")
-        return decrypted_token.decode("utf8").split(":")
+        payload = self.__decrypt(self.decode_token(token))
+
+        if (
+            len(payload) == self.payload_struct.size
+            and payload[0] == self.payload_version
+        ):
+            _, uuid_bytes, expire_ts, mode = self.payload_struct.unpack(payload)
+            return [
+                str(uuid_lib.UUID(bytes=uuid_bytes)),
+                str(expire_ts),
+                self.modes[mode],
+            ]
 
-    def __make_token_hash(self, uuid: str, expire_time: int, mode: str) -> str:
-        return f"{uuid}:{str(self._expire_ts(expire_time))}:{mode}"
+        # string payload of tokens created before binary format
+        return payload.decode("utf8").split(":")
 
-    def _expire_ts(self, expire_time: int) -> int:
+    @staticmethod
+    def decode_token(token: str) -> bytes:
+        """Return token bytes (token padding is optional)"""
+
+        return base64.urlsafe_b64decode(token.encode() + b"=" * (-len(token) % 4))
+
+    @classmethod
+    def get_token_id(cls, token: str) -> str:
+        """
+        Return id of token (hash of decoded token bytes). Strings that
+        decode to the same token (e.g. legacy tokens with changed unused
+        bits of last character) have the same id
+        """
+
+        try:
+            token_bytes = cls.decode_token(token)
+        except ValueError:
+            # not base64 encoded, it can't be decrypted anyway
+            token_bytes = token.encode("utf8")
+
+        return hashlib.sha256(token_bytes).hexdigest()[:32]
+
+    def __decrypt(self, token: bytes) -> bytes:
+        """
+        Decrypt token with key specified by its first byte. Tokens created
+        before keyring was introduced (without key id) are decrypted with
+        SECRET_KEY if CODESPACE_ACCESS_TOKEN_ACCEPT_LEGACY is enabled
+        """
+
+        if (secret := self.__keyring.get(token[0])) is not None:
+            try:
+                return get_cipher(secret).decrypt(token[1:13], token[13:], b"")
+            except InvalidTag:
+                if not settings.CODESPACE_ACCESS_TOKEN_ACCEPT_LEGACY:
+                    raise
+
+        if not settings.CODESPACE_ACCESS_TOKEN_ACCEPT_LEGACY:
+            raise InvalidTag()
+
+        return get_cipher(settings.SECRET_KEY).decrypt(token[:12], token[12:], b"")
+
+    def _expire_ts(self, expire_time: int, now: Union[datetime, None] = None) -> int:
         """
         Return expire date timestamp
         """
 
-        expire_date = self._now() + timedelta(seconds=expire_time)
+        expire_date = (now or self._now()) + timedelta(seconds=expire_time)
         timestamp = int(datetime.timestamp(expire_date))
         return timestamp
 
@@ -68,4 +174,86 @@ class CodeSpaceAccessToken:
         return datetime.now()
 
 
+class DecryptedTokenCache:
+    """
+    Bounded LRU cache of decrypted codespace access tokens (keyed by
+    token id). Entries are evicted when cache is full or when token
+    expires, so repeated verification of the same token doesn't need
+    decryption. Revoked tokens don't have to be removed, revocation is
+    checked on every request. Cache stats are logged at most once per
+    log interval
+    """
+
+    def __init__(self, maxsize: int, log_interval: int = 300) -> None:
+        self.maxsize = maxsize
+        self.log_interval = log_interval
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__stats_logged_at = time.monotonic()
+
+    def get(self, token: str) -> Union[Tuple[str, int, str], None]:
+        """
+        Return decrypted token data (uuid, expire_ts, mode) or None
+        if token isn't cached or expired
+        """
+
+        key = CodeSpaceAccessToken.get_token_id(token)
+        with self.__lock:
+            log_stats = self.__should_log_stats()
+            if (data := self.__entries.get(key)) is None:
+                self.misses += 1
+            elif time.time() > data[1]:
+                del self.__entries[key]
+                self.misses += 1
+                data = None
+            else:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+
+        if log_stats:
+            logger.info("Decrypted token cache stats: %s", self.get_stats())
+
+        return data
+
+    def set(self, token: str, data: Tuple[str, int, str]) -> None:
+        """Cache decrypted token data, evict least recently used entry"""
+
+        key = CodeSpaceAccessToken.get_token_id(token)
+        with self.__lock:
+            self.__entries[key] = data
+            self.__entries.move_to_end(key)
+            if len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all tokens from cache"""
+
+        with self.__lock:
+            self.__entries.clear()
+
+    def get_stats(self) -> dict:
+        """Return cache hits, misses and size"""
+
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def __should_log_stats(self) -> bool:
+        """Check if stats weren't logged for log interval"""
+
+        now = time.monotonic()
+        if now - self.__stats_logged_at < self.log_interval:
+            return False
+
+        self.__stats_logged_at = now
+        return True
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
 codespace_access_token_generator = CodeSpaceAccessToken()
+decrypted_token_cache = DecryptedTokenCache(
+    maxsize=settings.CODESPACE_ACCESS_TOKEN_CACHE_SIZE,
+    log_interval=settings.CODESPACE_ACCESS_TOKEN_CACHE_LOG_INTERVAL,
+)
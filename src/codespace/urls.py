@@ -1,14 +1,32 @@
-from django.urls import path, re_path
+from django.urls import path, re_path, register_converter
 from codespace import views
+from codespace.converters import CodeSpaceAccessTokenConverter
+
+register_converter(CodeSpaceAccessTokenConverter, "access_token")
 
 app_name = "codespace"
 urlpatterns = [
+    path(
+        "s/<access_token:token>/",
+        views.RetrieveCodeSpaceAccessTokenView.as_view(),
+        name="share_codespace",
+    ),
     path("codespace/", views.CreateCodeSpaceView.as_view(), name="create_codespace"),
     re_path(
         r"codespace/save_changes/(?P<uuid>[a-f0-9]{8}-?[a-f0-9]{4}-?4[a-f0-9]{3}-?[89ab][a-f0-9]{3}-?[a-f0-9]{12})/",  # noqa
         views.CodeSpaceSaveChangesView.as_view(),
         name="save_changes_codespace",
     ),
+    re_path(
+        r"codespace/(?P<uuid>[a-f0-9]{8}-?[a-f0-9]{4}-?4[a-f0-9]{3}-?[89ab][a-f0-9]{3}-?[a-f0-9]{12})/revisions/(?P<number>[0-9]+)/",  # noqa
+        views.RetrieveCodeRevisionView.as_view(),
+        name="retrieve_codespace_revision",
+    ),
+    re_path(
+        r"codespace/(?P<uuid>[a-f0-9]{8}-?[a-f0-9]{4}-?4[a-f0-9]{3}-?[89ab][a-f0-9]{3}-?[a-f0-9]{12})/revisions/",  # noqa
+        views.CodeRevisionListView.as_view(),
+        name="list_codespace_revisions",
+    ),
     re_path(
         r"codespace/(?P<tmp_uuid>tmp-[a-f0-9]{8}-?[a-f0-9]{4}-?4[a-f0-9]{3}-?[89ab][a-f0-9]{3}-?[a-f0-9]{12})/",  # noqa
         views.RetrieveDestroyTmpCodeSpaceView.as_view(),
@@ -19,6 +37,7 @@ urlpatterns = [
         views.RetrieveUpdateDestroyCodeSpaceView.as_view(),
         name="retrieve_update_destroy_codespace",
     ),
+    # tokens created before compact format (new tokens use share_codespace url)
     # Big thx https://stackoverflow.com/a/5885097/14579046
     re_path(
         r"codespace/(?P<token>(?:[a-zA-Z0-9_-]{4})*(?:[a-zA-Z0-9_-]{2}==|[a-zA-Z0-9_-]{3}=|[a-zA-Z0-9_-]{4}))/",  # noqa
@@ -35,4 +54,19 @@ urlpatterns = [
         views.TokenCodeSpaceAccessCreateView.as_view(),
         name="token_codespace_access",
     ),
+    path(
+        "codespace/access/tokens/",
+        views.BatchTokenCodeSpaceAccessCreateView.as_view(),
+        name="batch_token_codespace_access",
+    ),
+    path(
+        "codespace/access/token/revoke/",
+        views.TokenCodeSpaceAccessRevokeView.as_view(),
+        name="revoke_token_codespace_access",
+    ),
+    path(
+        "codespace/access/revoke/",
+        views.CodeSpaceAccessRevokeView.as_view(),
+        name="revoke_codespace_access",
+    ),
 ]
@@ -8,4 +8,11 @@ from .codespace import (  # noqa
 )
 from .share import (  # noqa
     TokenCodeSpaceAccessCreateView,
+    BatchTokenCodeSpaceAccessCreateView,
+    TokenCodeSpaceAccessRevokeView,
+    CodeSpaceAccessRevokeView,
+)
+from .revision import (  # noqa
+    CodeRevisionListView,
+    RetrieveCodeRevisionView,
 )
@@ -6,6 +6,7 @@ from codespace.serializers import (
 )
 from codespace.permissions import IsCodeSpaceOwner, IsCodeSpaceAccessTokenValid
 from codespace.pagination import PageNumberPagination
+from codespace.views.mixins import CodeSpaceOwnerMixin
 from rest_framework.response import Response
 from core.models import CodeSpace, TmpCodeSpace
 from django.shortcuts import get_object_or_404
@@ -22,6 +23,7 @@ class CreateCodeSpaceView(generics.CreateAPIView):
 
     codespace_serializer_class = CodeSpaceSerializer
     tmp_codespace_serializer_class = TmpCodeSpaceSerializer
+    anon_throttle_scope = "anon_create_codespace"
 
     def get_serializer_class(
         self,
@@ -48,10 +50,18 @@ class CodeSpaceListView(generics.ListAPIView):
 
     def get_queryset(self) -> QuerySet:
         """Return a queryset of CodeSpace created by authenticated user"""
-        return self.queryset.filter(
+        queryset = self.queryset.filter(
             created_by=self.request.user,
         ).order_by("-created_at")
 
+        # code is stored in blobs, fetch them with codespaces only if
+        # code is requested (summary fields are stored in codespace)
+        fields = self.request.query_params.get("fields")
+        if fields is None or "code" in fields.split(","):
+            queryset = queryset.select_related("code_blob")
+
+        return queryset
+
 
 class RetrieveUpdateDestroyCodeSpaceView(generics.RetrieveUpdateDestroyAPIView):
     """View used to retrieve, update or delete regular codespace data."""
@@ -99,6 +109,7 @@ class RetrieveCodeSpaceAccessTokenView(generics.RetrieveAPIView):
     codespace_uuid_kwarg_key = "uuid"
     serializer_class = CodeSpaceTokenSerializer
     permission_classes = (IsCodeSpaceAccessTokenValid,)
+    throttle_scope = "share_link"
 
     def get_object(self) -> Union[CodeSpace, None]:
         # uuid is in kwargs thanks to IsCodeSpaceAccessTokenValid
@@ -116,7 +127,7 @@ class RetrieveCodeSpaceAccessTokenView(generics.RetrieveAPIView):
         raise exceptions.PermissionDenied(detail=message, code=code)
 
 
-class CodeSpaceSaveChangesView(generics.GenericAPIView):
+class CodeSpaceSaveChangesView(CodeSpaceOwnerMixin, generics.GenericAPIView):
     """
     View used to save code changes stored in redis
     to postgres database (changes can be saved only by owner
@@ -147,13 +158,7 @@ class CodeSpaceSaveChangesView(generics.GenericAPIView):
         Return CodeSpace object
         """
 
-        try:
-            obj = generics.get_object_or_404(CodeSpace, uuid=self.kwargs.get("uuid"))
-        except Http404:
-            raise exceptions.NotFound(detail="CodeSpace does not exists")
-
-        self.check_object_permissions(self.request, obj)
-        return obj
+        return super().get_object(self.kwargs.get("uuid"))
 
     def patch(self, request: HttpRequest, *args, **kwargs) -> Response:
         return self.save_changes(request, *args, **kwargs)
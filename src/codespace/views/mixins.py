@@ -0,0 +1,53 @@
+from rest_framework import generics, permissions, exceptions
+from codespace.permissions import IsCodeSpaceOwner
+from core.models import CodeSpace
+from django.http import Http404
+from typing import Union
+import uuid
+
+
+class CodeSpaceOwnerMixin:
+    """
+    Mixin used to check if request.user is owner of CodeSpace specified
+    by codespace_uuid. Ownership is checked with owner id stored in redis
+    (database is queried only if codespace isn't cached)
+    """
+
+    permission_classes = (permissions.IsAuthenticated, IsCodeSpaceOwner)
+
+    def check_codespace_owner(self, codespace_uuid: Union[str, None] = None) -> str:
+        """
+        Raise NotFound if codespace doesn't exist or permission denied
+        if request.user isn't its owner, return codespace uuid
+        """
+
+        if codespace_uuid is None:
+            codespace_uuid = self.request.data.get("codespace_uuid")
+
+        try:
+            codespace_uuid = str(uuid.UUID(str(codespace_uuid)))
+        except ValueError:
+            raise exceptions.NotFound(detail="CodeSpace does not exists")
+
+        if (owner_id := CodeSpace.get_owner_id(codespace_uuid)) is None:
+            raise exceptions.NotFound(detail="CodeSpace does not exists")
+
+        if owner_id != str(self.request.user.pk):
+            self.permission_denied(self.request)
+
+        return codespace_uuid
+
+    def get_object(self, codespace_uuid: Union[str, None] = None) -> CodeSpace:
+        """
+        Return CodeSpace object (ownership is checked before it is loaded)
+        """
+
+        codespace_uuid = self.check_codespace_owner(codespace_uuid)
+
+        try:
+            obj = generics.get_object_or_404(CodeSpace, uuid=codespace_uuid)
+        except Http404:
+            raise exceptions.NotFound(detail="CodeSpace does not exists")
+
+        self.check_object_permissions(self.request, obj)
+        return obj
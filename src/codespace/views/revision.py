@@ -0,0 +1,61 @@
+from rest_framework import generics, permissions, exceptions
+from codespace.serializers import CodeRevisionSerializer, CodeRevisionDetailSerializer
+from codespace.permissions import IsCodeSpaceOwner
+from codespace.pagination import PageNumberPagination
+from core.models import CodeSpace, CodeRevision
+from django.http import Http404
+from django.db.models.query import QuerySet
+
+
+class CodeRevisionViewMixin:
+    """
+    Mixin used to return revisions of codespace specified by uuid
+    parameter, only codespace owner can access them
+    """
+
+    permission_classes = (permissions.IsAuthenticated, IsCodeSpaceOwner)
+
+    def get_codespace(self) -> CodeSpace:
+        """Return CodeSpace object base on uuid parameter"""
+
+        try:
+            obj = generics.get_object_or_404(CodeSpace, uuid=self.kwargs.get("uuid"))
+        except Http404:
+            raise exceptions.NotFound(detail="CodeSpace does not exists")
+
+        # May raise a permission denied
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    def get_queryset(self) -> QuerySet:
+        """Return a queryset of codespace revisions"""
+
+        # revision data isn't needed to list revisions
+        return (
+            CodeRevision.objects.filter(codespace=self.get_codespace())
+            .defer("data")
+            .order_by("-number")
+        )
+
+
+class CodeRevisionListView(CodeRevisionViewMixin, generics.ListAPIView):
+    """View used to get list of codespace code revisions"""
+
+    serializer_class = CodeRevisionSerializer
+    pagination_class = PageNumberPagination
+
+
+class RetrieveCodeRevisionView(CodeRevisionViewMixin, generics.RetrieveAPIView):
+    """View used to retrieve code of specified codespace revision"""
+
+    serializer_class = CodeRevisionDetailSerializer
+
+    def get_object(self) -> CodeRevision:
+        """
+        Return revision based on number parameter (permissions are
+        checked against codespace in get_queryset)
+        """
+
+        return generics.get_object_or_404(
+            self.get_queryset(), number=self.kwargs.get("number")
+        )
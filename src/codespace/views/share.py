@@ -1,42 +1,95 @@
-from rest_framework import permissions, generics, status, exceptions
+from rest_framework import permissions, generics, status
 from rest_framework.response import Response
-from django.http import HttpRequest, Http404
-from core.models import CodeSpace
-from codespace.permissions import IsCodeSpaceOwner
-from codespace.serializers import TokenAccessCodeSpaceSerializer
+from django.http import HttpRequest
+from codespace.views.mixins import CodeSpaceOwnerMixin
+from codespace.serializers import (
+    TokenAccessCodeSpaceSerializer,
+    BatchTokenAccessCodeSpaceSerializer,
+    RevokeTokenAccessCodeSpaceSerializer,
+)
+from codespace.revocation import codespace_access_revocations
 from typing import Type
 
 
-class TokenCodeSpaceAccessCreateView(generics.GenericAPIView):
+class TokenCodeSpaceAccessCreateView(CodeSpaceOwnerMixin, generics.GenericAPIView):
     """
     Takes codespace_uuid, expire_time (in seconds), mode ["edit", "view_only"]
     and returns token that can be used to share codespace for specified time period
     """
 
-    permission_classes = (permissions.IsAuthenticated, IsCodeSpaceOwner)
     serializer_class = TokenAccessCodeSpaceSerializer
 
-    def get_object(self) -> CodeSpace:
-        """
-        Return CodeSpace object
-        """
-
-        try:
-            obj = generics.get_object_or_404(
-                CodeSpace, uuid=self.request.data.get("codespace_uuid")
-            )
-        except Http404:
-            raise exceptions.NotFound(detail="CodeSpace does not exists")
-
-        self.check_object_permissions(self.request, obj)
-        return obj
-
     def post(self, request: HttpRequest, *args, **kwargs) -> Type[Response]:
         """Create and return access and refresh tokens"""
 
         # raise 404 if not exists or permission denied if not owner
-        self.get_object()
+        self.check_codespace_owner()
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+class BatchTokenCodeSpaceAccessCreateView(generics.GenericAPIView):
+    """
+    Takes list of codespace_uuid, expire_time (in seconds), mode ["edit", "view_only"]
+    entries and returns them with tokens (ownership of all codespaces is checked
+    with single query)
+    """
+
+    permission_classes = (permissions.IsAuthenticated,)
+    serializer_class = BatchTokenAccessCodeSpaceSerializer
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> Type[Response]:
+        """Create and return access tokens"""
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+class TokenCodeSpaceAccessRevokeView(CodeSpaceOwnerMixin, generics.GenericAPIView):
+    """
+    Takes codespace access token and revokes it, so it can't be used anymore
+    (only codespace owner can revoke tokens)
+    """
+
+    serializer_class = RevokeTokenAccessCodeSpaceSerializer
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> Type[Response]:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # raise 404 if not exists or permission denied if not owner
+        self.check_codespace_owner(serializer.validated_data["codespace_uuid"])
+
+        codespace_access_revocations.revoke_token(
+            serializer.validated_data["token"],
+            serializer.validated_data["expire_ts"],
+        )
+        return Response(
+            data={"detail": "Token revoked successfully"}, status=status.HTTP_200_OK
+        )
+
+
+class CodeSpaceAccessRevokeView(CodeSpaceOwnerMixin, generics.GenericAPIView):
+    """
+    Takes codespace_uuid and revokes all codespace access tokens (post)
+    or restores access with tokens that weren't revoked separately (delete)
+    """
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> Type[Response]:
+        codespace_uuid = self.check_codespace_owner()
+        codespace_access_revocations.revoke_codespace(codespace_uuid)
+        return Response(
+            data={"detail": "CodeSpace access revoked successfully"},
+            status=status.HTTP_200_OK,
+        )
+
+    def delete(self, request: HttpRequest, *args, **kwargs) -> Type[Response]:
+        codespace_uuid = self.check_codespace_owner()
+        codespace_access_revocations.restore_codespace(codespace_uuid)
+        return Response(
+            data={"detail": "CodeSpace access restored successfully"},
+            status=status.HTTP_200_OK,
+        )
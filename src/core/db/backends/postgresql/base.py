@@ -0,0 +1,15 @@
+from django.db.backends.postgresql import base
+from core.db.metrics import database_metrics
+import time
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL database backend that records how long it takes to
+    open connection (TCP + auth handshake or checkout from pool)
+    """
+
+    def connect(self) -> None:
+        start = time.perf_counter()
+        super().connect()
+        database_metrics.record_connect(time.perf_counter() - start)
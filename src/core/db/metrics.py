@@ -0,0 +1,47 @@
+from contextvars import ContextVar
+from typing import Union
+import threading
+
+
+class DatabaseMetrics:
+    """
+    Class used to collect database connection metrics.
+    Metrics are stored per request (in context variable, so
+    it works with both WSGI threads and ASGI tasks) and as
+    process wide totals
+    """
+
+    def __init__(self) -> None:
+        self.__request_metrics = ContextVar("database_request_metrics", default=None)
+        self.__lock = threading.Lock()
+        self.connections_opened_total = 0
+        self.connect_seconds_total = 0.0
+
+    def start_request(self) -> None:
+        """Start collecting metrics for current request"""
+
+        self.__request_metrics.set({"connections_opened": 0, "connect_seconds": 0.0})
+
+    def end_request(self) -> Union[dict, None]:
+        """Stop collecting metrics and return metrics of current request"""
+
+        metrics = self.__request_metrics.get()
+        self.__request_metrics.set(None)
+        return metrics
+
+    def record_connect(self, seconds: float) -> None:
+        """
+        Record opened connection (new connection or connection
+        checked out from pool) and time it took
+        """
+
+        with self.__lock:
+            self.connections_opened_total += 1
+            self.connect_seconds_total += seconds
+
+        if (metrics := self.__request_metrics.get()) is not None:
+            metrics["connections_opened"] += 1
+            metrics["connect_seconds"] += seconds
+
+
+database_metrics = DatabaseMetrics()
@@ -1,11 +1,35 @@
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
 from core.signals import post_get
 from django.dispatch import receiver
-from core.models import CodeSpace
+from django.contrib.auth import get_user_model
+from core.models import CodeSpace, CodeBlob, CodeRevision
 from src import REDIS
 from django.conf import settings
 
 
+@receiver(pre_delete, sender=CodeSpace)
+def codespace_pre_delete_handler(
+    sender: type[CodeSpace], instance: CodeSpace, **kwargs
+) -> None:
+    """
+    This signal is used to collect blobs of codespace revisions
+    snapshots (revisions are deleted before codespace), they are
+    released together with codespace blob
+    """
+
+    # collected for all user codespaces by user pre_delete handler
+    if isinstance(kwargs.get("origin"), get_user_model()):
+        return
+
+    instance.__dict__["revisions_blobs"] = list(
+        CodeRevision.objects.filter(codespace=instance, is_snapshot=True).values_list(
+            "blob", flat=True
+        )
+    )
+
+
 @receiver(post_delete, sender=CodeSpace)
 def codespace_post_delete_handler(
     sender: type[CodeSpace], instance: CodeSpace, **kwargs
@@ -15,11 +39,60 @@ def codespace_post_delete_handler(
     codespace deletion
     """
 
-    # delete codespace from redis
     instance_uuid = str(instance.uuid)
+
+    # if codespace is deleted in cascade with its owner only collect
+    # its key and blob, they will be removed in batch by user
+    # post_delete handler
+    if isinstance(origin := kwargs.get("origin"), get_user_model()):
+        origin.__dict__.setdefault("deleted_codespaces_keys", []).append(
+            instance_uuid
+        )
+        origin.__dict__.setdefault("deleted_codespaces_blobs", []).append(
+            instance.code_blob_id
+        )
+        return
+
+    # release codespace code blob and blobs of its revisions
+    CodeBlob.objects.release(
+        instance.code_blob_id, *instance.__dict__.pop("revisions_blobs", [])
+    )
+
+    # if codespaces are deleted with queryset collect their keys, they
+    # are unlinked in batch after commit (single callback per queryset)
+    if isinstance(origin, QuerySet):
+        if "deleted_codespaces_keys" not in origin.__dict__:
+            transaction.on_commit(
+                lambda: unlink_codespaces_data_from_redis(
+                    origin.__dict__.pop("deleted_codespaces_keys", [])
+                )
+            )
+        origin.__dict__.setdefault("deleted_codespaces_keys", []).append(
+            instance_uuid
+        )
+        return
+
+    # delete codespace from redis
     REDIS.delete(instance_uuid)
 
 
+def unlink_codespaces_data_from_redis(keys: list[str]) -> None:
+    """
+    Remove codespaces data from redis using chunked UNLINK commands
+    sent in single pipeline (one round trip instead of one per key)
+    """
+
+    if not keys:
+        return
+
+    chunk_size = settings.CODESPACE_REDIS_UNLINK_CHUNK_SIZE
+    pipeline = REDIS.pipeline(transaction=False)
+    for i in range(0, len(keys), chunk_size):
+        pipeline.unlink(*keys[i:i + chunk_size])
+
+    pipeline.execute()
+
+
 def save_codespace_data_to_redis(sender: type[CodeSpace], instance: CodeSpace) -> None:
     redis_key = str(getattr(instance, sender.redis_store_key))
 
@@ -30,6 +103,8 @@ def save_codespace_data_to_redis(sender: type[CodeSpace], instance: CodeSpace) -
             str(key): str(getattr(instance, key))
             for key in sender.redis_store_fields.keys()
         }
+        # store owner id, so ownership can be checked without database
+        redis_data[sender.redis_owner_field] = str(instance.created_by_id)
 
         REDIS.hmset(redis_key, redis_data)
 
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from emails.tasks import email_sender
+from core.models import CodeBlob, CodeRevision
+from core.handlers.codespace import unlink_codespaces_data_from_redis
+from emails.outbox import enqueue_email
+from jwt_auth.authentication import user_cache
 
 
 @receiver(post_save, sender=get_user_model())
@@ -13,12 +17,61 @@ def codespace_post_save_handler(
     user
     """
 
+    if not created:
+        # user could be changed (e.g. deactivated), so remove it
+        # from cache (also after commit, so old row isn't cached again)
+        invalidate_cached_user(instance.pk)
+
     if created:
-        # send welcome email
-        email_sender.delay(
+        # send welcome email (after user is committed)
+        enqueue_email(
             email_subject=f"Welcome {str(instance.first_name)}",
             email_to=str(instance.email),
             email_plaintext="emails/welcome.txt",
             email_template="emails/welcome.html",
             first_name=str(instance.first_name),
         )
+
+
+@receiver(pre_delete, sender=get_user_model())
+def user_pre_delete_handler(
+    sender: type[get_user_model()], instance: get_user_model(), **kwargs
+) -> None:
+    """
+    This signal is used to collect blobs of revisions snapshots of all
+    user codespaces (with single query), they are released together
+    with codespaces blobs
+    """
+
+    instance.__dict__["deleted_codespaces_blobs"] = list(
+        CodeRevision.objects.filter(
+            codespace__created_by=instance, is_snapshot=True
+        ).values_list("blob", flat=True)
+    )
+
+
+@receiver(post_delete, sender=get_user_model())
+def user_post_delete_handler(
+    sender: type[get_user_model()], instance: get_user_model(), **kwargs
+) -> None:
+    """
+    This signal is used to release code blobs and remove redis data
+    of codespaces deleted in cascade with user. Blobs and keys are
+    collected by codespace post_delete handler, keys are unlinked
+    in batch after commit
+    """
+
+    invalidate_cached_user(instance.pk)
+
+    CodeBlob.objects.release(*instance.__dict__.pop("deleted_codespaces_blobs", []))
+
+    keys = instance.__dict__.pop("deleted_codespaces_keys", [])
+    if keys:
+        transaction.on_commit(lambda: unlink_codespaces_data_from_redis(keys))
+
+
+def invalidate_cached_user(user_id: str) -> None:
+    """Remove user from cache now and after transaction commit"""
+
+    user_cache.delete(user_id)
+    transaction.on_commit(lambda: user_cache.delete(user_id))
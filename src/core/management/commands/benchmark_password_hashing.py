@@ -0,0 +1,79 @@
+from django.core.management import BaseCommand
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from core.passwords import PasswordHashingPool
+from concurrent.futures import ThreadPoolExecutor
+import statistics
+import threading
+import time
+
+
+class Command(BaseCommand):
+    """
+    This command is used to compare password verification in request
+    threads with verification in password hashing pool. It simulates
+    burst of logins (verifications from many threads) and measures
+    latency of small unrelated work done at the same time
+    """
+
+    help = "Benchmark password hashing pool with burst of logins"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--logins", type=int, default=64)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument(
+            "--pool-size", type=int, default=settings.PASSWORD_HASHING_POOL_SIZE
+        )
+
+    def handle(self, *args, **options) -> None:
+        encoded = make_password("benchmark_password1")
+
+        for label, pool in (
+            ("request threads", PasswordHashingPool(max_workers=0)),
+            ("hashing pool", PasswordHashingPool(max_workers=options["pool_size"])),
+        ):
+            elapsed, latencies = self.run_burst(
+                pool, encoded, options["logins"], options["concurrency"]
+            )
+            latencies.sort()
+            self.stdout.write(
+                f"{label}: {options['logins'] / elapsed:.1f} logins/s, "
+                f"unrelated work p50 {statistics.median(latencies) * 1000:.2f} ms, "
+                f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms, "
+                f"max in flight {pool.get_stats()['max_in_flight']}"
+            )
+
+    def run_burst(
+        self, pool: PasswordHashingPool, encoded: str, logins: int, concurrency: int
+    ) -> tuple[float, list[float]]:
+        """
+        Verify password logins times from concurrency threads, return
+        elapsed time and latencies of unrelated work measured meanwhile
+        """
+
+        done = threading.Event()
+        latencies = []
+
+        def unrelated_work() -> None:
+            while not done.is_set():
+                start = time.perf_counter()
+                sum(range(10000))
+                latencies.append(time.perf_counter() - start)
+                time.sleep(0.001)
+
+        probe = threading.Thread(target=unrelated_work)
+        probe.start()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(
+                executor.map(
+                    lambda _: pool.check_password("benchmark_password1", encoded),
+                    range(logins),
+                )
+            )
+        elapsed = time.perf_counter() - start
+
+        done.set()
+        probe.join()
+        return elapsed, latencies
@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q, Max
+from collections import Counter
+from typing import Union
 from core.query import CodeSpaceQuerySet
 from src import REDIS
 from django.conf import settings
@@ -8,6 +11,161 @@ class CodeSpaceManager(models.manager.BaseManager.from_queryset(CodeSpaceQuerySe
     pass
 
 
+class CodeBlobManager(models.Manager):
+    """
+    Custom CodeBlob manager used to acquire and release blobs
+    with reference counting
+    """
+
+    def acquire(self, content: str) -> models.Model:
+        """
+        Return blob with given content (create it if it doesn't exist)
+        and increment its reference count
+        """
+
+        content_hash = self.model.get_content_hash(content)
+        # increment first, so blob can't be deleted by concurrent release
+        # between checking that it exists and referencing it
+        if not self.filter(hash=content_hash).update(ref_count=F("ref_count") + 1):
+            try:
+                with transaction.atomic():
+                    return self.create(hash=content_hash, content=content, ref_count=1)
+            except IntegrityError:
+                # blob created by concurrent request
+                self.filter(hash=content_hash).update(ref_count=F("ref_count") + 1)
+
+        # content is already known, so don't fetch existing blob
+        blob = self.model(hash=content_hash, content=content)
+        blob._state.adding = False
+        return blob
+
+    def release(self, *hashes: str) -> None:
+        """
+        Decrement reference count of blobs with given hashes (one
+        reference per occurrence) and delete blobs that are no
+        longer referenced
+        """
+
+        # group hashes by number of released references, so releasing
+        # many codespaces with the same code takes single query
+        released = Counter(filter(None, hashes))
+        by_count = {}
+        for content_hash, count in released.items():
+            by_count.setdefault(count, []).append(content_hash)
+
+        for count, content_hashes in by_count.items():
+            self.filter(hash__in=content_hashes).update(
+                ref_count=F("ref_count") - count
+            )
+
+        if released:
+            self.filter(hash__in=released.keys(), ref_count=0).delete()
+
+
+class CodeRevisionManager(models.Manager):
+    """
+    Custom CodeRevision manager used to create and reconstruct
+    codespace code revisions
+    """
+
+    def add(
+        self, codespace: models.Model, old_code: Union[str, None], code: str
+    ) -> models.Model:
+        """
+        Create new revision of codespace code. Revision is stored as
+        snapshot (referencing blob with code) if it is first revision,
+        snapshot interval was reached or diff against old_code isn't
+        smaller than code. Revisions over limit are pruned
+        """
+
+        numbers = self.filter(codespace=codespace).aggregate(
+            last=Max("number"),
+            last_snapshot=Max("number", filter=Q(is_snapshot=True)),
+        )
+        number = (numbers["last"] or 0) + 1
+
+        if (
+            old_code is not None
+            and numbers["last_snapshot"] is not None
+            and number - numbers["last_snapshot"]
+            < settings.CODESPACE_REVISION_SNAPSHOT_INTERVAL
+            and len(diff := self.model.make_diff(old_code, code)) < len(code)
+        ):
+            revision = self.create(codespace=codespace, number=number, data=diff)
+        else:
+            revision = self.create(
+                codespace=codespace,
+                number=number,
+                blob=self.__get_blob_model().objects.acquire(code),
+                is_snapshot=True,
+            )
+
+        self.prune(codespace, number)
+        return revision
+
+    def prune(self, codespace: models.Model, last: int) -> None:
+        """
+        Delete revisions before snapshot needed to reconstruct last
+        CODESPACE_REVISION_MAX_COUNT revisions and release their blobs
+        (so up to snapshot interval more revisions are kept)
+        """
+
+        max_count = settings.CODESPACE_REVISION_MAX_COUNT
+        if max_count <= 0 or last <= max_count:
+            return
+
+        oldest = (
+            self.filter(
+                codespace=codespace, number__lte=last - max_count + 1, is_snapshot=True
+            )
+            .order_by("-number")
+            .values_list("number", flat=True)
+            .first()
+        )
+        if oldest is None:
+            return
+
+        pruned = self.filter(codespace=codespace, number__lt=oldest)
+        hashes = list(pruned.filter(is_snapshot=True).values_list("blob", flat=True))
+        pruned.delete()
+        self.__get_blob_model().objects.release(*hashes)
+
+    def get_code(self, codespace: models.Model, number: int) -> str:
+        """
+        Return code of given revision, reconstructed from closest
+        snapshot and diffs after it. Raise DoesNotExist if revision
+        doesn't exist
+        """
+
+        snapshot = (
+            self.filter(codespace=codespace, number__lte=number, is_snapshot=True)
+            .order_by("-number")
+            .values_list("number", flat=True)
+            .first()
+        )
+        revisions = list(
+            self.filter(
+                codespace=codespace,
+                number__gte=snapshot or 0,
+                number__lte=number,
+            )
+            .order_by("number")
+            .values_list("number", "data", "blob__content")
+        )
+
+        if snapshot is None or revisions[-1][0] != number:
+            raise self.model.DoesNotExist("matching query does not exist.")
+
+        code = revisions[0][2]
+        for _, diff, _ in revisions[1:]:
+            code = self.model.apply_diff(code, diff)
+
+        return code
+
+    def __get_blob_model(self) -> type[models.Model]:
+        return self.model._meta.get_field("blob").related_model
+
+
 class TmpCodeSpaceManager(object):
     """
     Custom TmpCodeSpace manager
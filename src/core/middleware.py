@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from core.db.metrics import database_metrics
+from core.routers import start_replica_routing, end_replica_routing
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseMetricsMiddleware:
+    """
+    Middleware used to log number of database connections opened
+    during request and time spent opening them. If
+    DB_METRICS_SERVER_TIMING setting is enabled metrics are also
+    returned in Server-Timing response header
+    """
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        database_metrics.start_request()
+        response = self.get_response(request)
+        metrics = database_metrics.end_request()
+
+        logger.debug(
+            "%s %s opened %d database connection(s) in %.2f ms",
+            request.method,
+            request.path,
+            metrics["connections_opened"],
+            metrics["connect_seconds"] * 1000,
+        )
+
+        if getattr(settings, "DB_METRICS_SERVER_TIMING", False):
+            response["Server-Timing"] = (
+                f"db-connect;dur={metrics['connect_seconds'] * 1000:.2f}, "
+                f"db-connections;desc=\"{metrics['connections_opened']}\""
+            )
+
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware used to route read queries of safe requests to read
+    replicas. Requests with unsafe method and requests of clients which
+    wrote to database recently (marked with cookie) use only primary
+    database, so users always see their own changes
+    """
+
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        cookie_name = settings.REPLICA_STICKY_COOKIE_NAME
+        start_replica_routing(
+            use_primary=request.method not in self.safe_methods
+            or cookie_name in request.COOKIES
+        )
+
+        try:
+            response = self.get_response(request)
+        finally:
+            written = end_replica_routing()
+
+        # stick client to primary database until replicas catch up
+        if written:
+            response.set_cookie(
+                cookie_name,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite=settings.REPLICA_STICKY_COOKIE_SAMESITE,
+                secure=settings.REPLICA_STICKY_COOKIE_SAMESITE == "None",
+            )
+
+        return response
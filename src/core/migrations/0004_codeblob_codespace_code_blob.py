@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_remove_codespace_shared_with_codespace_code_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeBlob',
+            fields=[
+                ('hash', models.CharField(editable=False, max_length=64, primary_key=True, serialize=False, verbose_name='hash')),
+                ('content', models.TextField(verbose_name='content')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='reference count')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='codespace',
+            name='code_blob',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='codespaces', to='core.codeblob'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:05
+
+from django.db import migrations
+from django.db.models import Count
+import hashlib
+
+
+def move_code_to_blobs(apps, schema_editor):
+    """Store codespaces code in content addressed blobs"""
+
+    CodeSpace = apps.get_model('core', 'CodeSpace')
+    CodeBlob = apps.get_model('core', 'CodeBlob')
+
+    for codespace in CodeSpace.objects.only('uuid', 'code').iterator(chunk_size=500):
+        content_hash = hashlib.sha256(codespace.code.encode('utf8')).hexdigest()
+        CodeBlob.objects.get_or_create(
+            hash=content_hash, defaults={'content': codespace.code}
+        )
+        CodeSpace.objects.filter(uuid=codespace.uuid).update(code_blob=content_hash)
+
+    for blob in CodeBlob.objects.annotate(refs=Count('codespaces')).only('hash'):
+        CodeBlob.objects.filter(hash=blob.hash).update(ref_count=blob.refs)
+
+
+def move_blobs_to_code(apps, schema_editor):
+    """Copy blobs content back to codespaces"""
+
+    CodeSpace = apps.get_model('core', 'CodeSpace')
+
+    for codespace in CodeSpace.objects.select_related('code_blob').iterator(
+        chunk_size=500
+    ):
+        CodeSpace.objects.filter(uuid=codespace.uuid).update(
+            code=codespace.code_blob.content
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_codeblob_codespace_code_blob'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_code_to_blobs, move_blobs_to_code),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_move_codespace_code_to_codeblob'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='codespace',
+            name='code',
+        ),
+        migrations.AlterField(
+            model_name='codespace',
+            name='code_blob',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='codespaces', to='core.codeblob'),
+        ),
+    ]
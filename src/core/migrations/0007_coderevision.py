@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_remove_codespace_code_alter_codespace_code_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(editable=False, verbose_name='number')),
+                ('is_snapshot', models.BooleanField(default=False, verbose_name='is snapshot')),
+                ('data', models.TextField(verbose_name='data')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='date created')),
+                ('codespace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='core.codespace')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('codespace', 'number'), name='unique_codespace_revision')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+def set_code_summary(apps, schema_editor):
+    """Compute code summary of existing codespaces (once per blob)"""
+
+    CodeSpace = apps.get_model('core', 'CodeSpace')
+    CodeBlob = apps.get_model('core', 'CodeBlob')
+
+    for blob in CodeBlob.objects.iterator(chunk_size=500):
+        CodeSpace.objects.filter(code_blob=blob).update(
+            code_lines=len(blob.content.splitlines()),
+            code_size=len(blob.content.encode('utf8')),
+            code_preview=blob.content[:200],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_coderevision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codespace',
+            name='code_lines',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='code lines'),
+        ),
+        migrations.AddField(
+            model_name='codespace',
+            name='code_preview',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='code preview'),
+        ),
+        migrations.AddField(
+            model_name='codespace',
+            name='code_size',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='code size'),
+        ),
+        migrations.RunPython(set_code_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='queue',
+            field=models.CharField(blank=True, max_length=255, null=True, verbose_name='queue'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+import hashlib
+
+
+def move_snapshots_to_blobs(apps, schema_editor):
+    """Store code of revisions snapshots in content addressed blobs"""
+
+    CodeRevision = apps.get_model('core', 'CodeRevision')
+    CodeBlob = apps.get_model('core', 'CodeBlob')
+
+    snapshots = CodeRevision.objects.filter(is_snapshot=True, blob__isnull=True)
+    for revision in snapshots.only('id', 'data').iterator(chunk_size=500):
+        content_hash = hashlib.sha256(revision.data.encode('utf8')).hexdigest()
+        CodeBlob.objects.get_or_create(
+            hash=content_hash, defaults={'content': revision.data}
+        )
+        CodeBlob.objects.filter(hash=content_hash).update(
+            ref_count=F('ref_count') + 1
+        )
+        CodeRevision.objects.filter(id=revision.id).update(
+            blob=content_hash, data=''
+        )
+
+
+def move_blobs_to_snapshots(apps, schema_editor):
+    """Copy blobs content back to revisions snapshots"""
+
+    CodeRevision = apps.get_model('core', 'CodeRevision')
+    CodeBlob = apps.get_model('core', 'CodeBlob')
+
+    snapshots = CodeRevision.objects.filter(is_snapshot=True, blob__isnull=False)
+    for revision in snapshots.select_related('blob').iterator(chunk_size=500):
+        CodeRevision.objects.filter(id=revision.id).update(
+            data=revision.blob.content, blob=None
+        )
+        CodeBlob.objects.filter(hash=revision.blob_id).update(
+            ref_count=F('ref_count') - 1
+        )
+
+    CodeBlob.objects.filter(ref_count=0).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_emailoutbox_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coderevision',
+            name='blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='revisions', to='core.codeblob'),
+        ),
+        migrations.AlterField(
+            model_name='coderevision',
+            name='data',
+            field=models.TextField(blank=True, default='', verbose_name='data'),
+        ),
+        migrations.RunPython(move_snapshots_to_blobs, move_blobs_to_snapshots),
+    ]
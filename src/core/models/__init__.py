@@ -1,2 +1,5 @@
 from .user import User  # noqa
+from .blob import CodeBlob  # noqa
+from .revision import CodeRevision  # noqa
 from .codespace import CodeSpace, TmpCodeSpace  # noqa
+from .outbox import EmailOutbox  # noqa
@@ -0,0 +1,32 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from core.manager import CodeBlobManager
+import hashlib
+
+
+class CodeBlob(models.Model):
+    """
+    Class used to store codespace code. Blobs are content addressed
+    (primary key is hash of content), so codespaces with the same code
+    share one row. ref_count is number of codespaces and code revision
+    snapshots pointing at blob, blob is deleted when it drops to zero
+    """
+
+    objects = CodeBlobManager()
+
+    hash = models.CharField(
+        _("hash"),
+        primary_key=True,
+        editable=False,
+        max_length=64,
+    )
+    content = models.TextField(_("content"))
+    ref_count = models.PositiveIntegerField(_("reference count"), default=0)
+
+    @staticmethod
+    def get_content_hash(content: str) -> str:
+        """
+        Return sha256 hex digest of content, used as primary key
+        """
+
+        return hashlib.sha256(content.encode("utf8")).hexdigest()
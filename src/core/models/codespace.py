@@ -1,9 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from datetime import datetime
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
 from core.manager import CodeSpaceManager, TmpCodeSpaceManager
+from core.models.blob import CodeBlob
+from core.models.revision import CodeRevision
 from django.conf import settings
 from src import REDIS
 from typing import Union
@@ -84,10 +86,16 @@ class CodeSpace(models.Model, metaclass=CodeSpaceBase):
     redis_store_key = "uuid"
     # list of fields that will be stored in redis
     redis_store_fields = ["name", "code"]
+    # owner id stored in redis hash next to fields (ownership index)
+    redis_owner_field = "created_by_id"
     # list of fields that after setattribute will be changed in redis
     # this will be used to prevent from updating code value by serializers
     # value for code should be updated ONLY through websocket endpoint!
     redis_settable_fields = ["name"]
+    # number of code characters stored in code_preview field
+    code_preview_length = 200
+    # fields updated together with code
+    code_summary_fields = ["code_lines", "code_size", "code_preview"]
 
     objects = CodeSpaceManager()
 
@@ -104,9 +112,26 @@ class CodeSpace(models.Model, metaclass=CodeSpaceBase):
         blank=False,
         null=False,
     )
-    code = models.TextField(
-        _("code"),
-        default=get_default_code_value,
+    # code is stored in content addressed CodeBlob table
+    # (accessible through code property)
+    code_blob = models.ForeignKey(
+        CodeBlob,
+        # blobs are deleted only when they are no longer referenced
+        # (DO_NOTHING allows to delete them with single query)
+        on_delete=models.DO_NOTHING,
+        null=False,
+        blank=False,
+        editable=False,
+        related_name="codespaces",
+    )
+    # code summary, stored separately so codespaces can be
+    # listed without loading code
+    code_lines = models.PositiveIntegerField(
+        _("code lines"), default=0, editable=False
+    )
+    code_size = models.PositiveIntegerField(_("code size"), default=0, editable=False)
+    code_preview = models.CharField(
+        _("code preview"), default="", blank=True, max_length=255, editable=False
     )
     created_by = models.ForeignKey(
         get_user_model(),
@@ -125,6 +150,117 @@ class CodeSpace(models.Model, metaclass=CodeSpaceBase):
         auto_now=True,
     )
 
+    @property
+    def code(self) -> str:
+        """
+        Return codespace code, unsaved code set on instance
+        has priority over code stored in blob
+        """
+
+        if (code := self.__dict__.get("code")) is not None:
+            return code
+
+        return self.code_blob.content
+
+    @code.setter
+    def code(self, value: str) -> None:
+        """
+        Set code that will be stored in blob on save
+        """
+
+        self.__dict__["code"] = value
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Override save method to point codespace at blob with its code.
+        Blob is changed (and new code revision is created) only if code
+        content changed
+        """
+
+        code = self.__dict__.pop("code", None)
+        if code is None and self.code_blob_id is None:
+            code = get_default_code_value()
+
+        if code is None or CodeBlob.get_content_hash(code) == self.code_blob_id:
+            if not self._state.adding:
+                # blob references are changed only under row lock below,
+                # so (possibly stale) blob of instance isn't written back
+                kwargs["update_fields"] = self.__without_code_fields(
+                    kwargs.get("update_fields")
+                )
+            return super().save(*args, **kwargs)
+
+        # make sure blob and summary changes are saved when only
+        # some fields are updated
+        if (update_fields := kwargs.get("update_fields")) is not None:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "code_blob",
+                *self.code_summary_fields,
+            }
+
+        self.set_code_summary(code)
+
+        # blob references must change together with codespace row
+        with transaction.atomic():
+            # lock row and read blob that is actually stored, so concurrent
+            # saves of the same codespace don't release the same blob twice
+            released_hash = None
+            if not self._state.adding:
+                released_hash = (
+                    type(self)
+                    .objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("code_blob_id", flat=True)
+                    .first()
+                )
+
+            if released_hash == CodeBlob.get_content_hash(code):
+                self.code_blob_id = released_hash
+                return super().save(*args, **kwargs)
+
+            # revision diff base is code stored under the lock (code of
+            # last revision), not code of possibly stale instance
+            old_code = (
+                CodeBlob.objects.filter(hash=released_hash)
+                .values_list("content", flat=True)
+                .first()
+                if released_hash
+                else None
+            )
+            self.code_blob = CodeBlob.objects.acquire(code)
+            super().save(*args, **kwargs)
+            CodeBlob.objects.release(released_hash)
+            CodeRevision.objects.add(self, old_code, code)
+
+    def __without_code_fields(
+        self, update_fields: Union[list[str], None]
+    ) -> list[str]:
+        """
+        Return update_fields (all fields if None) without code blob
+        and code summary fields
+        """
+
+        if update_fields is None:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+            ]
+
+        code_fields = ("code_blob", *self.code_summary_fields)
+        return [field for field in update_fields if field not in code_fields]
+
+    def set_code_summary(self, code: str) -> None:
+        """
+        Set code summary fields (number of lines, size in bytes
+        and preview) based on given code
+        """
+
+        self.code_lines = len(code.splitlines())
+        self.code_size = len(code.encode("utf8"))
+        self.code_preview = code[:self.code_preview_length]
+
     @classmethod
     def is_cached_in_redis(cls, uuid: str) -> bool:
         """
@@ -133,11 +269,30 @@ class CodeSpace(models.Model, metaclass=CodeSpaceBase):
 
         return REDIS.exists(uuid)
 
+    @classmethod
+    def get_owner_id(cls, uuid: str) -> Union[str, None]:
+        """
+        Return id of codespace owner (None if codespace doesn't exist).
+        Owner id is read from redis and database is queried only if
+        codespace isn't cached
+        """
+
+        if (owner_id := REDIS.hget(uuid, cls.redis_owner_field)) is not None:
+            return owner_id
+
+        owner_id = (
+            cls.objects.filter(uuid=uuid)
+            .values_list("created_by_id", flat=True)
+            .first()
+        )
+        return None if owner_id is None else str(owner_id)
+
     @classmethod
     def save_redis_changes(cls, codespace) -> None:
         """
         This method is used to update postgres codespace data
-        with data stored in redis
+        with data stored in redis. Only changed fields are updated,
+        if nothing changed since last save nothing is written
         """
 
         uuid = str(codespace.uuid)
@@ -146,8 +301,29 @@ class CodeSpace(models.Model, metaclass=CodeSpaceBase):
 
         data = REDIS.hmget(uuid, *cls.redis_store_fields)
         data = {k: v for k, v in zip(cls.redis_store_fields, data)}
-        codespace.__dict__.update(**data)
-        codespace.save()
+
+        update_fields = []
+        for field, value in data.items():
+            if value is None:
+                continue
+
+            if field == "code":
+                # code is compared with hash of code stored in blob
+                if CodeBlob.get_content_hash(value) == codespace.code_blob_id:
+                    continue
+                update_field = "code_blob"
+            elif codespace.__dict__.get(field) == value:
+                # values loaded from database are stored in __dict__
+                # (getattr would return value from redis)
+                continue
+            else:
+                update_field = field
+
+            codespace.__dict__[field] = value
+            update_fields.append(update_field)
+
+        if update_fields:
+            codespace.save(update_fields=[*update_fields, "updated_at"])
 
     def __setattr__(self, name: str, value: str) -> None:
         """
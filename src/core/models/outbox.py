@@ -0,0 +1,28 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
+import uuid
+
+
+class EmailOutbox(models.Model):
+    """
+    Class used to store emails to send (email_sender task kwargs). Rows
+    are written in the same transaction as changes that caused them and
+    relayed to celery after commit, so emails match committed data.
+    Idempotency key is used as task id, so email relayed twice is sent once
+    """
+
+    idempotency_key = models.UUIDField(
+        _("idempotency key"),
+        unique=True,
+        editable=False,
+        default=uuid.uuid4,
+    )
+    task_kwargs = models.JSONField(_("task kwargs"))
+    # queue task is sent to (None to use CELERY_TASK_ROUTES)
+    queue = models.CharField(_("queue"), max_length=255, null=True, blank=True)
+    created_at = models.DateTimeField(
+        _("date created"),
+        default=timezone.now,
+        editable=False,
+    )
@@ -0,0 +1,88 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
+from core.manager import CodeRevisionManager
+from difflib import SequenceMatcher
+import json
+
+
+class CodeRevision(models.Model):
+    """
+    Class used to store history of codespace code. Every few revisions
+    full code is stored (snapshot), revisions in between store only
+    diff against previous revision, so history grows with size of edits
+    instead of size of code. Snapshots reference content addressed
+    CodeBlob (shared with codespaces with the same code), blob is
+    referenced as long as snapshot exists
+    """
+
+    objects = CodeRevisionManager()
+
+    codespace = models.ForeignKey(
+        "core.CodeSpace",
+        on_delete=models.CASCADE,
+        null=False,
+        blank=False,
+        related_name="revisions",
+    )
+    number = models.PositiveIntegerField(_("number"), editable=False)
+    is_snapshot = models.BooleanField(_("is snapshot"), default=False)
+    # code of snapshots
+    blob = models.ForeignKey(
+        "core.CodeBlob",
+        # blob is released when revision is deleted
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="revisions",
+    )
+    # json encoded diff (empty for snapshots)
+    data = models.TextField(_("data"), blank=True, default="")
+    created_at = models.DateTimeField(
+        _("date created"),
+        default=timezone.now,
+        editable=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["codespace", "number"], name="unique_codespace_revision"
+            )
+        ]
+
+    @staticmethod
+    def make_diff(old: str, new: str) -> str:
+        """
+        Return compact diff between old and new code. Diff is list of
+        [start, end, text] operations, each replacing old lines[start:end]
+        with text
+        """
+
+        old_lines = old.splitlines(keepends=True)
+        new_lines = new.splitlines(keepends=True)
+        operations = [
+            [i1, i2, "".join(new_lines[j1:j2])]
+            for tag, i1, i2, j1, j2 in SequenceMatcher(
+                None, old_lines, new_lines, autojunk=False
+            ).get_opcodes()
+            if tag != "equal"
+        ]
+        return json.dumps(operations, separators=(",", ":"))
+
+    @staticmethod
+    def apply_diff(old: str, diff: str) -> str:
+        """
+        Return code created by applying diff made by make_diff to old code
+        """
+
+        old_lines = old.splitlines(keepends=True)
+        result, position = [], 0
+        for start, end, text in json.loads(diff):
+            result.extend(old_lines[position:start])
+            result.append(text)
+            position = end
+
+        result.extend(old_lines[position:])
+        return "".join(result)
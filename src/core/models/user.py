@@ -9,6 +9,7 @@ from typing import Union
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.humanize.templatetags import humanize
+from core.passwords import password_hashing_pool
 
 
 class UserManager(BaseUserManager):
@@ -103,6 +104,43 @@ class User(AbstractBaseUser, PermissionsMixin):
     # override default user manager
     objects = UserManager()
 
+    def set_password(self, raw_password: Union[str, None]) -> None:
+        """Hash password in password hashing pool"""
+
+        self.password = password_hashing_pool.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password: str) -> bool:
+        """
+        Verify password in password hashing pool, update hash
+        if hasher or its parameters changed
+        """
+
+        def setter(raw_password: str) -> None:
+            self.set_password(raw_password)
+            # password hash upgrades shouldn't be considered password changes
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return password_hashing_pool.check_password(raw_password, self.password, setter)
+
+    async def acheck_password(self, raw_password: str) -> bool:
+        """
+        Verify password in password hashing pool without blocking event
+        loop (used by async authentication), update hash if hasher or its
+        parameters changed
+        """
+
+        async def setter(raw_password: str) -> None:
+            self.password = await password_hashing_pool.amake_password(raw_password)
+            # password hash upgrades shouldn't be considered password changes
+            self._password = None
+            await self.asave(update_fields=["password"])
+
+        return await password_hashing_pool.acheck_password(
+            raw_password, self.password, setter
+        )
+
     @property
     def last_login_humanize(self) -> str:
         """returns humanized last login date"""
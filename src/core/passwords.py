@@ -0,0 +1,186 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, check_password
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Union
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashingPool:
+    """
+    Class used to hash and verify passwords in bounded thread pool.
+    Hashers (PBKDF2 etc.) release GIL while hashing, so number of
+    passwords hashed at the same time is limited by pool size and burst
+    of logins waits in pool queue instead of taking CPU from unrelated
+    requests. Sync callers wait for result, async callers (amake_password,
+    acheck_password) await it without blocking event loop. Pool is
+    created lazily in every process (after fork), so bound is per process
+    (host hashes at most processes * pool size passwords at once). Saturation (hashes
+    waiting for worker) is logged at most once per log interval
+    """
+
+    def __init__(self, max_workers: int, log_interval: int = 60) -> None:
+        self.max_workers = max_workers
+        self.log_interval = log_interval
+        self.__executor = None
+        self.__executor_pid = None
+        self.__lock = threading.Lock()
+        self.__saturation_logged_at = None
+        # metrics
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+
+    def make_password(self, password: Union[str, None]) -> str:
+        """Return hashed password"""
+
+        return self.submit(make_password, password).result()
+
+    def check_password(
+        self,
+        password: str,
+        encoded: str,
+        setter: Union[Callable[[str], None], None] = None,
+    ) -> bool:
+        """
+        Return True if password matches encoded password. Setter is called
+        in calling thread (it usually saves user) if hash must be updated
+        """
+
+        is_correct, must_update = self.submit(
+            self.__check_password, password, encoded
+        ).result()
+        if setter and is_correct and must_update:
+            setter(password)
+
+        return is_correct
+
+    async def amake_password(self, password: Union[str, None]) -> str:
+        """Return hashed password without blocking event loop"""
+
+        return await asyncio.wrap_future(self.submit(make_password, password))
+
+    async def acheck_password(
+        self,
+        password: str,
+        encoded: str,
+        setter: Union[Callable[[str], None], None] = None,
+    ) -> bool:
+        """
+        Return True if password matches encoded password without blocking
+        event loop. Setter is called (and awaited if it is coroutine
+        function) if hash must be updated
+        """
+
+        is_correct, must_update = await asyncio.wrap_future(
+            self.submit(self.__check_password, password, encoded)
+        )
+        if setter and is_correct and must_update:
+            if asyncio.iscoroutinefunction(setter):
+                await setter(password)
+            else:
+                setter(password)
+
+        return is_correct
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        Run fn in pool (or in calling thread if pool is disabled)
+        and return its future
+        """
+
+        if self.max_workers <= 0:
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+        with self.__lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            log_saturation = self.__should_log_saturation()
+
+        if log_saturation:
+            logger.warning("Password hashing pool saturated: %s", self.get_stats())
+
+        future = self.__get_executor().submit(self.__run, time.monotonic(), fn, *args)
+        future.add_done_callback(self.__on_done)
+        return future
+
+    def get_stats(self) -> dict:
+        """
+        Return pool metrics, saturation is ratio of hashes in flight
+        (running and queued) to number of workers
+        """
+
+        with self.__lock:
+            return {
+                "workers": self.max_workers,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queued": max(0, self.in_flight - self.max_workers),
+                "completed": self.completed,
+                "wait_seconds_total": self.wait_seconds_total,
+                "saturation": self.in_flight / max(1, self.max_workers),
+            }
+
+    def __should_log_saturation(self) -> bool:
+        """Check if hash waits for worker and saturation wasn't logged recently"""
+
+        if self.in_flight <= self.max_workers:
+            return False
+
+        now = time.monotonic()
+        if (
+            self.__saturation_logged_at is not None
+            and now - self.__saturation_logged_at < self.log_interval
+        ):
+            return False
+
+        self.__saturation_logged_at = now
+        return True
+
+    def __run(self, submitted_at: float, fn: Callable, *args):
+        waited = time.monotonic() - submitted_at
+        with self.__lock:
+            self.wait_seconds_total += waited
+
+        return fn(*args)
+
+    def __on_done(self, future: Future) -> None:
+        with self.__lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        if self.__executor_pid != os.getpid():
+            with self.__lock:
+                if self.__executor_pid != os.getpid():
+                    self.__executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hashing",
+                    )
+                    self.__executor_pid = os.getpid()
+
+        return self.__executor
+
+    @staticmethod
+    def __check_password(password: str, encoded: str) -> tuple[bool, bool]:
+        """Return tuple (is_correct, must_update)"""
+
+        must_update = []
+        is_correct = check_password(
+            password, encoded, setter=lambda _: must_update.append(True)
+        )
+        return is_correct, bool(must_update)
+
+
+password_hashing_pool = PasswordHashingPool(
+    max_workers=settings.PASSWORD_HASHING_POOL_SIZE,
+    log_interval=settings.PASSWORD_HASHING_POOL_LOG_INTERVAL,
+)
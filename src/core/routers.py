@@ -0,0 +1,70 @@
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.models import Model
+from typing import Union
+import random
+
+PRIMARY_DATABASE = "default"
+
+# Routing state of current request, set by ReplicaRoutingMiddleware.
+# When it is None (e.g. celery worker, management command) all
+# queries are routed to primary database
+_routing_state = ContextVar("replica_routing_state", default=None)
+
+
+def start_replica_routing(use_primary: bool = False) -> None:
+    """
+    Allow routing read queries of current request to replicas,
+    unless use_primary is True
+    """
+
+    _routing_state.set({"use_primary": use_primary, "written": False})
+
+
+def end_replica_routing() -> bool:
+    """
+    Stop routing read queries to replicas and return True
+    if any write query was executed
+    """
+
+    state = _routing_state.get()
+    _routing_state.set(None)
+    return bool(state and state["written"])
+
+
+def get_replica_databases() -> list[str]:
+    """Return aliases of configured read replicas"""
+
+    return [alias for alias in settings.DATABASES if alias.startswith("replica")]
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router that sends read queries to one of replicas and
+    write queries to primary database. After first write, reads of
+    the same request are sent to primary (read your writes)
+    """
+
+    def db_for_read(self, model: type[Model], **hints) -> str:
+        state = _routing_state.get()
+        if state is None or state["use_primary"] or state["written"]:
+            return PRIMARY_DATABASE
+
+        if replicas := get_replica_databases():
+            return random.choice(replicas)
+
+        return PRIMARY_DATABASE
+
+    def db_for_write(self, model: type[Model], **hints) -> str:
+        if (state := _routing_state.get()) is not None:
+            state["written"] = True
+
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> Union[bool, None]:
+        # replicas contain the same data as primary database
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        # replicas are migrated through replication
+        return db == PRIMARY_DATABASE
@@ -0,0 +1,129 @@
+from django.test import SimpleTestCase
+from unittest import mock
+from celery import Celery
+from celery.app.task import Context
+from celery.contrib.testing.worker import start_worker
+from src.celery_metrics import CeleryMetrics, celery_metrics
+from src import REDIS
+import threading
+import time
+
+
+class TestCeleryMetrics(SimpleTestCase):
+    """
+    Class used to test CeleryMetrics
+    """
+
+    def setUp(self):
+        self.metrics = CeleryMetrics()
+        self.metrics.hostname = "celery@test"
+        REDIS.delete(self.metrics.get_key())
+        self.addCleanup(REDIS.delete, self.metrics.get_key())
+
+    def test_task_published(self):
+        """
+        Test if publish time is added to headers (but not replaced)
+        """
+
+        headers = {}
+        self.metrics.task_published(headers)
+        self.assertAlmostEqual(headers["enqueued_at"], time.time(), delta=1)
+
+        headers = {"enqueued_at": 1.0}
+        self.metrics.task_published(headers)
+        self.assertEqual(headers["enqueued_at"], 1.0)
+
+    def test_task_metrics(self):
+        """
+        Test if wait, execution time and outcome of tasks are rendered
+        """
+
+        for task_id, enqueued_at, state in (
+            ("1", time.time() - 7, "SUCCESS"),
+            ("2", time.time(), "RETRY"),
+        ):
+            self.metrics.task_started(task_id, Context(enqueued_at=enqueued_at))
+            self.metrics.task_finished(task_id, "emails.tasks.EmailSender", state)
+
+        output = self.metrics.render()
+
+        task = 'task="emails.tasks.EmailSender"'
+        self.assertIn(f'celery_task_wait_seconds_bucket{{{task},le="5"}} 1', output)
+        self.assertIn(f'celery_task_wait_seconds_bucket{{{task},le="10"}} 2', output)
+        self.assertIn(f"celery_task_wait_seconds_count{{{task}}} 2", output)
+        self.assertIn(
+            f'celery_task_runtime_seconds_bucket{{{task},le="+Inf"}} 2', output
+        )
+        self.assertIn(f'celery_tasks_total{{{task},state="SUCCESS"}} 1', output)
+        self.assertIn(f'celery_tasks_total{{{task},state="RETRY"}} 1', output)
+
+    def test_wait_measured_from_eta(self):
+        """
+        Test if wait of task with eta is measured from eta
+        """
+
+        request = Context(
+            enqueued_at=time.time() - 60,
+            eta=time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
+        )
+        self.metrics.task_started("1", request)
+        self.metrics.task_finished("1", "task", "SUCCESS")
+
+        self.assertIn(
+            'celery_task_wait_seconds_bucket{task="task",le="1"} 1',
+            self.metrics.render(),
+        )
+
+    def test_sample_queue_lengths(self):
+        """
+        Test if length of queues is sampled and rendered
+        """
+
+        mocked_app = mock.MagicMock()
+        channel = mocked_app.connection_for_read().__enter__().default_channel
+        channel.queue_declare.return_value.message_count = 3
+
+        self.metrics.sample_queue_lengths(mocked_app, ["emails_high"])
+
+        channel.queue_declare.assert_called_once_with(queue="emails_high", passive=True)
+        self.assertIn(
+            'celery_queue_length{queue="emails_high"} 3', self.metrics.render()
+        )
+
+
+class TestCeleryMetricsSignals(SimpleTestCase):
+    """
+    Class used to test metrics recorded by signal handlers of task
+    published to broker and executed by worker
+    """
+
+    def setUp(self):
+        self.app = Celery("test", broker="memory://", set_as_current=False)
+        self.requests = []
+        self.executed = threading.Event()
+
+        @self.app.task(name="test.celery_metrics", bind=True)
+        def task(self_task):
+            self.requests.append(self_task.request)
+            self.executed.set()
+
+        self.task = task
+        self.addCleanup(REDIS.delete, celery_metrics.get_key())
+
+    def test_enqueued_at_reaches_worker(self):
+        """
+        Test if publish time header reaches request of task executed
+        by worker and wait of task is recorded
+        """
+
+        published_at = time.time()
+        with start_worker(self.app, pool="solo", perform_ping_check=False):
+            self.task.delay()
+            self.assertTrue(self.executed.wait(timeout=10))
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertGreaterEqual(self.requests[0].enqueued_at, published_at)
+        self.assertIn(
+            'celery_task_wait_seconds_count{task="test.celery_metrics"} 1',
+            celery_metrics.render(),
+        )
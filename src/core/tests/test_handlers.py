@@ -1,7 +1,11 @@
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
 from unittest.mock import patch, MagicMock
 from core.models import CodeSpace
-from core.handlers.codespace import save_codespace_data_to_redis
+from core.handlers.codespace import (
+    save_codespace_data_to_redis,
+    unlink_codespaces_data_from_redis,
+)
+from django.contrib.auth import get_user_model
 from django.db.models.signals import post_delete, post_save
 from core.signals import post_get
 import fakeredis
@@ -10,14 +14,46 @@ import fakeredis
 class TestCodeSpaceHandlers(SimpleTestCase):
     """Test codespace signals handlers"""
 
+    @patch("core.handlers.codespace.CodeBlob.objects.release")
     @patch("core.handlers.codespace.REDIS.delete")
-    def test_codespace_post_delete_handler(self, patched_redis_delete):
+    def test_codespace_post_delete_handler(
+        self, patched_redis_delete, patched_release
+    ):
         """Test if REDIS.delete is called after codespace post_delete signal"""
         MockInstance = MagicMock()
         MockInstance.uuid = "mocked_uuid"
+        MockInstance.code_blob_id = "mocked_hash"
         post_delete.send(sender=CodeSpace, instance=MockInstance)
         self.assertEqual(1, patched_redis_delete.call_count)
         patched_redis_delete.assert_called_with("mocked_uuid")
+        patched_release.assert_called_once_with("mocked_hash")
+
+    @patch("core.handlers.codespace.REDIS.delete")
+    def test_codespace_post_delete_handler_in_user_cascade(
+        self, patched_redis_delete
+    ):
+        """Test if key is collected on origin user instead of deleted"""
+        MockInstance = MagicMock()
+        MockInstance.uuid = "mocked_uuid"
+        user = get_user_model()(email="test@example.com")
+        post_delete.send(sender=CodeSpace, instance=MockInstance, origin=user)
+        self.assertEqual(0, patched_redis_delete.call_count)
+        self.assertEqual(user.deleted_codespaces_keys, ["mocked_uuid"])
+
+    @patch("core.handlers.codespace.REDIS")
+    def test_unlink_codespaces_data_from_redis(self, patched_redis):
+        """Test if keys are unlinked in chunks using single pipeline"""
+        r = fakeredis.FakeRedis(decode_responses=True)
+        keys = [f"key_{i}" for i in range(5)]
+        for key in keys:
+            r.hset(key, "code", "some_code")
+        patched_redis.pipeline.side_effect = r.pipeline
+
+        with self.settings(CODESPACE_REDIS_UNLINK_CHUNK_SIZE=2):
+            unlink_codespaces_data_from_redis(keys)
+
+        self.assertEqual(patched_redis.pipeline.call_count, 1)
+        self.assertEqual(r.exists(*keys), 0)
 
     @patch("core.handlers.codespace.REDIS")
     def test_save_codespace_data_to_redis(self, patched_redis):
@@ -56,3 +92,70 @@ class TestCodeSpaceHandlers(SimpleTestCase):
         patched_save_codespace_data_to_redis.assert_called_with(
             CodeSpace, "test_created_instance"
         )
+
+
+class TestCodeSpaceQuerySetDelete(TestCase):
+    """Test deleting codespaces with queryset"""
+
+    @patch("core.handlers.codespace.unlink_codespaces_data_from_redis")
+    @patch("core.handlers.codespace.REDIS.delete")
+    def test_queryset_delete_unlinks_codespaces_in_batch(
+        self, patched_redis_delete, patched_unlink
+    ):
+        """Test if codespaces keys are unlinked once after queryset delete"""
+        user = get_user_model().objects.create_user(email="test@example.com")
+        codespaces = [CodeSpace.objects.create(created_by=user) for _ in range(3)]
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            CodeSpace.objects.filter(created_by=user).delete()
+            patched_unlink.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(patched_redis_delete.call_count, 0)
+        patched_unlink.assert_called_once()
+        self.assertCountEqual(
+            patched_unlink.call_args.args[0], [str(c.uuid) for c in codespaces]
+        )
+
+
+class TestUserHandlers(TestCase):
+    """Test user signals handlers"""
+
+    @patch("core.handlers.users.user_cache")
+    @patch("core.handlers.users.unlink_codespaces_data_from_redis")
+    @patch("core.handlers.codespace.REDIS.delete")
+    def test_user_delete_unlinks_codespaces_in_batch(
+        self, patched_redis_delete, patched_unlink, _
+    ):
+        """Test if codespaces keys are unlinked once after user is deleted"""
+        user = get_user_model().objects.create_user(email="test@example.com")
+        codespaces = [CodeSpace.objects.create(created_by=user) for _ in range(3)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.delete()
+
+        self.assertEqual(patched_redis_delete.call_count, 0)
+        patched_unlink.assert_called_once()
+        self.assertCountEqual(
+            patched_unlink.call_args.args[0], [str(c.uuid) for c in codespaces]
+        )
+
+    @patch("core.handlers.users.user_cache.delete")
+    def test_user_is_removed_from_cache(self, patched_cache_delete):
+        """Test if cached user is invalidated after update and delete"""
+        user = get_user_model().objects.create_user(email="test@example.com")
+        patched_cache_delete.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.is_active = False
+            user.save()
+
+        self.assertEqual(patched_cache_delete.call_count, 2)
+        patched_cache_delete.assert_called_with(user.pk)
+
+        user_pk = user.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            user.delete()
+
+        self.assertEqual(patched_cache_delete.call_count, 4)
+        patched_cache_delete.assert_called_with(user_pk)
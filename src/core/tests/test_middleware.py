@@ -0,0 +1,86 @@
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from django.http import HttpResponse
+from core.middleware import DatabaseMetricsMiddleware, ReplicaRoutingMiddleware
+from core.db.metrics import database_metrics
+from core.routers import PrimaryReplicaRouter
+from core.models import CodeSpace
+from unittest.mock import patch
+
+
+class TestDatabaseMetricsMiddleware(SimpleTestCase):
+    """Test DatabaseMetricsMiddleware"""
+
+    def setUp(self):
+        self.request = RequestFactory().get(path="/some_path/")
+
+    def get_response(self, request):
+        """Mocked view which opens two database connections"""
+        database_metrics.record_connect(0.002)
+        database_metrics.record_connect(0.001)
+        return HttpResponse()
+
+    @override_settings(DB_METRICS_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        """Test if request connection metrics are returned in header"""
+
+        response = DatabaseMetricsMiddleware(self.get_response)(self.request)
+        self.assertEqual(
+            response["Server-Timing"],
+            'db-connect;dur=3.00, db-connections;desc="2"',
+        )
+
+    @override_settings(DB_METRICS_SERVER_TIMING=False)
+    def test_without_server_timing_header(self):
+        """Test if header isn't set and totals are still updated"""
+
+        total = database_metrics.connections_opened_total
+        response = DatabaseMetricsMiddleware(self.get_response)(self.request)
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertEqual(database_metrics.connections_opened_total, total + 2)
+
+    def test_record_connect_outside_request(self):
+        """Test if connection opened outside request updates only totals"""
+
+        total = database_metrics.connections_opened_total
+        database_metrics.record_connect(0.001)
+        self.assertEqual(database_metrics.connections_opened_total, total + 1)
+        self.assertIsNone(database_metrics.end_request())
+
+
+@patch("core.routers.get_replica_databases", return_value=["replica_0"])
+class TestReplicaRoutingMiddleware(SimpleTestCase):
+    """Test ReplicaRoutingMiddleware"""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def get_response(self, write=False):
+        """Return mocked view which saves read database alias"""
+
+        def view(request):
+            if write:
+                self.router.db_for_write(CodeSpace)
+            self.read_db = self.router.db_for_read(CodeSpace)
+            return HttpResponse()
+
+        return view
+
+    def test_safe_request_reads_from_replica(self, *patches):
+        middleware = ReplicaRoutingMiddleware(self.get_response())
+        response = middleware(self.factory.get("/some_path/"))
+        self.assertEqual(self.read_db, "replica_0")
+        self.assertNotIn("use_primary_db", response.cookies)
+
+    def test_unsafe_request_reads_from_primary(self, *patches):
+        middleware = ReplicaRoutingMiddleware(self.get_response(write=True))
+        response = middleware(self.factory.post("/some_path/"))
+        self.assertEqual(self.read_db, "default")
+        self.assertIn("use_primary_db", response.cookies)
+
+    def test_sticky_cookie_reads_from_primary(self, *patches):
+        middleware = ReplicaRoutingMiddleware(self.get_response())
+        request = self.factory.get("/some_path/")
+        request.COOKIES["use_primary_db"] = "1"
+        middleware(request)
+        self.assertEqual(self.read_db, "default")
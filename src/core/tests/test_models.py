@@ -1,10 +1,12 @@
-from django.test import TestCase, SimpleTestCase
+from django.test import TestCase, SimpleTestCase, override_settings
 from django.contrib.auth import get_user_model
-from core.models import CodeSpace, TmpCodeSpace
+from core.models import CodeSpace, TmpCodeSpace, CodeBlob, CodeRevision
 from unittest.mock import patch, Mock
+import asyncio
 import fakeredis
 import uuid
 from django.core.exceptions import ObjectDoesNotExist
+from src import REDIS
 
 
 class UserModelTests(TestCase):
@@ -23,6 +25,14 @@ class UserModelTests(TestCase):
         self.assertTrue(user.check_password(self.password))
         self.assertTrue(True not in [user.is_staff, user.is_superuser])
 
+    def test_check_password_async(self):
+        user = get_user_model().objects.create_user(
+            email=self.email,
+            password=self.password,
+        )
+        self.assertTrue(asyncio.run(user.acheck_password(self.password)))
+        self.assertFalse(asyncio.run(user.acheck_password("wrong_password")))
+
     def test_can_create_superuser(self):
         superuser = get_user_model().objects.create_superuser(
             email=self.email,
@@ -109,6 +119,302 @@ class CodeSpaceModelTests(TestCase):
         for field in CodeSpace.redis_store_fields:
             self.assertEqual(self.codespace.__dict__.get(field), f"redis_{field}")
 
+    def test_get_owner_id(self):
+        """Owner id should be read from redis or database on cache miss"""
+
+        uuid_ = str(self.codespace.uuid)
+        with self.assertNumQueries(0):
+            self.assertEqual(CodeSpace.get_owner_id(uuid_), str(self.user.pk))
+
+        REDIS.delete(uuid_)
+        with self.assertNumQueries(1):
+            self.assertEqual(CodeSpace.get_owner_id(uuid_), str(self.user.pk))
+
+        self.assertIsNone(CodeSpace.get_owner_id(str(uuid.uuid4())))
+
+
+class SaveRedisChangesTests(TestCase):
+    """Test CodeSpace.save_redis_changes change detection"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword123",
+        )
+        self.codespace = CodeSpace.objects.create(
+            created_by=self.user, name="name", code="code"
+        )
+        self.codespace = CodeSpace.objects.get(uuid=self.codespace.uuid)
+
+    def save_redis_changes(self, name: str, code: str) -> Mock:
+        """Helper function which save redis data and return mocked save"""
+
+        with patch("core.models.codespace.REDIS") as patched_redis, patch(
+            "core.models.codespace.CodeSpace.save"
+        ) as patched_save, patch(
+            "core.models.codespace.CodeSpace.is_cached_in_redis", return_value=True
+        ):
+            patched_redis.hmget.return_value = [name, code]
+            CodeSpace.save_redis_changes(self.codespace)
+
+        return patched_save
+
+    def test_unchanged_data_is_not_saved(self):
+        patched_save = self.save_redis_changes("name", "code")
+        self.assertEqual(patched_save.call_count, 0)
+
+    def test_only_changed_name_is_saved(self):
+        patched_save = self.save_redis_changes("new name", "code")
+        patched_save.assert_called_once_with(update_fields=["name", "updated_at"])
+
+    def test_only_changed_code_is_saved(self):
+        patched_save = self.save_redis_changes("name", "new code")
+        patched_save.assert_called_once_with(
+            update_fields=["code_blob", "updated_at"]
+        )
+
+    def test_code_summary_is_updated_with_code(self):
+        """Test if code summary fields are saved together with code"""
+
+        self.assertEqual(self.codespace.code_lines, 1)
+        REDIS.hset(str(self.codespace.uuid), "code", "a\nb\nc\n")
+        CodeSpace.save_redis_changes(self.codespace)
+        codespace = CodeSpace.objects.get(uuid=self.codespace.uuid)
+        self.assertEqual(codespace.code_lines, 3)
+        self.assertEqual(codespace.code_size, 6)
+        self.assertEqual(codespace.code_preview, "a\nb\nc\n")
+
+    def test_changed_code_is_stored_in_database(self):
+        """Test if code changed in redis is saved with partial update"""
+
+        REDIS.hset(str(self.codespace.uuid), "code", "new code")
+        CodeSpace.save_redis_changes(self.codespace)
+        codespace = CodeSpace.objects.select_related("code_blob").get(
+            uuid=self.codespace.uuid
+        )
+        self.assertEqual(codespace.code_blob.content, "new code")
+        self.assertEqual(codespace.__dict__["name"], "name")
+
+
+class CodeBlobModelTests(TestCase):
+    """Test CodeBlob Model"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword123",
+        )
+
+    def get_blob(self, code: str) -> CodeBlob:
+        """Helper function which return blob with given code"""
+        return CodeBlob.objects.get(hash=CodeBlob.get_content_hash(code))
+
+    def test_codespaces_with_same_code_share_blob(self):
+        """Codespaces with the same code should point at one blob"""
+
+        first = CodeSpace.objects.create(created_by=self.user)
+        second = CodeSpace.objects.create(created_by=self.user)
+        self.assertEqual(first.code_blob_id, second.code_blob_id)
+        self.assertEqual(CodeBlob.objects.count(), 1)
+        # referenced by codespaces and their first revisions
+        self.assertEqual(self.get_blob(first.code).ref_count, 4)
+
+    @override_settings(CODESPACE_REVISION_MAX_COUNT=1)
+    def test_changing_code_moves_reference(self):
+        """Old blob should be deleted when it is no longer referenced"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code="old")
+        codespace.code = "new"
+        codespace.save()
+        self.assertFalse(CodeBlob.objects.filter(content="old").exists())
+        # referenced by codespace and its last revision
+        self.assertEqual(self.get_blob("new").ref_count, 2)
+
+    def test_save_with_unchanged_code(self):
+        """Blob shouldn't be acquired if code didn't change"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code="code")
+        codespace.code = "code"
+        with patch("core.models.codespace.CodeBlob.objects.acquire") as acquire:
+            codespace.save()
+        self.assertEqual(acquire.call_count, 0)
+
+    @override_settings(CODESPACE_REVISION_MAX_COUNT=1)
+    def test_concurrent_saves_move_references_once(self):
+        """
+        Blob references should be moved from blob stored in database,
+        not from blob of stale instance
+        """
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code="old")
+        first = CodeSpace.objects.get(uuid=codespace.uuid)
+        second = CodeSpace.objects.get(uuid=codespace.uuid)
+
+        first.code = "first"
+        first.save()
+        second.code = "second"
+        second.save()
+
+        self.assertEqual(
+            list(CodeBlob.objects.values_list("content", "ref_count")),
+            [("second", 2)],
+        )
+
+    def test_stale_instance_doesnt_overwrite_blob(self):
+        """Saving stale instance without code shouldn't change its blob"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code="old")
+        stale = CodeSpace.objects.get(uuid=codespace.uuid)
+        codespace.code = "new"
+        codespace.save()
+
+        stale.name = "new name"
+        stale.save()
+
+        codespace = CodeSpace.objects.get(uuid=codespace.uuid)
+        self.assertEqual(codespace.code_blob_id, CodeBlob.get_content_hash("new"))
+        self.assertEqual(codespace.__dict__["name"], "new name")
+
+    def test_deleting_codespace_releases_blob(self):
+        """Blob should be deleted with last codespace pointing at it"""
+
+        first = CodeSpace.objects.create(created_by=self.user, code="code")
+        second = CodeSpace.objects.create(created_by=self.user, code="code")
+        first.delete()
+        self.assertEqual(self.get_blob("code").ref_count, 2)
+        second.delete()
+        self.assertFalse(CodeBlob.objects.exists())
+
+    def test_deleting_user_releases_blobs(self):
+        """Blobs of codespaces deleted in cascade should be released"""
+
+        CodeSpace.objects.create(created_by=self.user, code="code")
+        CodeSpace.objects.create(created_by=self.user, code="code")
+        self.user.delete()
+        self.assertFalse(CodeBlob.objects.exists())
+
+
+class CodeRevisionModelTests(TestCase):
+    """Test CodeRevision Model"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpassword123",
+        )
+        self.codes = ["".join(f"line {i}\n" for i in range(100))]
+        for n in range(1, 6):
+            lines = self.codes[-1].splitlines(keepends=True)
+            lines[n * 10] = f"changed line {n}\n"
+            self.codes.append("".join(lines))
+
+    def test_make_and_apply_diff(self):
+        """Applying diff to old code should return new code"""
+
+        old, new = "a\nb\nc\n", "a\nB\nc\nd"
+        diff = CodeRevision.make_diff(old, new)
+        self.assertEqual(CodeRevision.apply_diff(old, diff), new)
+
+    @override_settings(CODESPACE_REVISION_SNAPSHOT_INTERVAL=3)
+    def test_snapshots_and_diffs(self):
+        """Every third revision should be snapshot, others store small diffs"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code=self.codes[0])
+        for code in self.codes[1:]:
+            codespace.code = code
+            codespace.save()
+
+        revisions = CodeRevision.objects.filter(codespace=codespace).order_by("number")
+        self.assertEqual(
+            [r.is_snapshot for r in revisions],
+            [True, False, False, True, False, False],
+        )
+        for revision in revisions:
+            if not revision.is_snapshot:
+                self.assertLess(len(revision.data), 100)
+
+        for number, code in enumerate(self.codes, start=1):
+            self.assertEqual(CodeRevision.objects.get_code(codespace, number), code)
+
+    def test_snapshot_references_blob(self):
+        """Snapshot should keep blob with its code after codespace moved"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code=self.codes[0])
+        codespace.code = "new code"
+        codespace.save()
+
+        revision = CodeRevision.objects.get(codespace=codespace, number=1)
+        self.assertEqual(revision.blob_id, CodeBlob.get_content_hash(self.codes[0]))
+        self.assertEqual(revision.data, "")
+        self.assertEqual(revision.blob.ref_count, 1)
+        self.assertEqual(CodeRevision.objects.get_code(codespace, 1), self.codes[0])
+
+    @override_settings(
+        CODESPACE_REVISION_SNAPSHOT_INTERVAL=2, CODESPACE_REVISION_MAX_COUNT=3
+    )
+    def test_old_revisions_are_pruned(self):
+        """Revisions before snapshot of last kept revisions should be deleted"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code=self.codes[0])
+        for code in self.codes[1:]:
+            codespace.code = code
+            codespace.save()
+
+        # revisions 1-6, snapshots 1, 3, 5, last 3 revisions need snapshot 3
+        self.assertEqual(
+            list(
+                CodeRevision.objects.filter(codespace=codespace)
+                .order_by("number")
+                .values_list("number", flat=True)
+            ),
+            [3, 4, 5, 6],
+        )
+        self.assertFalse(
+            CodeBlob.objects.filter(
+                hash=CodeBlob.get_content_hash(self.codes[0])
+            ).exists()
+        )
+        for number in range(3, 7):
+            self.assertEqual(
+                CodeRevision.objects.get_code(codespace, number),
+                self.codes[number - 1],
+            )
+        with self.assertRaises(CodeRevision.DoesNotExist):
+            CodeRevision.objects.get_code(codespace, 2)
+
+    def test_deleting_codespace_releases_snapshots_blobs(self):
+        """Blobs referenced only by revisions should be deleted with codespace"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code=self.codes[0])
+        codespace.code = "new code"
+        codespace.save()
+
+        codespace.delete()
+        self.assertFalse(CodeBlob.objects.exists())
+
+    def test_concurrent_saves_diff_against_stored_code(self):
+        """Revisions saved from stale instance should rebuild to its code"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user, code=self.codes[0])
+        first = CodeSpace.objects.get(uuid=codespace.uuid)
+        second = CodeSpace.objects.get(uuid=codespace.uuid)
+
+        first.code = self.codes[1]
+        first.save()
+        second.code = self.codes[2]
+        second.save()
+
+        revision = CodeRevision.objects.get(codespace=codespace, number=3)
+        self.assertFalse(revision.is_snapshot)
+        self.assertEqual(CodeRevision.objects.get_code(codespace, 3), self.codes[2])
+
+    def test_get_code_of_missing_revision(self):
+        """DoesNotExist should be raised for not existing revision"""
+
+        codespace = CodeSpace.objects.create(created_by=self.user)
+        with self.assertRaises(CodeRevision.DoesNotExist):
+            CodeRevision.objects.get_code(codespace, 2)
+
 
 class TmpCodeSpaceTests(SimpleTestCase):
     """Test TmpCodeSpace"""
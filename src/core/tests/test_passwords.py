@@ -0,0 +1,70 @@
+from django.test import SimpleTestCase, override_settings
+from django.contrib.auth.hashers import make_password, PBKDF2SHA1PasswordHasher
+from unittest.mock import AsyncMock, Mock
+from core.passwords import PasswordHashingPool
+import asyncio
+import threading
+
+
+@override_settings(
+    PASSWORD_HASHERS=[
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    ]
+)
+class TestPasswordHashingPool(SimpleTestCase):
+    """Test PasswordHashingPool Class"""
+
+    def setUp(self):
+        self.pool = PasswordHashingPool(max_workers=2)
+
+    def test_make_and_check_password(self):
+        encoded = self.pool.make_password("password1")
+        self.assertTrue(self.pool.check_password("password1", encoded))
+        self.assertFalse(self.pool.check_password("password2", encoded))
+        self.assertEqual(self.pool.get_stats()["completed"], 3)
+        self.assertEqual(self.pool.get_stats()["in_flight"], 0)
+
+    def test_setter_is_called_if_hash_must_be_updated(self):
+        setter = Mock()
+        encoded = PBKDF2SHA1PasswordHasher().encode("password1", "salt", iterations=1)
+
+        self.assertTrue(self.pool.check_password("password1", encoded, setter))
+        setter.assert_called_once_with("password1")
+
+        setter.reset_mock()
+        self.pool.check_password("password2", encoded, setter)
+        setter.assert_not_called()
+
+    def test_async_interface(self):
+        setter = AsyncMock()
+        encoded = asyncio.run(self.pool.amake_password("password1"))
+
+        self.assertTrue(asyncio.run(self.pool.acheck_password("password1", encoded)))
+        self.assertFalse(asyncio.run(self.pool.acheck_password("password2", encoded)))
+
+        encoded = PBKDF2SHA1PasswordHasher().encode("password1", "salt", iterations=1)
+        self.assertTrue(
+            asyncio.run(self.pool.acheck_password("password1", encoded, setter))
+        )
+        setter.assert_awaited_once_with("password1")
+
+    def test_saturation_is_logged(self):
+        pool = PasswordHashingPool(max_workers=1, log_interval=60)
+        released = threading.Event()
+        futures = [pool.submit(released.wait, 5)]
+
+        with self.assertLogs("core.passwords", level="WARNING") as logs:
+            futures += [pool.submit(released.wait, 5) for _ in range(2)]
+        released.set()
+        for future in futures:
+            future.result(timeout=5)
+
+        # logged once per interval
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("saturated", logs.output[0])
+
+    def test_disabled_pool(self):
+        pool = PasswordHashingPool(max_workers=0)
+        self.assertTrue(pool.check_password("password1", make_password("password1")))
+        self.assertEqual(pool.get_stats()["completed"], 0)
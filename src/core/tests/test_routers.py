@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase
+from unittest.mock import patch
+from core.models import CodeSpace
+from core.routers import (
+    PrimaryReplicaRouter,
+    start_replica_routing,
+    end_replica_routing,
+)
+
+
+@patch("core.routers.get_replica_databases", return_value=["replica_0"])
+class TestPrimaryReplicaRouter(SimpleTestCase):
+    """Test PrimaryReplicaRouter"""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def tearDown(self):
+        end_replica_routing()
+
+    def test_read_outside_request(self, *patches):
+        """Reads outside request should use primary database"""
+
+        self.assertEqual(self.router.db_for_read(CodeSpace), "default")
+
+    def test_read_in_request(self, *patches):
+        """Reads of safe request should use replica"""
+
+        start_replica_routing()
+        self.assertEqual(self.router.db_for_read(CodeSpace), "replica_0")
+
+    def test_read_in_request_using_primary(self, *patches):
+        """Reads of pinned request should use primary database"""
+
+        start_replica_routing(use_primary=True)
+        self.assertEqual(self.router.db_for_read(CodeSpace), "default")
+
+    def test_read_after_write(self, *patches):
+        """Reads after write should use primary database"""
+
+        start_replica_routing()
+        self.assertEqual(self.router.db_for_write(CodeSpace), "default")
+        self.assertEqual(self.router.db_for_read(CodeSpace), "default")
+        self.assertTrue(end_replica_routing())
+
+    def test_allow_migrate(self, *patches):
+        """Only primary database should be migrated"""
+
+        self.assertTrue(self.router.allow_migrate("default", "core"))
+        self.assertFalse(self.router.allow_migrate("replica_0", "core"))
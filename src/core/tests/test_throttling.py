@@ -0,0 +1,61 @@
+from django.test import SimpleTestCase, RequestFactory
+from django.contrib.auth.models import AnonymousUser
+from unittest.mock import MagicMock, patch
+from core.throttling import RedisRateThrottle, AnonScopedRateThrottle
+from src import REDIS
+import redis
+import uuid
+
+
+class TestRedisRateThrottle(SimpleTestCase):
+    """Test RedisRateThrottle Class"""
+
+    def setUp(self):
+        self.key = f"throttle_test_{uuid.uuid4()}"
+        self.request = RequestFactory().get("/some_path/")
+        self.request.user = AnonymousUser()
+
+    def tearDown(self):
+        REDIS.delete(self.key)
+
+    def create_throttle(self, rate: str) -> RedisRateThrottle:
+        throttle = RedisRateThrottle.__new__(RedisRateThrottle)
+        throttle.scope = "test"
+        throttle.rate = rate
+        throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+        throttle.get_cache_key = lambda request, view: self.key
+        return throttle
+
+    def test_requests_are_limited(self):
+        throttle = self.create_throttle("3/minute")
+        allowed = [throttle.allow_request(self.request, None) for _ in range(4)]
+
+        self.assertEqual(allowed, [True, True, True, False])
+        self.assertGreater(throttle.wait(), 0)
+        self.assertLessEqual(throttle.wait(), 20)
+        # only theoretical arrival time is stored
+        self.assertEqual(REDIS.type(self.key), "string")
+
+    def test_limit_is_shared_by_throttle_instances(self):
+        for expected in (True, False):
+            throttle = self.create_throttle("1/minute")
+            self.assertEqual(throttle.allow_request(self.request, None), expected)
+
+    @patch.object(RedisRateThrottle, "gcra_script", side_effect=redis.ConnectionError)
+    def test_requests_are_allowed_without_redis(self, _):
+        throttle = self.create_throttle("1/minute")
+        self.assertTrue(throttle.allow_request(self.request, None))
+
+
+class TestAnonScopedRateThrottle(SimpleTestCase):
+    """Test AnonScopedRateThrottle Class"""
+
+    def test_authenticated_users_are_not_throttled(self):
+        request = RequestFactory().get("/some_path/")
+        request.user = MagicMock(is_authenticated=True)
+        view = MagicMock(anon_throttle_scope="anon_create_codespace")
+
+        throttle = AnonScopedRateThrottle()
+        with patch.object(AnonScopedRateThrottle, "gcra_script") as patched_script:
+            self.assertTrue(throttle.allow_request(request, view))
+            patched_script.assert_not_called()
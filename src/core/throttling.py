@@ -0,0 +1,136 @@
+from rest_framework import throttling
+from django.http import HttpRequest
+from django.views import View
+from src import REDIS
+from typing import Union
+import logging
+import redis
+
+
+# GCRA (generic cell rate algorithm), only theoretical arrival time
+# of next request is stored, so each check is single O(1) script call.
+# Times are in microseconds and taken from redis clock, so they are
+# the same for all workers
+GCRA_SCRIPT = """
+local now = redis.call("TIME")
+now = tonumber(now[1]) * 1000000 + tonumber(now[2])
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+
+local tat = tonumber(redis.call("GET", KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+if new_tat - now > period then
+    return {0, new_tat - now - period}
+end
+
+redis.call("SET", KEYS[1], new_tat, "PX", math.ceil((new_tat - now) / 1000))
+return {1, 0}
+"""
+
+
+class RedisRateThrottle(throttling.SimpleRateThrottle):
+    """
+    Throttle that stores request rate in redis (shared by all workers)
+    using GCRA, allows num_requests in burst and then one request
+    every duration / num_requests seconds
+    """
+
+    gcra_script = REDIS.register_script(GCRA_SCRIPT)
+
+    def allow_request(self, request: HttpRequest, view: View) -> bool:
+        self.retry_after = None
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        interval = self.duration * 1000000 // self.num_requests
+        try:
+            allowed, retry_after = self.gcra_script(
+                keys=[self.key], args=[interval, self.duration * 1000000]
+            )
+        except redis.RedisError as e:
+            # don't reject requests when redis isn't available
+            logging.error(f"Throttle {self.scope} error: {e}")
+            return True
+
+        if not allowed:
+            self.retry_after = retry_after / 1000000
+            return self.throttle_failure()
+
+        return self.throttle_success()
+
+    def throttle_success(self) -> bool:
+        return True
+
+    def wait(self) -> Union[float, None]:
+        """Return number of seconds after which request will be allowed"""
+
+        return self.retry_after
+
+
+class AnonBurstRateThrottle(RedisRateThrottle, throttling.AnonRateThrottle):
+    scope = "anon_burst"
+
+
+class AnonSustainedRateThrottle(RedisRateThrottle, throttling.AnonRateThrottle):
+    scope = "anon_sustained"
+
+
+class UserBurstRateThrottle(RedisRateThrottle, throttling.UserRateThrottle):
+    scope = "user_burst"
+
+
+class UserSustainedRateThrottle(RedisRateThrottle, throttling.UserRateThrottle):
+    scope = "user_sustained"
+
+
+class ScopedRateThrottle(RedisRateThrottle):
+    """
+    Throttle used to limit requests to views with throttle scope
+    defined (by attribute named scope_attr), views without it
+    aren't throttled
+    """
+
+    scope_attr = "throttle_scope"
+
+    def __init__(self) -> None:
+        # rate is determined by view in allow_request
+        pass
+
+    def allow_request(self, request: HttpRequest, view: View) -> bool:
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request: HttpRequest, view: View) -> str:
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class AnonScopedRateThrottle(ScopedRateThrottle):
+    """
+    ScopedRateThrottle that limits only requests of anonymous users
+    """
+
+    scope_attr = "anon_throttle_scope"
+
+    def get_cache_key(self, request: HttpRequest, view: View) -> Union[str, None]:
+        if request.user and request.user.is_authenticated:
+            return None
+
+        return super().get_cache_key(request, view)
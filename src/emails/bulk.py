@@ -0,0 +1,70 @@
+from django.conf import settings
+from src import REDIS
+from typing import Union
+
+
+class BulkEmailProgress:
+    """
+    Class used to store progress of bulk email in redis: number of
+    recipients enqueued, sent and failed, checkpoint (pk of last enqueued
+    recipient) from which enqueueing is resumed, and chunks already sent
+    (so redelivered chunk isn't sent twice)
+    """
+
+    key_prefix = "bulk_email:"
+
+    def __init__(self, bulk_id: str) -> None:
+        self.bulk_id = bulk_id
+        self.key = f"{self.key_prefix}{bulk_id}"
+        self.chunks_key = f"{self.key}:chunks"
+
+    def get_checkpoint(self) -> Union[str, None]:
+        """Return pk of last enqueued recipient"""
+
+        return REDIS.hget(self.key, "checkpoint")
+
+    def chunk_enqueued(self, last_pk: str, recipients: int) -> None:
+        """Move checkpoint after chunk of recipients was enqueued"""
+
+        with REDIS.pipeline() as pipe:
+            pipe.hset(self.key, "checkpoint", last_pk)
+            pipe.hincrby(self.key, "enqueued", recipients)
+            pipe.expire(self.key, settings.EMAIL_BULK_PROGRESS_EXPIRE_TIME)
+            pipe.execute()
+
+    def all_enqueued(self) -> None:
+        """Mark that all recipients were enqueued"""
+
+        with REDIS.pipeline() as pipe:
+            pipe.hset(self.key, "all_enqueued", 1)
+            pipe.expire(self.key, settings.EMAIL_BULK_PROGRESS_EXPIRE_TIME)
+            pipe.execute()
+
+    def is_chunk_sent(self, first_pk: str) -> bool:
+        """Check if chunk starting with first_pk was already sent"""
+
+        return bool(REDIS.sismember(self.chunks_key, first_pk))
+
+    def chunk_sent(self, first_pk: str, sent: int, failed: int) -> None:
+        """Mark chunk as sent and update number of sent and failed emails"""
+
+        with REDIS.pipeline() as pipe:
+            pipe.sadd(self.chunks_key, first_pk)
+            pipe.hincrby(self.key, "sent", sent)
+            pipe.hincrby(self.key, "failed", failed)
+            pipe.expire(self.chunks_key, settings.EMAIL_BULK_PROGRESS_EXPIRE_TIME)
+            pipe.expire(self.key, settings.EMAIL_BULK_PROGRESS_EXPIRE_TIME)
+            pipe.execute()
+
+    def get(self) -> dict:
+        """Return progress of bulk email"""
+
+        progress = REDIS.hgetall(self.key)
+        return {
+            "bulk_id": self.bulk_id,
+            "checkpoint": progress.get("checkpoint"),
+            "all_enqueued": bool(progress.get("all_enqueued")),
+            "enqueued": int(progress.get("enqueued", 0)),
+            "sent": int(progress.get("sent", 0)),
+            "failed": int(progress.get("failed", 0)),
+        }
@@ -0,0 +1,89 @@
+from django.conf import settings
+from src import REDIS
+from typing import Union
+import logging
+import redis
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker shared by all workers (state is stored in redis).
+    Circuit opens after threshold failures (each within window seconds
+    of previous one), then requests aren't allowed for reset_timeout
+    seconds. After that single request (probe) is allowed, its success
+    closes circuit and its failure opens circuit again
+    """
+
+    def __init__(
+        self, name: str, threshold: int, window: int, reset_timeout: int
+    ) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.failures_key = f"circuit_breaker:{name}:failures"
+        self.open_key = f"circuit_breaker:{name}:open"
+        self.half_open_key = f"circuit_breaker:{name}:half_open"
+        self.probe_key = f"circuit_breaker:{name}:probe"
+
+    def get_wait(self) -> Union[float, None]:
+        """
+        Return number of seconds after which request may be allowed
+        (None if request is allowed now)
+        """
+
+        try:
+            with REDIS.pipeline() as pipe:
+                pipe.pttl(self.open_key)
+                pipe.exists(self.half_open_key)
+                open_ttl, half_open = pipe.execute()
+
+            if open_ttl > 0:
+                return open_ttl / 1000
+
+            # only one request probes if server recovered
+            if half_open and not REDIS.set(
+                self.probe_key, 1, nx=True, ex=self.reset_timeout
+            ):
+                return max(REDIS.pttl(self.probe_key), 0) / 1000
+        except redis.RedisError as e:
+            # don't block requests when redis isn't available
+            logging.error(f"Circuit breaker {self.name} error: {e}")
+
+        return None
+
+    def record_success(self) -> None:
+        """Close circuit"""
+
+        try:
+            REDIS.delete(self.failures_key, self.half_open_key, self.probe_key)
+        except redis.RedisError as e:
+            logging.error(f"Circuit breaker {self.name} error: {e}")
+
+    def record_failure(self) -> None:
+        """Count failure, open circuit if threshold was reached"""
+
+        try:
+            with REDIS.pipeline() as pipe:
+                pipe.incr(self.failures_key)
+                pipe.expire(self.failures_key, self.window)
+                pipe.exists(self.half_open_key)
+                failures, _, half_open = pipe.execute()
+
+            if failures >= self.threshold or half_open:
+                with REDIS.pipeline() as pipe:
+                    pipe.set(self.open_key, 1, ex=self.reset_timeout)
+                    pipe.set(self.half_open_key, 1)
+                    pipe.delete(self.failures_key, self.probe_key)
+                    pipe.execute()
+                logging.warning(f"Circuit breaker {self.name} opened")
+        except redis.RedisError as e:
+            logging.error(f"Circuit breaker {self.name} error: {e}")
+
+
+smtp_circuit_breaker = CircuitBreaker(
+    "smtp",
+    threshold=settings.EMAIL_CIRCUIT_BREAKER_THRESHOLD,
+    window=settings.EMAIL_CIRCUIT_BREAKER_WINDOW,
+    reset_timeout=settings.EMAIL_CIRCUIT_BREAKER_RESET_TIMEOUT,
+)
@@ -0,0 +1,168 @@
+from django.conf import settings
+from django.core.mail import get_connection, EmailMessage
+from concurrent.futures import Future
+from typing import Union
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+
+
+class EmailConnection:
+    """
+    Long lived email backend connection (one per process), so SMTP and
+    TLS handshakes aren't repeated for every email. Connection is closed
+    when it was idle for too long and reopened when sending fails
+    """
+
+    # errors after which connection is reopened and message is sent again
+    connection_errors = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+    def __init__(self) -> None:
+        self.__connection = None
+        self.__connection_pid = None
+        self.__last_used = 0.0
+        self.__lock = threading.Lock()
+
+    def send_messages(
+        self, messages: list[EmailMessage]
+    ) -> list[Union[Exception, None]]:
+        """
+        Send messages over shared connection (in single backend
+        send_messages call if none of them fails), return list with
+        exception raised while sending each message (or None if it was sent)
+        """
+
+        results = [None] * len(messages)
+        position, retried = 0, None
+        with self.__lock:
+            while position < len(messages):
+                # backend sends messages in order, so message that was
+                # being sent when error was raised is the last one taken
+                current = position
+
+                def iterate_messages():
+                    nonlocal current
+                    for current in range(position, len(messages)):
+                        yield messages[current]
+
+                try:
+                    self.__get_connection().send_messages(iterate_messages())
+                    self.__last_used = time.monotonic()
+                    break
+                except self.connection_errors as e:
+                    # connection was probably closed by server, send
+                    # message again once
+                    self.__close()
+                    if retried == current:
+                        results[current] = e
+                        position = current + 1
+                    else:
+                        position = retried = current
+                except Exception as e:
+                    results[current] = e
+                    position = current + 1
+
+        return results
+
+    def close(self) -> None:
+        """Close connection (it will be reopened by next send)"""
+
+        with self.__lock:
+            self.__close()
+
+    def __get_connection(self):
+        if (
+            self.__connection is not None
+            and time.monotonic() - self.__last_used > settings.EMAIL_CONNECTION_MAX_IDLE
+        ):
+            self.__close()
+
+        # don't reuse connection opened in parent process
+        if self.__connection is None or self.__connection_pid != os.getpid():
+            self.__connection = get_connection()
+            self.__connection.open()
+            self.__connection_pid = os.getpid()
+
+        return self.__connection
+
+    def __close(self) -> None:
+        if self.__connection is not None and self.__connection_pid == os.getpid():
+            try:
+                self.__connection.close()
+            except Exception as e:
+                logging.warning(f"Failed to close email connection: {e}")
+
+        self.__connection = None
+
+
+class EmailBatcher:
+    """
+    Class used to send messages in small batches over EmailConnection.
+    Messages submitted by concurrently running tasks (threads pool) are
+    collected for up to EMAIL_BATCH_WAIT seconds (or just messages already
+    queued if it is 0) or EMAIL_BATCH_SIZE messages and sent together,
+    each task waits for its message result
+    """
+
+    def __init__(self, connection: EmailConnection) -> None:
+        self.connection = connection
+        self.__queue = None
+        self.__sender_pid = None
+        self.__lock = threading.Lock()
+
+    def submit(self, message: EmailMessage) -> Future:
+        """Add message to batch and return future of its result"""
+
+        future = Future()
+        self.__get_queue().put((message, future))
+        return future
+
+    def send(self, message: EmailMessage) -> None:
+        """Send message in batch, raise exception if it wasn't sent"""
+
+        self.submit(message).result()
+
+    def __get_queue(self) -> queue.Queue:
+        if self.__sender_pid != os.getpid():
+            with self.__lock:
+                if self.__sender_pid != os.getpid():
+                    self.__queue = queue.Queue()
+                    threading.Thread(
+                        target=self.__send_batches,
+                        args=(self.__queue,),
+                        name="email-batcher",
+                        daemon=True,
+                    ).start()
+                    self.__sender_pid = os.getpid()
+
+        return self.__queue
+
+    def __send_batches(self, messages_queue: queue.Queue) -> None:
+        while True:
+            batch = [messages_queue.get()]
+            deadline = time.monotonic() + settings.EMAIL_BATCH_WAIT
+            while len(batch) < settings.EMAIL_BATCH_SIZE:
+                try:
+                    batch.append(
+                        messages_queue.get(timeout=max(0, deadline - time.monotonic()))
+                    )
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.connection.send_messages([m for m, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if result is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(result)
+
+
+email_connection = EmailConnection()
+email_batcher = EmailBatcher(email_connection)
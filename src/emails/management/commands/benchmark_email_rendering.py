@@ -0,0 +1,58 @@
+from django.core.management import BaseCommand
+from django.template.loader import get_template
+from emails.rendering import EmailTemplateRenderer
+import time
+
+
+class Command(BaseCommand):
+    """
+    This command is used to compare rendering emails with templates loaded
+    by django with rendering precompiled templates. It measures average
+    render time of single email (plaintext and html content)
+    """
+
+    help = "Benchmark rendering of email templates"
+
+    emails = (
+        ("emails/welcome.txt", "emails/welcome.html", {"first_name": "John"}),
+        (
+            "emails/reset_password.txt",
+            "emails/reset_password.html",
+            {"reset_password_url": "http://localhost:3000/reset-password/token/"},
+        ),
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--emails", type=int, default=10000)
+
+    def handle(self, *args, **options) -> None:
+        renderer = EmailTemplateRenderer()
+        renderer.warmup()
+
+        def render_django_template(template_name: str, context: dict) -> str:
+            return get_template(template_name).render(context)
+
+        for label, render in (
+            ("django templates", render_django_template),
+            ("precompiled templates", renderer.render),
+        ):
+            for plaintext, template, context in self.emails:
+                elapsed = self.run_renders(
+                    render, plaintext, template, context, options["emails"]
+                )
+                self.stdout.write(
+                    f"{label} ({template}): "
+                    f"{elapsed / options['emails'] * 1000000:.1f} us per email"
+                )
+
+    def run_renders(
+        self, render, plaintext: str, template: str, context: dict, emails: int
+    ) -> float:
+        """Render email contents emails times, return elapsed time"""
+
+        start = time.perf_counter()
+        for _ in range(emails):
+            render(plaintext, context)
+            render(template, context)
+
+        return time.perf_counter() - start
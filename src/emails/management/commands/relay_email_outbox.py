@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+from emails.outbox import email_outbox_relay
+
+
+class Command(BaseCommand):
+    """
+    This command is used to relay emails left in outbox (e.g. by process
+    that died before relaying them) to celery
+    """
+
+    help = "Relay emails from outbox to celery"
+
+    def handle(self, *args, **options) -> None:
+        relayed = email_outbox_relay.relay()
+        self.stdout.write(f"Relayed {relayed} emails")
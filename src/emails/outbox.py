@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from celery.signals import worker_ready
+from core.models import EmailOutbox
+from emails.tasks import email_sender
+from src import CELERY_APP
+from typing import Union
+import logging
+import os
+import threading
+
+
+class EmailOutboxRelay:
+    """
+    Class used to relay emails from outbox to celery. Relay runs in
+    background thread of celery worker main process (started when worker
+    is ready) and of every process that wrote to outbox (started lazily
+    on first notify, after fork), it is woken up after commit of
+    transaction that wrote to outbox and periodically, to relay emails
+    left by processes that died before relaying them. Emails are relayed
+    in batches over single broker connection and removed from outbox in
+    the same transaction
+    """
+
+    def __init__(self) -> None:
+        self.__wakeup = None
+        self.__relay_pid = None
+        self.__lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start relay thread in current process (if it isn't running)"""
+
+        self.__get_wakeup()
+
+    def notify(self) -> None:
+        """Wake up relay thread"""
+
+        self.__get_wakeup().set()
+
+    def relay(self) -> int:
+        """Relay all emails from outbox, return number of relayed emails"""
+
+        relayed = 0
+        while batch_relayed := self.__relay_batch():
+            relayed += batch_relayed
+
+        return relayed
+
+    def __relay_batch(self) -> int:
+        with transaction.atomic():
+            # rows locked by other relays are skipped
+            entries = list(
+                EmailOutbox.objects.select_for_update(skip_locked=True).order_by("id")[
+                    : settings.EMAIL_OUTBOX_BATCH_SIZE
+                ]
+            )
+            if not entries:
+                return 0
+
+            with CELERY_APP.producer_or_acquire() as producer:
+                for entry in entries:
+                    email_sender.apply_async(
+                        kwargs=entry.task_kwargs,
+                        task_id=str(entry.idempotency_key),
+                        queue=entry.queue,
+                        producer=producer,
+                    )
+
+            EmailOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+
+        return len(entries)
+
+    def __get_wakeup(self) -> threading.Event:
+        if self.__relay_pid != os.getpid():
+            with self.__lock:
+                if self.__relay_pid != os.getpid():
+                    self.__wakeup = threading.Event()
+                    threading.Thread(
+                        target=self.__run,
+                        args=(self.__wakeup,),
+                        name="email-outbox-relay",
+                        daemon=True,
+                    ).start()
+                    self.__relay_pid = os.getpid()
+
+        return self.__wakeup
+
+    def __run(self, wakeup: threading.Event) -> None:
+        while True:
+            wakeup.wait(timeout=settings.EMAIL_OUTBOX_RELAY_INTERVAL)
+            wakeup.clear()
+            try:
+                close_old_connections()
+                self.relay()
+            except Exception as e:
+                # emails stay in outbox and are relayed on next wakeup
+                logging.error(f"Email outbox relay error: {e}")
+
+
+def enqueue_email(queue: Union[str, None] = None, **kwargs) -> EmailOutbox:
+    """
+    Write email (email_sender task kwargs) to outbox in current
+    transaction, it is relayed to celery (to given queue) after commit
+    """
+
+    entry = EmailOutbox.objects.create(task_kwargs=kwargs, queue=queue)
+    transaction.on_commit(email_outbox_relay.notify)
+    return entry
+
+
+email_outbox_relay = EmailOutboxRelay()
+
+
+@worker_ready.connect
+def start_email_outbox_relay(**kwargs) -> None:
+    """
+    Relay emails left in outbox periodically from worker, also when no
+    email was enqueued since it started
+    """
+
+    email_outbox_relay.start()
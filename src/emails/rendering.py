@@ -0,0 +1,104 @@
+from django.template import Context, NodeList
+from django.template.base import Node, TextNode, Template, Variable
+from django.template.backends.django import Template as BackendTemplate
+from django.template.defaulttags import CommentNode, LoadNode
+from django.template.loader import get_template
+from django.templatetags.static import StaticNode
+from pathlib import Path
+import copy
+
+
+class EmailTemplateRenderer:
+    """
+    Class used to render email templates. Templates are compiled once per
+    process (on worker start) and parts of templates that don't depend on
+    context (text, static urls) are rendered at compile time, so rendering
+    email only resolves its context variables. Output of templates that
+    don't use context at all is cached
+    """
+
+    templates_dir = Path(__file__).resolve().parent / "templates" / "emails"
+
+    def __init__(self) -> None:
+        self.__templates = {}
+        self.__static_output = {}
+
+    def warmup(self) -> None:
+        """Compile all email templates"""
+
+        for path in sorted(self.templates_dir.iterdir()):
+            if path.is_file():
+                self.get_template(f"emails/{path.name}")
+
+    def get_template(self, template_name: str) -> BackendTemplate:
+        """Return precompiled template"""
+
+        if (template := self.__templates.get(template_name)) is None:
+            template = self.__precompile(template_name, get_template(template_name))
+            self.__templates[template_name] = template
+
+        return template
+
+    def render(self, template_name: str, context: dict) -> str:
+        """Render email template with context"""
+
+        template = self.get_template(template_name)
+        if (output := self.__static_output.get(template_name)) is not None:
+            return output
+
+        return template.render(context)
+
+    def clear(self) -> None:
+        """Remove compiled templates (they will be compiled again)"""
+
+        self.__templates.clear()
+        self.__static_output.clear()
+
+    def __precompile(
+        self, template_name: str, template: BackendTemplate
+    ) -> BackendTemplate:
+        """
+        Return copy of template with consecutive context independent nodes
+        replaced by single text node with their output
+        """
+
+        context = Context(autoescape=template.backend.engine.autoescape)
+        nodelist = NodeList()
+        rendered = []
+
+        for node in template.template.nodelist:
+            if self.__is_static(node):
+                rendered.append(node.render(context))
+                continue
+
+            if rendered:
+                nodelist.append(TextNode("".join(rendered)))
+                rendered = []
+            nodelist.append(node)
+
+        if not nodelist:
+            self.__static_output[template_name] = "".join(rendered)
+        elif rendered:
+            nodelist.append(TextNode("".join(rendered)))
+
+        compiled: Template = copy.copy(template.template)
+        compiled.nodelist = nodelist
+        return BackendTemplate(compiled, template.backend)
+
+    @staticmethod
+    def __is_static(node: Node) -> bool:
+        """Check if node renders the same output for every context"""
+
+        if isinstance(node, (TextNode, CommentNode, LoadNode)):
+            return True
+
+        # {% static 'path' %} with constant path
+        return (
+            isinstance(node, StaticNode)
+            and node.varname is None
+            and not isinstance(node.path.var, Variable)
+            and not node.path.filters
+        )
+
+
+email_renderer = EmailTemplateRenderer()
@@ -1,10 +1,17 @@
 import celery
 import logging
+import random
+import smtplib
 from typing import Union
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import get_template
-from src import CELERY_APP
+from django.contrib.auth import get_user_model
+from celery.signals import worker_init
+from emails.bulk import BulkEmailProgress
+from emails.circuit_breaker import smtp_circuit_breaker
+from emails.connection import email_batcher, email_connection
+from emails.rendering import email_renderer
+from src import CELERY_APP, REDIS
 
 
 class EmailSender(celery.Task):
@@ -13,6 +20,12 @@ class EmailSender(celery.Task):
     celery worker.
     """
 
+    # emails are fire and forget, don't store results in backend
+    ignore_result = True
+    max_retries = settings.EMAIL_MAX_RETRIES
+    # errors after which email is sent again (if they are transient)
+    retry_errors = (smtplib.SMTPException, OSError)
+
     def run(
         self,
         email_subject: str,
@@ -23,6 +36,79 @@ class EmailSender(celery.Task):
     ) -> None:
         """This method should define body of the task executed by workers"""
 
+        # task id is idempotency key of email relayed from outbox, email
+        # relayed (or delivered) more than once is sent once
+        sent_key = f"email_sent:{self.request.id}" if self.request.id else None
+        if sent_key and REDIS.exists(sent_key):
+            return
+
+        # park email until smtp server recovers instead of waiting
+        # for timeout of every message
+        if (wait := smtp_circuit_breaker.get_wait()) is not None:
+            raise self.retry(countdown=wait + random.uniform(0, wait), max_retries=None)
+
+        message = self.build_message(
+            email_subject, email_to, email_plaintext, email_template, **context
+        )
+        try:
+            self.__send_message(message)
+        except self.retry_errors as e:
+            if not self.is_transient_error(e):
+                raise
+            smtp_circuit_breaker.record_failure()
+            raise self.retry(exc=e, countdown=self.get_backoff())
+        smtp_circuit_breaker.record_success()
+
+        if sent_key:
+            REDIS.set(sent_key, 1, ex=settings.EMAIL_IDEMPOTENCY_KEY_EXPIRE_TIME)
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """This method is called when task fails"""
+
+        logging.error(
+            f"{task_id} failed: {exc}\n"
+            f"Failed to send email to '{kwargs.get('email_to')}'"
+        )
+
+    def get_backoff(self) -> float:
+        """
+        Return retry countdown, exponential backoff with full jitter
+        (so retries of many emails failed at once are spread)
+        """
+
+        return random.uniform(
+            0,
+            min(
+                settings.EMAIL_RETRY_BACKOFF_MAX,
+                settings.EMAIL_RETRY_BACKOFF * 2**self.request.retries,
+            ),
+        )
+
+    @staticmethod
+    def is_transient_error(e: Exception) -> bool:
+        """
+        Check if sending may succeed later (connection errors, timeouts
+        and 4xx smtp responses)
+        """
+
+        if isinstance(e, smtplib.SMTPResponseException):
+            return 400 <= e.smtp_code < 500
+
+        if isinstance(e, smtplib.SMTPRecipientsRefused):
+            return all(400 <= code < 500 for code, _ in e.recipients.values())
+
+        return True
+
+    def build_message(
+        self,
+        email_subject: str,
+        email_to: str,
+        email_plaintext: str,
+        email_template: Union[None, str] = None,
+        **context,
+    ) -> EmailMultiAlternatives:
+        """This method is used to create email message with rendered content"""
+
         message = EmailMultiAlternatives(
             email_subject,
             from_email=settings.DEFAULT_FROM_EMAIL,
@@ -34,16 +120,7 @@ class EmailSender(celery.Task):
             contents=self.__get_contents(email_plaintext, email_template),
             **context,
         )
-
-        self.__send_message(message)
-
-    def on_failure(self, exc, task_id, args, kwargs, einfo):
-        """This method is called when task fails"""
-
-        logging.error(
-            f"{task_id} failed: {exc}\n",
-            f"Failed to send email to '{kwargs.get('email_to')}'\n",
-        )
+        return message
 
     def __update_message_content(
         self,
@@ -57,7 +134,7 @@ class EmailSender(celery.Task):
         in place"""
 
         for template, content_type in contents:
-            content = get_template(template).render(context)
+            content = email_renderer.render(template, context)
             if content_type == "text/plain":
                 message.body = content
             else:
@@ -74,9 +151,160 @@ class EmailSender(celery.Task):
         ]
 
     def __send_message(self, message: EmailMultiAlternatives) -> None:
-        """this method is used to send email message"""
+        """
+        this method is used to send email message (in batch with messages
+        of other tasks, over connection shared by worker process)
+        """
 
-        message.send()
+        email_batcher.send(message)
+
+
+class BulkEmailChunkSender(EmailSender):
+    """
+    This Task is used to send bulk email to chunk of recipients (users
+    with pk in range first_pk - last_pk), messages are rendered for whole
+    chunk and sent over connection shared by worker process
+    """
+
+    # redeliver chunk if worker dies while sending it
+    acks_late = True
+
+    def run(
+        self,
+        bulk_id: str,
+        first_pk: str,
+        last_pk: str,
+        email_subject: str,
+        email_plaintext: str,
+        email_template: Union[None, str] = None,
+        recipients: Union[None, dict] = None,
+        context: Union[None, dict] = None,
+    ) -> None:
+        """This method should define body of the task executed by workers"""
+
+        progress = BulkEmailProgress(bulk_id)
+        if progress.is_chunk_sent(first_pk):
+            return
+
+        if (wait := smtp_circuit_breaker.get_wait()) is not None:
+            raise self.retry(countdown=wait + random.uniform(0, wait), max_retries=None)
+
+        users = (
+            get_user_model()
+            .objects.filter(**(recipients or {}), pk__gte=first_pk, pk__lte=last_pk)
+            .order_by("pk")
+            .values_list("email", "first_name", "last_name")
+        )
+        messages = [
+            self.build_message(
+                email_subject,
+                email,
+                email_plaintext,
+                email_template,
+                **{**(context or {}), "first_name": first_name, "last_name": last_name},
+            )
+            for email, first_name, last_name in users
+        ]
+
+        results = email_connection.send_messages(messages)
+        if results and all(
+            isinstance(result, self.retry_errors) and self.is_transient_error(result)
+            for result in results
+        ):
+            # nothing was sent, so whole chunk can be sent again
+            smtp_circuit_breaker.record_failure()
+            raise self.retry(exc=results[0], countdown=self.get_backoff())
+        smtp_circuit_breaker.record_success()
+
+        for message, result in zip(messages, results):
+            if result is not None:
+                logging.error(f"Failed to send email to '{message.to[0]}': {result}")
+
+        failed = sum(result is not None for result in results)
+        progress.chunk_sent(first_pk, sent=len(results) - failed, failed=failed)
+
+
+class BulkEmailSender(celery.Task):
+    """
+    This Task is used to send email to all users matching recipients
+    filter (e.g. {"is_active": True}). Users are streamed from database
+    ordered by pk and one chunk task is enqueued per EMAIL_BULK_CHUNK_SIZE
+    users. Progress is stored in redis under bulk_id (id of this task by
+    default), running task again with the same bulk_id resumes it from
+    last enqueued chunk
+    """
+
+    # progress is stored in redis (BulkEmailProgress)
+    ignore_result = True
+
+    def run(
+        self,
+        email_subject: str,
+        email_plaintext: str,
+        email_template: Union[None, str] = None,
+        recipients: Union[None, dict] = None,
+        context: Union[None, dict] = None,
+        bulk_id: Union[None, str] = None,
+    ) -> dict:
+        """This method should define body of the task executed by workers"""
+
+        progress = BulkEmailProgress(bulk_id or self.request.id)
+        users = get_user_model().objects.filter(**(recipients or {})).order_by("pk")
+        if (checkpoint := progress.get_checkpoint()) is not None:
+            users = users.filter(pk__gt=checkpoint)
+
+        chunk_size = settings.EMAIL_BULK_CHUNK_SIZE
+        chunk = []
+        for pk in users.values_list("pk", flat=True).iterator(chunk_size=chunk_size):
+            chunk.append(str(pk))
+            if len(chunk) == chunk_size:
+                self.__enqueue_chunk(
+                    progress,
+                    chunk,
+                    email_subject=email_subject,
+                    email_plaintext=email_plaintext,
+                    email_template=email_template,
+                    recipients=recipients,
+                    context=context,
+                )
+                chunk = []
+
+        if chunk:
+            self.__enqueue_chunk(
+                progress,
+                chunk,
+                email_subject=email_subject,
+                email_plaintext=email_plaintext,
+                email_template=email_template,
+                recipients=recipients,
+                context=context,
+            )
+
+        progress.all_enqueued()
+        return progress.get()
+
+    def __enqueue_chunk(
+        self, progress: BulkEmailProgress, chunk: list[str], **kwargs
+    ) -> None:
+        """This method is used to enqueue chunk task and move checkpoint"""
+
+        bulk_email_chunk_sender.delay(
+            bulk_id=progress.bulk_id, first_pk=chunk[0], last_pk=chunk[-1], **kwargs
+        )
+        progress.chunk_enqueued(chunk[-1], len(chunk))
+        logging.info(f"Bulk email {progress.bulk_id}: {progress.get()}")
 
 
 email_sender = CELERY_APP.register_task(EmailSender())
+bulk_email_chunk_sender = CELERY_APP.register_task(BulkEmailChunkSender())
+bulk_email_sender = CELERY_APP.register_task(BulkEmailSender())
+
+
+@worker_init.connect
+def warmup_email_templates(**kwargs) -> None:
+    """
+    Compile email templates when worker starts (before pool processes
+    are forked, so they inherit compiled templates)
+    """
+
+    email_renderer.warmup()
@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from unittest import mock
+from celery.exceptions import Retry
+from emails.bulk import BulkEmailProgress
+from emails.tasks import BulkEmailSender, BulkEmailChunkSender
+import smtplib
+import uuid
+
+
+@override_settings(EMAIL_BULK_CHUNK_SIZE=2)
+class TestBulkEmailSender(TestCase):
+    """
+    Class used to test bulk email tasks
+    """
+
+    def setUp(self):
+        with mock.patch("core.handlers.users.enqueue_email"):
+            self.users = sorted(
+                (
+                    get_user_model().objects.create_user(
+                        email=f"user{i}@example.com", first_name=f"user{i}"
+                    )
+                    for i in range(5)
+                ),
+                key=lambda user: str(user.pk),
+            )
+        self.bulk_id = str(uuid.uuid4())
+        self.kwargs = {
+            "email_subject": "Announcement",
+            "email_plaintext": "emails/welcome.txt",
+            "email_template": "emails/welcome.html",
+            "recipients": {"is_active": True},
+        }
+
+    @mock.patch("emails.tasks.bulk_email_chunk_sender")
+    def test_chunks_enqueued(self, mocked_chunk_sender):
+        """
+        Test if one chunk task is enqueued per chunk of users
+        """
+
+        progress = BulkEmailSender().run(bulk_id=self.bulk_id, **self.kwargs)
+
+        self.assertEqual(
+            [
+                (c.kwargs["first_pk"], c.kwargs["last_pk"])
+                for c in mocked_chunk_sender.delay.call_args_list
+            ],
+            [
+                (str(self.users[0].pk), str(self.users[1].pk)),
+                (str(self.users[2].pk), str(self.users[3].pk)),
+                (str(self.users[4].pk), str(self.users[4].pk)),
+            ],
+        )
+        self.assertEqual(progress["enqueued"], 5)
+        self.assertEqual(progress["checkpoint"], str(self.users[4].pk))
+        self.assertTrue(progress["all_enqueued"])
+
+    @mock.patch("emails.tasks.bulk_email_chunk_sender")
+    def test_resume_from_checkpoint(self, mocked_chunk_sender):
+        """
+        Test if users before checkpoint aren't enqueued again
+        """
+
+        BulkEmailProgress(self.bulk_id).chunk_enqueued(str(self.users[1].pk), 2)
+
+        progress = BulkEmailSender().run(bulk_id=self.bulk_id, **self.kwargs)
+
+        self.assertEqual(mocked_chunk_sender.delay.call_count, 2)
+        self.assertEqual(
+            mocked_chunk_sender.delay.call_args_list[0].kwargs["first_pk"],
+            str(self.users[2].pk),
+        )
+        self.assertEqual(progress["enqueued"], 5)
+
+    @mock.patch("emails.tasks.email_connection")
+    def test_chunk_sent(self, mocked_email_connection):
+        """
+        Test if chunk messages are rendered for each user and sent together,
+        and chunk isn't sent again
+        """
+
+        mocked_email_connection.send_messages.return_value = [None, Exception()]
+        kwargs = {
+            "bulk_id": self.bulk_id,
+            "first_pk": str(self.users[0].pk),
+            "last_pk": str(self.users[1].pk),
+            **self.kwargs,
+        }
+
+        BulkEmailChunkSender().run(**kwargs)
+        BulkEmailChunkSender().run(**kwargs)
+
+        mocked_email_connection.send_messages.assert_called_once()
+        messages = mocked_email_connection.send_messages.call_args.args[0]
+        self.assertEqual(
+            [message.to for message in messages],
+            [[self.users[0].email], [self.users[1].email]],
+        )
+        self.assertIn(f"Hello {self.users[0].first_name}!", messages[0].body)
+        progress = BulkEmailProgress(self.bulk_id).get()
+        self.assertEqual((progress["sent"], progress["failed"]), (1, 1))
+
+    @mock.patch("emails.tasks.smtp_circuit_breaker")
+    @mock.patch("emails.tasks.BulkEmailChunkSender.retry", side_effect=Retry)
+    @mock.patch("emails.tasks.email_connection")
+    def test_chunk_retried(self, mocked_email_connection, mocked_retry, mocked_breaker):
+        """
+        Test if chunk is retried when none of its messages was sent
+        because of transient error
+        """
+
+        mocked_breaker.get_wait.return_value = None
+        mocked_email_connection.send_messages.return_value = [
+            smtplib.SMTPServerDisconnected()
+        ] * 2
+
+        with self.assertRaises(Retry):
+            BulkEmailChunkSender().run(
+                bulk_id=self.bulk_id,
+                first_pk=str(self.users[0].pk),
+                last_pk=str(self.users[1].pk),
+                **self.kwargs,
+            )
+
+        mocked_breaker.record_failure.assert_called_once()
+        self.assertFalse(
+            BulkEmailProgress(self.bulk_id).is_chunk_sent(str(self.users[0].pk))
+        )
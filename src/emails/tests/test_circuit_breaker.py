@@ -0,0 +1,70 @@
+from django.test import SimpleTestCase
+from emails.circuit_breaker import CircuitBreaker
+from src import REDIS
+
+
+class TestCircuitBreaker(SimpleTestCase):
+    """
+    Class used to test CircuitBreaker
+    """
+
+    def setUp(self):
+        self.breaker = CircuitBreaker("test", threshold=3, window=60, reset_timeout=30)
+        self.addCleanup(self.breaker.record_success)
+        self.addCleanup(REDIS.delete, self.breaker.open_key)
+
+    def test_closed(self):
+        """
+        Test if requests are allowed until threshold failures
+        """
+
+        for _ in range(2):
+            self.breaker.record_failure()
+
+        self.assertIsNone(self.breaker.get_wait())
+
+    def test_opened_after_threshold_failures(self):
+        """
+        Test if requests aren't allowed after threshold failures
+        """
+
+        for _ in range(3):
+            self.breaker.record_failure()
+
+        wait = self.breaker.get_wait()
+        self.assertGreater(wait, 29)
+        self.assertLessEqual(wait, 30)
+
+    def test_success_resets_failures(self):
+        """
+        Test if success resets number of failures
+        """
+
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertIsNone(self.breaker.get_wait())
+
+    def test_half_open(self):
+        """
+        Test if single probe is allowed after reset timeout, its failure
+        opens circuit again and its success closes circuit
+        """
+
+        for _ in range(3):
+            self.breaker.record_failure()
+        REDIS.delete(self.breaker.open_key)
+
+        self.assertIsNone(self.breaker.get_wait())
+        self.assertIsNotNone(self.breaker.get_wait())
+
+        self.breaker.record_failure()
+        self.assertIsNotNone(self.breaker.get_wait())
+
+        REDIS.delete(self.breaker.open_key)
+        self.assertIsNone(self.breaker.get_wait())
+        self.breaker.record_success()
+        self.assertIsNone(self.breaker.get_wait())
+        self.assertIsNone(self.breaker.get_wait())
@@ -0,0 +1,135 @@
+from django.test import SimpleTestCase, override_settings
+from django.core.mail import EmailMessage
+from unittest import mock
+from emails.connection import EmailConnection, EmailBatcher
+import smtplib
+import threading
+
+
+class TestEmailConnection(SimpleTestCase):
+    """Test EmailConnection class"""
+
+    def setUp(self):
+        self.connection = EmailConnection()
+        self.messages = [
+            EmailMessage("subject", to=[f"{i}@example.com"]) for i in range(3)
+        ]
+
+    def fake_send_messages(self, *errors):
+        """
+        Return send_messages side effect which sends messages in order
+        and raises given errors (error of each attempt, None if sent)
+        """
+
+        errors = list(errors)
+
+        def send_messages(messages):
+            sent = 0
+            for message in messages:
+                if errors and (error := errors.pop(0)) is not None:
+                    raise error
+                sent += 1
+            return sent
+
+        return send_messages
+
+    @mock.patch("emails.connection.get_connection")
+    def test_connection_is_reused(self, mocked_get_connection):
+        """Test if all messages are sent in one call over one connection"""
+
+        backend = mocked_get_connection.return_value
+        backend.send_messages.side_effect = self.fake_send_messages()
+
+        results = self.connection.send_messages(self.messages)
+
+        self.assertEqual(results, [None, None, None])
+        mocked_get_connection.assert_called_once()
+        backend.open.assert_called_once()
+        backend.send_messages.assert_called_once()
+
+    @mock.patch("emails.connection.get_connection")
+    def test_connection_is_reopened_after_failure(self, mocked_get_connection):
+        """Test if message is sent again (with next ones) over new connection"""
+
+        mocked_get_connection.return_value.send_messages.side_effect = (
+            self.fake_send_messages(None, smtplib.SMTPServerDisconnected())
+        )
+
+        self.assertEqual(self.connection.send_messages(self.messages), [None] * 3)
+        self.assertEqual(mocked_get_connection.call_count, 2)
+        self.assertEqual(
+            mocked_get_connection.return_value.send_messages.call_count, 2
+        )
+
+    @mock.patch("emails.connection.get_connection")
+    def test_connection_error_is_returned_after_retry(self, mocked_get_connection):
+        """Test if message is sent again only once"""
+
+        error = smtplib.SMTPServerDisconnected()
+        mocked_get_connection.return_value.send_messages.side_effect = (
+            self.fake_send_messages(error, error)
+        )
+
+        self.assertEqual(
+            self.connection.send_messages(self.messages), [error, None, None]
+        )
+
+    @mock.patch("emails.connection.get_connection")
+    def test_message_error_is_returned(self, mocked_get_connection):
+        """Test if error of one message doesn't stop sending others"""
+
+        error = smtplib.SMTPRecipientsRefused({})
+        mocked_get_connection.return_value.send_messages.side_effect = (
+            self.fake_send_messages(None, error)
+        )
+
+        self.assertEqual(
+            self.connection.send_messages(self.messages), [None, error, None]
+        )
+        self.assertEqual(
+            mocked_get_connection.return_value.send_messages.call_count, 2
+        )
+
+
+class TestEmailBatcher(SimpleTestCase):
+    """Test EmailBatcher class"""
+
+    @override_settings(EMAIL_BATCH_SIZE=3, EMAIL_BATCH_WAIT=1)
+    def test_messages_are_sent_in_batch(self):
+        connection = mock.Mock()
+        connection.send_messages.side_effect = lambda messages: [None] * len(messages)
+        batcher = EmailBatcher(connection)
+
+        futures = [batcher.submit(mock.Mock()) for _ in range(3)]
+        for future in futures:
+            self.assertIsNone(future.result(timeout=5))
+
+        connection.send_messages.assert_called_once()
+
+    @override_settings(EMAIL_BATCH_SIZE=3, EMAIL_BATCH_WAIT=0)
+    def test_queued_messages_are_sent_in_batch_without_wait(self):
+        released = threading.Event()
+        connection = mock.Mock()
+
+        def send_messages(messages):
+            released.wait(timeout=5)
+            return [None] * len(messages)
+
+        connection.send_messages.side_effect = send_messages
+        batcher = EmailBatcher(connection)
+
+        # messages queued while first one is sent are sent together
+        futures = [batcher.submit(mock.Mock()) for _ in range(3)]
+        released.set()
+        for future in futures:
+            self.assertIsNone(future.result(timeout=5))
+
+        self.assertLessEqual(connection.send_messages.call_count, 2)
+
+    def test_send_raises_message_error(self):
+        connection = mock.Mock()
+        connection.send_messages.side_effect = lambda messages: [ValueError()]
+        batcher = EmailBatcher(connection)
+
+        with self.assertRaises(ValueError):
+            batcher.send(mock.Mock())
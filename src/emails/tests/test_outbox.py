@@ -0,0 +1,115 @@
+from django.db import transaction
+from django.test import TestCase, override_settings
+from unittest import mock
+from core.models import EmailOutbox
+from emails.outbox import (
+    EmailOutboxRelay,
+    enqueue_email,
+    start_email_outbox_relay,
+)
+
+
+class TestEmailOutbox(TestCase):
+    """
+    Class used to test email outbox and its relay
+    """
+
+    @mock.patch("emails.outbox.email_outbox_relay")
+    def test_enqueue_email_relayed_after_commit(self, mocked_relay):
+        """
+        Test if email is written to outbox and relay is woken up after commit
+        """
+
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = enqueue_email(email_to="user@example.com")
+            mocked_relay.notify.assert_not_called()
+
+        mocked_relay.notify.assert_called_once()
+        self.assertEqual(
+            EmailOutbox.objects.get(pk=entry.pk).task_kwargs,
+            {"email_to": "user@example.com"},
+        )
+
+    @mock.patch("emails.outbox.email_outbox_relay")
+    def test_enqueue_email_rolled_back(self, mocked_relay):
+        """
+        Test if email isn't relayed when transaction is rolled back
+        """
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    enqueue_email(email_to="user@example.com")
+                    raise ValueError
+            except ValueError:
+                pass
+
+        mocked_relay.notify.assert_not_called()
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    @override_settings(EMAIL_OUTBOX_BATCH_SIZE=2)
+    @mock.patch("emails.outbox.CELERY_APP")
+    @mock.patch("emails.outbox.email_sender")
+    def test_relay(self, mocked_email_sender, mocked_celery_app):
+        """
+        Test if all emails are relayed in batches (to their queues) with
+        idempotency keys as task ids and removed from outbox
+        """
+
+        entries = [
+            EmailOutbox.objects.create(
+                task_kwargs={"email_to": f"user{i}@a.com"}, queue=queue
+            )
+            for i, queue in enumerate([None, "emails_high", None])
+        ]
+
+        self.assertEqual(EmailOutboxRelay().relay(), 3)
+
+        self.assertEqual(mocked_celery_app.producer_or_acquire.call_count, 2)
+        self.assertEqual(
+            [
+                (c.kwargs["kwargs"], c.kwargs["task_id"], c.kwargs["queue"])
+                for c in mocked_email_sender.apply_async.call_args_list
+            ],
+            [
+                (entry.task_kwargs, str(entry.idempotency_key), entry.queue)
+                for entry in entries
+            ],
+        )
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    @mock.patch("emails.outbox.email_sender")
+    def test_relay_failed(self, mocked_email_sender):
+        """
+        Test if emails stay in outbox when relaying fails
+        """
+
+        mocked_email_sender.apply_async.side_effect = ConnectionError
+        EmailOutbox.objects.create(task_kwargs={"email_to": "user@a.com"})
+
+        with self.assertRaises(ConnectionError):
+            EmailOutboxRelay().relay()
+
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    @mock.patch("emails.outbox.threading.Thread")
+    def test_relay_thread_started_once(self, mocked_thread):
+        """
+        Test if relay thread is started only once per process
+        """
+
+        relay = EmailOutboxRelay()
+        relay.start()
+        relay.notify()
+
+        mocked_thread.return_value.start.assert_called_once()
+
+    @mock.patch("emails.outbox.email_outbox_relay")
+    def test_relay_started_when_worker_is_ready(self, mocked_relay):
+        """
+        Test if relay thread is started by worker before any email is enqueued
+        """
+
+        start_email_outbox_relay(sender=mock.Mock())
+
+        mocked_relay.start.assert_called_once()
@@ -0,0 +1,82 @@
+from django.template import engines
+from django.template.loader import get_template
+from django.test import SimpleTestCase
+from unittest import mock
+from emails.rendering import EmailTemplateRenderer
+
+
+class TestEmailTemplateRenderer(SimpleTestCase):
+    """
+    Class used to test EmailTemplateRenderer
+    """
+
+    def setUp(self):
+        self.renderer = EmailTemplateRenderer()
+
+    def test_render_same_as_template(self):
+        """
+        Test if precompiled templates render the same output as templates
+        loaded by django
+        """
+
+        for template_name, context in (
+            ("emails/welcome.html", {"first_name": "<John>"}),
+            ("emails/welcome.txt", {"first_name": "John"}),
+            ("emails/reset_password.html", {"reset_password_url": "http://a/?b=1&c"}),
+            ("emails/reset_password.txt", {"reset_password_url": "http://a/"}),
+        ):
+            with self.subTest(template_name=template_name):
+                self.assertEqual(
+                    self.renderer.render(template_name, context),
+                    get_template(template_name).render(context),
+                )
+
+    def test_static_nodes_are_rendered_once(self):
+        """
+        Test if text and static url nodes are merged into single text node
+        """
+
+        template = self.renderer.get_template("emails/welcome.html")
+
+        self.assertEqual(
+            [type(node).__name__ for node in template.template.nodelist],
+            ["TextNode", "VariableNode", "TextNode"],
+        )
+
+    @mock.patch("emails.rendering.get_template")
+    def test_static_output_cached(self, mocked_get_template):
+        """
+        Test if output of template without context variables is cached
+        """
+
+        mocked_get_template.return_value = engines["django"].from_string(
+            "{% load static %}<img src=\"{% static 'emails/a.png' %}\">"
+        )
+
+        output = self.renderer.render("emails/static.html", {})
+
+        self.assertEqual(output, '<img src="/static/emails/a.png">')
+        with mock.patch("emails.rendering.BackendTemplate.render") as mocked_render:
+            self.assertEqual(self.renderer.render("emails/static.html", {}), output)
+            mocked_render.assert_not_called()
+        mocked_get_template.assert_called_once_with("emails/static.html")
+
+    @mock.patch("emails.rendering.get_template", wraps=get_template)
+    def test_warmup(self, mocked_get_template):
+        """
+        Test if all email templates are compiled once
+        """
+
+        self.renderer.warmup()
+        self.renderer.render("emails/welcome.txt", {"first_name": "John"})
+
+        self.assertEqual(
+            {c.args[0] for c in mocked_get_template.call_args_list},
+            {
+                "emails/welcome.html",
+                "emails/welcome.txt",
+                "emails/reset_password.html",
+                "emails/reset_password.txt",
+            },
+        )
+        self.assertEqual(mocked_get_template.call_count, 4)
@@ -1,6 +1,15 @@
 from django.test import SimpleTestCase
 from unittest import mock
-from emails.tasks import EmailSender
+from celery.exceptions import Retry
+from django.conf import settings
+from emails.tasks import (
+    EmailSender,
+    email_sender,
+    bulk_email_sender,
+    bulk_email_chunk_sender,
+)
+from src import CELERY_APP, REDIS
+import smtplib
 
 
 class TestEmailSender(SimpleTestCase):
@@ -36,6 +45,123 @@ class TestEmailSender(SimpleTestCase):
         mocked_update_message_content.assert_called_once()
         mocked_send_message.assert_called_once()
 
+    @mock.patch("emails.tasks.EmailSender.build_message")
+    @mock.patch("emails.tasks.EmailSender._EmailSender__send_message")
+    def test_run_method_idempotent(self, mocked_send_message, mocked_build_message):
+        """
+        Test if task delivered more than once with the same id (idempotency
+        key) sends email once
+        """
+
+        REDIS.delete("email_sent:idempotency_key")
+        self.email_sender.push_request(id="idempotency_key")
+        try:
+            for _ in range(2):
+                self.email_sender.run(
+                    email_subject="email_subject",
+                    email_to="email_to",
+                    email_plaintext="email_plaintext",
+                )
+        finally:
+            self.email_sender.pop_request()
+
+        mocked_send_message.assert_called_once()
+
+    @mock.patch("emails.tasks.smtp_circuit_breaker")
+    @mock.patch("emails.tasks.EmailSender.retry", side_effect=Retry)
+    @mock.patch("emails.tasks.EmailSender.build_message")
+    @mock.patch("emails.tasks.EmailSender._EmailSender__send_message")
+    def test_run_method_retried(
+        self, mocked_send_message, mocked_build_message, mocked_retry, mocked_breaker
+    ):
+        """
+        Test if email is retried with backoff after transient error and
+        failure is recorded by circuit breaker
+        """
+
+        error = smtplib.SMTPServerDisconnected()
+        mocked_send_message.side_effect = error
+        mocked_breaker.get_wait.return_value = None
+
+        with self.assertRaises(Retry):
+            self.email_sender.run(
+                email_subject="email_subject",
+                email_to="email_to",
+                email_plaintext="email_plaintext",
+            )
+
+        mocked_breaker.record_failure.assert_called_once()
+        self.assertEqual(mocked_retry.call_args.kwargs["exc"], error)
+        self.assertLessEqual(
+            mocked_retry.call_args.kwargs["countdown"], settings.EMAIL_RETRY_BACKOFF
+        )
+
+    @mock.patch("emails.tasks.smtp_circuit_breaker")
+    @mock.patch("emails.tasks.EmailSender.retry", side_effect=Retry)
+    @mock.patch("emails.tasks.EmailSender.build_message")
+    @mock.patch("emails.tasks.EmailSender._EmailSender__send_message")
+    def test_run_method_permanent_error(
+        self, mocked_send_message, mocked_build_message, mocked_retry, mocked_breaker
+    ):
+        """
+        Test if email isn't retried after permanent error
+        """
+
+        mocked_send_message.side_effect = smtplib.SMTPRecipientsRefused(
+            {"email_to": (550, b"mailbox unavailable")}
+        )
+        mocked_breaker.get_wait.return_value = None
+
+        with self.assertRaises(smtplib.SMTPRecipientsRefused):
+            self.email_sender.run(
+                email_subject="email_subject",
+                email_to="email_to",
+                email_plaintext="email_plaintext",
+            )
+
+        mocked_retry.assert_not_called()
+        mocked_breaker.record_failure.assert_not_called()
+
+    @mock.patch("emails.tasks.smtp_circuit_breaker")
+    @mock.patch("emails.tasks.EmailSender.retry", side_effect=Retry)
+    @mock.patch("emails.tasks.EmailSender._EmailSender__send_message")
+    def test_run_method_parked(self, mocked_send_message, mocked_retry, mocked_breaker):
+        """
+        Test if email is parked (retried later) when circuit is open
+        """
+
+        mocked_breaker.get_wait.return_value = 10
+
+        with self.assertRaises(Retry):
+            self.email_sender.run(
+                email_subject="email_subject",
+                email_to="email_to",
+                email_plaintext="email_plaintext",
+            )
+
+        mocked_send_message.assert_not_called()
+        self.assertGreaterEqual(mocked_retry.call_args.kwargs["countdown"], 10)
+        self.assertIsNone(mocked_retry.call_args.kwargs["max_retries"])
+
+    def test_get_backoff(self):
+        """
+        Test if backoff grows exponentially up to max backoff
+        """
+
+        for retries, max_backoff in (
+            (0, settings.EMAIL_RETRY_BACKOFF),
+            (3, settings.EMAIL_RETRY_BACKOFF * 8),
+            (100, settings.EMAIL_RETRY_BACKOFF_MAX),
+        ):
+            self.email_sender.push_request(retries=retries)
+            try:
+                backoff = self.email_sender.get_backoff()
+            finally:
+                self.email_sender.pop_request()
+
+            self.assertGreaterEqual(backoff, 0)
+            self.assertLessEqual(backoff, max_backoff)
+
     @mock.patch("emails.tasks.logging.error")
     def test_on_failure_method(self, mocked_logging_error):
         """
@@ -47,21 +173,14 @@ class TestEmailSender(SimpleTestCase):
         )
         mocked_logging_error.assert_called_once()
 
-    def __get_mocked_render(self, return_value):
-        """Return mocked get_template().render()"""
-
-        return mock.MagicMock(render=mock.MagicMock(return_value=return_value))
-
-    @mock.patch("emails.tasks.get_template")
-    def test_update_message_content_without_plain_text(self, mocked_get_template):
+    @mock.patch("emails.tasks.email_renderer.render")
+    def test_update_message_content_without_plain_text(self, mocked_render):
         """
         Test if context added through attach_alternative method
         """
 
         contents = [["folder/template.html", "text/html"]]
-        mocked_get_template.return_value = self.__get_mocked_render(
-            return_value="some_content"
-        )
+        mocked_render.return_value = "some_content"
         MockedMessage = mock.Mock()
         self.email_sender._EmailSender__update_message_content(
             message=MockedMessage, contents=contents
@@ -72,16 +191,14 @@ class TestEmailSender(SimpleTestCase):
             "some_content", "text/html"
         )
 
-    @mock.patch("emails.tasks.get_template")
-    def test_update_message_content_with_plain_text(self, mocked_get_template):
+    @mock.patch("emails.tasks.email_renderer.render")
+    def test_update_message_content_with_plain_text(self, mocked_render):
         """
         Test if message body set to content
         """
 
         contents = [["folder/template.txt", "text/plain"]]
-        mocked_get_template.return_value = self.__get_mocked_render(
-            return_value="some_content"
-        )
+        mocked_render.return_value = "some_content"
         MockedMessage = mock.Mock()
         self.email_sender._EmailSender__update_message_content(
             message=MockedMessage, contents=contents
@@ -89,6 +206,7 @@ class TestEmailSender(SimpleTestCase):
 
         self.assertEqual(MockedMessage.attach_alternative.call_count, 0)
         self.assertEqual(MockedMessage.body, "some_content")
+        mocked_render.assert_called_once_with("folder/template.txt", {})
 
     def test_get_contents(self):
         """
@@ -106,11 +224,42 @@ class TestEmailSender(SimpleTestCase):
             ],
         )
 
-    def test_send_message(self):
+    @mock.patch("emails.tasks.email_batcher")
+    def test_send_message(self, mocked_email_batcher):
         """
-        Test if message.send is called
+        Test if message is sent in batch
         """
 
         MockedMessage = mock.Mock()
         self.email_sender._EmailSender__send_message(message=MockedMessage)
-        MockedMessage.send.assert_called_once()
+        mocked_email_batcher.send.assert_called_once_with(MockedMessage)
+
+    def test_tasks_routed_to_low_priority_queue(self):
+        """
+        Test if email tasks without queue given are routed to low
+        priority queue and don't store results
+        """
+
+        for task in (email_sender, bulk_email_sender, bulk_email_chunk_sender):
+            with self.subTest(task=task.name):
+                route = CELERY_APP.amqp.router.route({"queue": None}, task.name)
+                self.assertEqual(
+                    route["queue"].name, settings.EMAIL_LOW_PRIORITY_QUEUE
+                )
+                self.assertTrue(task.ignore_result)
+
+    def test_email_queues_consumed_by_default_worker(self):
+        """
+        Test if email queues are declared (consumed by worker started
+        without -Q), each bound with its own routing key
+        """
+
+        queues = CELERY_APP.amqp.queues
+        for name in (
+            CELERY_APP.conf.task_default_queue,
+            settings.EMAIL_HIGH_PRIORITY_QUEUE,
+            settings.EMAIL_LOW_PRIORITY_QUEUE,
+        ):
+            with self.subTest(queue=name):
+                self.assertIn(name, queues)
+                self.assertEqual(queues[name].routing_key, name)
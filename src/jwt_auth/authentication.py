@@ -0,0 +1,104 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from src import REDIS
+from typing import Union
+import json
+
+
+class UserCache:
+    """
+    Class used to cache users in redis for short time, so authenticated
+    requests don't need to query database. Password isn't cached (it is
+    loaded from database when accessed)
+    """
+
+    key_prefix = "jwt_user:"
+
+    @property
+    def __fields(self) -> list:
+        return [
+            field
+            for field in get_user_model()._meta.concrete_fields
+            if field.attname != "password"
+        ]
+
+    def get_key(self, user_id: str) -> str:
+        """Return redis key of cached user"""
+
+        return f"{self.key_prefix}{user_id}"
+
+    def get(self, user_id: str) -> Union[get_user_model(), None]:
+        """Return cached user or None"""
+
+        if (data := REDIS.get(self.get_key(user_id))) is None:
+            return None
+
+        data = json.loads(data)
+        fields = self.__fields
+        return get_user_model().from_db(
+            "default",
+            [field.attname for field in fields],
+            [field.to_python(data[field.attname]) for field in fields],
+        )
+
+    def set(self, user: get_user_model()) -> None:
+        """Cache user for JWT_USER_CACHE_TIMEOUT seconds"""
+
+        data = {field.attname: field.value_from_object(user) for field in self.__fields}
+        REDIS.set(
+            self.get_key(user.pk),
+            json.dumps(data, default=str),
+            ex=settings.JWT_USER_CACHE_TIMEOUT,
+        )
+
+    def delete(self, user_id: str) -> None:
+        """Remove user from cache (e.g. when it was updated)"""
+
+        REDIS.delete(self.get_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves users from UserCache and queries
+    database only on cache miss. Cached users are invalidated by user
+    post_save and post_delete handlers
+    """
+
+    user_cache = UserCache()
+
+    def get_user(self, validated_token: Token) -> get_user_model():
+        """
+        Return user with id from given validated token
+        """
+
+        # password is needed to check if token was revoked
+        if getattr(api_settings, "CHECK_REVOKE_TOKEN", False):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if (user := self.user_cache.get(user_id)) is None:
+            try:
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+            self.user_cache.set(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+
+user_cache = CachedJWTAuthentication.user_cache
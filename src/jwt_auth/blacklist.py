@@ -0,0 +1,71 @@
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from src import REDIS
+import time
+
+
+class TokenBlacklist:
+    """
+    Class used to revoke JWT tokens using redis. Single tokens are
+    blacklisted by jti until they expire, all user tokens are revoked
+    by storing timestamp before which issued tokens aren't valid.
+    Both are checked with single MGET call. Watermark is compared with
+    issue time claim with sub-second precision, so tokens issued in the
+    same second after revocation stay valid
+    """
+
+    token_key_prefix = "blacklisted_token:"
+    user_key_prefix = "user_tokens_valid_after:"
+    # claim with issue timestamp (with microseconds, iat has seconds)
+    issued_at_claim = "iat_precise"
+
+    def get_token_key(self, jti: str) -> str:
+        """Return redis key of blacklisted token"""
+
+        return f"{self.token_key_prefix}{jti}"
+
+    def get_user_key(self, user_id: str) -> str:
+        """Return redis key of user tokens watermark"""
+
+        return f"{self.user_key_prefix}{user_id}"
+
+    def blacklist(self, token: Token) -> None:
+        """Blacklist token until it expires"""
+
+        REDIS.set(
+            self.get_token_key(token[api_settings.JTI_CLAIM]), 1, exat=token["exp"]
+        )
+
+    def revoke_user_tokens(self, user_id: str) -> None:
+        """
+        Revoke all tokens issued for user until now, watermark is stored
+        as long as refresh token is valid (older tokens expire anyway)
+        """
+
+        REDIS.set(
+            self.get_user_key(user_id),
+            time.time(),
+            ex=settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"],
+        )
+
+    def is_revoked(self, token: Token) -> bool:
+        """Check if token is blacklisted or was issued before watermark"""
+
+        blacklisted, valid_after = REDIS.mget(
+            self.get_token_key(token.get(api_settings.JTI_CLAIM)),
+            self.get_user_key(token.get(api_settings.USER_ID_CLAIM)),
+        )
+
+        if blacklisted is not None:
+            return True
+
+        if valid_after is None:
+            return False
+
+        # tokens issued before issue time claim was added have only iat
+        issued_at = token.get(self.issued_at_claim, token.get("iat", 0))
+        return issued_at < float(valid_after)
+
+
+token_blacklist = TokenBlacklist()
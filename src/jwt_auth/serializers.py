@@ -1,12 +1,17 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from jwt_auth.tokens import RefreshToken
 
 
-class TokenObtainPairSerializer(TokenObtainPairSerializer):
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
     """
     This serializer is used in TokenObtainPairView
     (while creating new access and refresh tokens)
     """
 
+    token_class = RefreshToken
+
     def validate(self, attrs: dict) -> dict:
         """
         Update payload with basic user data
@@ -24,3 +29,30 @@ class TokenObtainPairSerializer(TokenObtainPairSerializer):
             }
         )
         return data
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    This serializer is used in TokenRefreshView, revoked
+    refresh tokens are rejected
+    """
+
+    token_class = RefreshToken
+
+
+class TokenBlacklistSerializer(serializers.Serializer):
+    """
+    This serializer is used to blacklist refresh token (logout)
+    """
+
+    token_class = RefreshToken
+    # fields
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs: dict) -> dict:
+        try:
+            self.token_class(attrs["refresh"]).blacklist()
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        return {}
@@ -4,11 +4,18 @@ from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework_simplejwt.tokens import AccessToken
 from django.urls import reverse
+from jwt_auth.authentication import user_cache
+from jwt_auth.blacklist import token_blacklist
+from jwt_auth.tokens import RefreshToken
+from src import REDIS
 
 
 class TestTokenVerifyView(TestCase):
     """Test TokenVerifyView"""
 
+    def tearDown(self):
+        user_cache.delete(self.user.pk)
+
     def setUp(self):
         self.user = get_user_model().objects.create_user(
             email="test@example.com", password="password123"
@@ -29,6 +36,28 @@ class TestTokenVerifyView(TestCase):
         res = self.client.get(reverse("jwt_auth:token_verify"))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_user_is_cached(self):
+        """expect to query user only once"""
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.client.get(reverse("jwt_auth:token_verify"))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(reverse("jwt_auth:token_verify"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_with_deactivated_user(self):
+        """expect to return 401 after cached user is deactivated"""
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.client.get(reverse("jwt_auth:token_verify"))
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(reverse("jwt_auth:token_verify"))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
 
 class TestRegisterView(TestCase):
     def setUp(self):
@@ -68,3 +97,63 @@ class TestRegisterView(TestCase):
             self.valid_register_data,
         )
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+
+class TestTokenRevocation(TestCase):
+    """Test TokenBlacklistView and RevokeTokensView"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="password123"
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+
+    def tearDown(self):
+        REDIS.delete(token_blacklist.get_user_key(self.user.pk))
+
+    def refresh_token(self):
+        return self.client.post(
+            reverse("jwt_auth:token_refresh"), data={"refresh": str(self.refresh)}
+        )
+
+    def test_blacklisted_refresh_token(self):
+        """expect refresh token to be rejected after blacklisting"""
+
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_200_OK)
+
+        res = self.client.post(
+            reverse("jwt_auth:token_blacklist"), data={"refresh": str(self.refresh)}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_all_user_tokens(self):
+        """expect access and refresh tokens issued before to be rejected"""
+
+        access = self.refresh.access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        res = self.client.post(reverse("jwt_auth:token_revoke"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(reverse("jwt_auth:token_verify"))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_issued_after_revocation_are_valid(self):
+        """expect tokens issued right after revocation (same second) to be valid"""
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}"
+        )
+        res = self.client.post(reverse("jwt_auth:token_revoke"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}"
+        )
+        res = self.client.get(reverse("jwt_auth:token_verify"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh_token().status_code, status.HTTP_200_OK)
@@ -0,0 +1,46 @@
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from django.utils.translation import gettext_lazy as _
+from jwt_auth.blacklist import token_blacklist
+from datetime import datetime
+from typing import Optional
+
+
+class RedisBlacklistMixin:
+    """
+    Mixin for token classes that checks if token wasn't revoked
+    (blacklisted or issued before user tokens were revoked)
+    """
+
+    def set_iat(self, claim: str = "iat", at_time: Optional[datetime] = None) -> None:
+        """Set issue time, also with sub-second precision (see TokenBlacklist)"""
+
+        super().set_iat(claim, at_time)
+        if claim == "iat":
+            self.payload[token_blacklist.issued_at_claim] = (
+                at_time or self.current_time
+            ).timestamp()
+
+    def verify(self) -> None:
+        super().verify()
+
+        if token_blacklist.is_revoked(self):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self) -> None:
+        """Blacklist token until it expires"""
+
+        token_blacklist.blacklist(self)
+
+
+class AccessToken(RedisBlacklistMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(RedisBlacklistMixin, tokens.RefreshToken):
+    access_token_class = AccessToken
+    # access token gets its own issue time
+    no_copy_claims = (
+        *tokens.RefreshToken.no_copy_claims,
+        token_blacklist.issued_at_claim,
+    )
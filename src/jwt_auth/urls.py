@@ -6,6 +6,8 @@ from rest_framework_simplejwt.views import (
 from jwt_auth.views import (
     TokenVerifyView,
     RegisterView,
+    TokenBlacklistView,
+    RevokeTokensView,
 )
 
 app_name = "jwt_auth"
@@ -14,4 +16,6 @@ urlpatterns = [
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
+    path("token/blacklist/", TokenBlacklistView.as_view(), name="token_blacklist"),
+    path("token/revoke/", RevokeTokensView.as_view(), name="token_revoke"),
 ]
@@ -4,7 +4,9 @@ from users.serializers import UserSerializer
 from jwt_auth.permissions import IsNotAuthenticated
 from django.contrib.auth import get_user_model
 from django.http import HttpRequest
-from rest_framework_simplejwt.tokens import RefreshToken
+from jwt_auth.tokens import RefreshToken
+from jwt_auth.serializers import TokenBlacklistSerializer
+from jwt_auth.blacklist import token_blacklist
 
 
 class TokenVerifyView(generics.GenericAPIView):
@@ -64,3 +66,31 @@ class RegisterView(generics.CreateAPIView):
     def get_token(cls, user: get_user_model()) -> RefreshToken:
         """Create and return refresh, access token"""
         return cls.token_class.for_user(user)
+
+
+class TokenBlacklistView(generics.GenericAPIView):
+    """
+    This View is used to blacklist refresh token (logout),
+    token can't be used to refresh access token anymore
+    """
+
+    serializer_class = TokenBlacklistSerializer
+    permission_classes = (permissions.AllowAny,)
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(data={}, status=status.HTTP_200_OK)
+
+
+class RevokeTokensView(generics.GenericAPIView):
+    """
+    This View is used to revoke all access and refresh tokens
+    of request.user issued until now (logout everywhere)
+    """
+
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> Response:
+        token_blacklist.revoke_user_tokens(request.user.pk)
+        return Response(data={}, status=status.HTTP_200_OK)
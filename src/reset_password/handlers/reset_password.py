@@ -3,7 +3,8 @@ from django.dispatch import receiver
 from django.conf import settings
 from reset_password.views import RequestResetPasswordView
 from reset_password.serializers import RequestResetPasswordSerializer
-from emails.tasks import email_sender
+from emails.outbox import enqueue_email
+from src import REDIS
 
 
 @receiver(request_password_reset, sender=RequestResetPasswordView)
@@ -12,12 +13,27 @@ def request_password_reset_handler(
     serializer: RequestResetPasswordSerializer,
     **kwargs,
 ) -> None:
-    """handler reset password request by sending reset password email"""
+    """
+    handler reset password request by sending reset password email,
+    identical requests sent within RESET_PASSWORD_REQUEST_DEDUP_TIME
+    seconds are ignored
+    """
+
+    email = serializer.validated_data["email"]
+    if not REDIS.set(
+        f"reset_password_request:{email.lower()}",
+        1,
+        nx=True,
+        ex=settings.RESET_PASSWORD_REQUEST_DEDUP_TIME,
+    ):
+        return
 
     token = serializer.generate_token()
 
-    # send reset password email
-    email_sender.delay(
+    # send reset password email (users wait for it, so through
+    # high priority queue)
+    enqueue_email(
+        queue=settings.EMAIL_HIGH_PRIORITY_QUEUE,
         email_subject="Reset Your Password",
         email_to=serializer.validated_data["email"],
         email_plaintext="emails/reset_password.txt",
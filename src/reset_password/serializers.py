@@ -17,9 +17,14 @@ class RequestResetPasswordSerializer(serializers.Serializer):
     token = serializers.CharField(required=False)
 
     def validate_email(self, value: str) -> str:
-        """Check if user with provided email exists"""
+        """
+        Check if user with provided email exists, user is stored in
+        serializer, so it is fetched only once per request
+        """
 
-        if not self.__check_user_exists(email=value):
+        try:
+            self.user = self.__get_user(email=value)
+        except get_user_model().DoesNotExist:
             raise serializers.ValidationError(
                 f"User with email '{value}' does not exists"
             )
@@ -34,9 +39,7 @@ class RequestResetPasswordSerializer(serializers.Serializer):
         if value == "":
             return value
 
-        try:
-            user = self.__get_user(email=self.initial_data["email"])
-        except get_user_model().DoesNotExist:
+        if (user := getattr(self, "user", None)) is None:
             """Validation error will be raised in validate_email method"""
             return ""
 
@@ -68,14 +71,8 @@ class RequestResetPasswordSerializer(serializers.Serializer):
             msg = "Before generating token, validate data"
             raise AssertionError(msg)
 
-        user = self.__get_user(email=self.validated_data["email"])
         token_generator = self.get_password_token_generator()
-        return token_generator.make_token(user=user)
-
-    def __check_user_exists(self, **kwargs) -> bool:
-        """Check if user with given kwargs exists, Used for mocking in tests"""
-
-        return get_user_model().objects.filter(**kwargs).exists()
+        return token_generator.make_token(user=self.user)
 
     def __get_user(self, **kwargs) -> get_user_model():
         """Return user instance matching given kwargs, Used for mocking in tests"""
@@ -2,6 +2,7 @@ from django.test import SimpleTestCase
 from django.conf import settings
 from unittest import mock
 from reset_password.handlers import request_password_reset_handler
+from src import REDIS
 
 
 class TestRequestPasswordResetHandler(SimpleTestCase):
@@ -11,25 +12,39 @@ class TestRequestPasswordResetHandler(SimpleTestCase):
 
     def setUp(self):
         self.handler_func = request_password_reset_handler
+        REDIS.delete("reset_password_request:someemail@gmail.com")
 
-    @mock.patch("reset_password.handlers.reset_password.email_sender")
-    def test_if_email_sender_called(self, mocked_email_sender):
-        """Test if email_sender.delay is called with expected arguments"""
+    @mock.patch("reset_password.handlers.reset_password.enqueue_email")
+    def test_if_email_enqueued(self, mocked_enqueue_email):
+        """Test if email is enqueued with expected arguments"""
 
         mocked_serializer = mock.MagicMock()
         mocked_serializer.generate_token.return_value = "some_token"
         mocked_serializer.validated_data = {"email": "someemail@gmail.com"}
         self.handler_func(sender=mock.Mock(), serializer=mocked_serializer)
 
-        # test if send email_sender task was called
-        mocked_email_sender.delay.assert_called_once()
-        args, kwargs = mocked_email_sender.delay.call_args
+        # test if email was written to outbox
+        mocked_enqueue_email.assert_called_once()
+        args, kwargs = mocked_enqueue_email.call_args
 
-        # test email_sender task call arguments
+        # test email task arguments
         self.assertEqual(kwargs["email_to"], mocked_serializer.validated_data["email"])
+        self.assertEqual(kwargs["queue"], settings.EMAIL_HIGH_PRIORITY_QUEUE)
         self.assertEqual(
             kwargs["reset_password_url"],
             settings.RESET_PASSWORD_URL(
                 token="some_token", email="someemail@gmail.com"
             ),
         )
+
+    @mock.patch("reset_password.handlers.reset_password.enqueue_email")
+    def test_duplicated_requests_send_one_email(self, mocked_enqueue_email):
+        """Test if email is enqueued once for identical requests"""
+
+        mocked_serializer = mock.MagicMock()
+        mocked_serializer.validated_data = {"email": "someemail@gmail.com"}
+        for _ in range(3):
+            self.handler_func(sender=mock.Mock(), serializer=mocked_serializer)
+
+        mocked_enqueue_email.assert_called_once()
+        mocked_serializer.generate_token.assert_called_once()
@@ -2,6 +2,7 @@ from django.test import SimpleTestCase
 from unittest import mock
 from reset_password import serializers as reset_pwd_serializers
 from rest_framework import serializers
+from django.contrib.auth import get_user_model
 
 
 class TestRequestPasswordSerializer(SimpleTestCase):
@@ -11,8 +12,8 @@ class TestRequestPasswordSerializer(SimpleTestCase):
         self.serializer_class = reset_pwd_serializers.RequestResetPasswordSerializer
 
     @mock.patch(
-        "reset_password.serializers.RequestResetPasswordSerializer._RequestResetPasswordSerializer__check_user_exists",  # noqa
-        return_value=False,
+        "reset_password.serializers.RequestResetPasswordSerializer._RequestResetPasswordSerializer__get_user",  # noqa
+        side_effect=get_user_model().DoesNotExist,
     )
     def test_is_valid_with_invalid_email(self, *mocks):
         """Expected to return ValidationError"""
@@ -23,15 +24,16 @@ class TestRequestPasswordSerializer(SimpleTestCase):
             serializer.is_valid(raise_exception=True)
 
     @mock.patch(
-        "reset_password.serializers.RequestResetPasswordSerializer._RequestResetPasswordSerializer__check_user_exists",  # noqa
-        return_value=True,
+        "reset_password.serializers.RequestResetPasswordSerializer._RequestResetPasswordSerializer__get_user",  # noqa
     )
-    def test_is_valid_with_valid_email(self, *mocks):
-        """Expect to return email value"""
+    def test_is_valid_with_valid_email(self, mocked_get_user):
+        """Expect to return email value and store user"""
 
         serializer = self.serializer_class(data={"email": "valid@email.com"})
         serializer.is_valid(raise_exception=True)
         self.assertEqual(serializer.validated_data["email"], "valid@email.com")
+        self.assertEqual(serializer.user, mocked_get_user.return_value)
+        mocked_get_user.assert_called_once_with(email="valid@email.com")
 
     @mock.patch(
         "reset_password.serializers.RequestResetPasswordSerializer._RequestResetPasswordSerializer__get_user",  # noqa
@@ -51,6 +53,7 @@ class TestRequestPasswordSerializer(SimpleTestCase):
         serializer = self.serializer_class(
             data={"email": "valid@email.com", "token": "invalid_token"}
         )
+        serializer.user = mock.MagicMock()
 
         with self.assertRaises(serializers.ValidationError):
             serializer.validate_token(value="invalid_token")
@@ -73,6 +76,7 @@ class TestRequestPasswordSerializer(SimpleTestCase):
         serializer = self.serializer_class(
             data={"email": "valid@email.com", "token": "valid_token"}
         )
+        serializer.user = mock.MagicMock()
         serializer.validate_token(value="valid_token")
 
     def test_generate_token_without_previously_called_is_valid(self):
@@ -96,6 +100,7 @@ class TestRequestPasswordSerializer(SimpleTestCase):
 
         serializer = self.serializer_class(data={"email": "valid@email.com"})
         setattr(serializer, "_validated_data", {"email": "valid@email.com"})
+        serializer.user = mock.MagicMock()
         mocked_make_token.return_value = "some_token"
         token = serializer.generate_token()
 
@@ -98,6 +98,25 @@ class TestConfirmResetPasswordView(TestCase):
         self.user.refresh_from_db()
         self.assertTrue(self.user.check_password(data["password"]))
 
+    @mock.patch("reset_password.serializers.PasswordResetTokenGenerator.check_token")
+    def test_user_is_fetched_once(self, patched_check_token):
+        """Test if user fetched while validating token is used to set password"""
+
+        patched_check_token.return_value = True
+        data = {
+            "token": "some_token",
+            "email": self.user.email,
+            "password": "newpassword123",
+        }
+        # select user and update user
+        with self.assertNumQueries(2):
+            r = self.client.patch(
+                reverse("reset_password:reset_password_confirm"),
+                data=data,
+            )
+
+        self.assertEqual(r.status_code, 200)
+
     @mock.patch(
         "reset_password.views.ConfirmResetPasswordView.validate_reset_password_token",
         side_effect=[serializers.ValidationError],
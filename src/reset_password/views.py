@@ -64,7 +64,13 @@ class ConfirmResetPasswordView(generics.UpdateAPIView):
         return self.token_serializer_class(**kwargs)
 
     def get_object(self) -> get_user_model():
-        """Return user with specified email"""
+        """
+        Return user with specified email (user fetched while
+        validating token is reused)
+        """
+
+        if (user := getattr(self, "reset_password_user", None)) is not None:
+            return user
 
         return get_object_or_404(get_user_model(), email=self.request.data["email"])
 
@@ -73,13 +79,18 @@ class ConfirmResetPasswordView(generics.UpdateAPIView):
 
         serializer = self.get_token_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        self.reset_password_user = serializer.user
 
     def set_new_password(self, request) -> users_serializers.UserSerializer:
         """Set new user password"""
 
         instance = self.get_object()
+        # only password is updated (email is used to find user, so
+        # validating its uniqueness would need another query)
         serializer = self.get_user_serializer(
-            instance=instance, data=request.data, partial=True
+            instance=instance,
+            data={"password": request.data.get("password")},
+            partial=True,
         )
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
@@ -11,6 +11,8 @@ app = Celery(
 app.config_from_object("django.conf:settings", namespace="CELERY")
 # load all tasks
 app.autodiscover_tasks()
+# record task metrics (celery signals handlers)
+import src.celery_metrics  # noqa
 
 
 @app.task(bind=True)
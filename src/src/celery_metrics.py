@@ -0,0 +1,236 @@
+from celery.signals import (
+    before_task_publish,
+    task_prerun,
+    task_postrun,
+    worker_init,
+    worker_ready,
+)
+from django.conf import settings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.redis import REDIS
+from collections import defaultdict
+from datetime import datetime
+import bisect
+import logging
+import redis
+import socket
+import threading
+import time
+
+
+class CeleryMetrics:
+    """
+    Class used to record celery task metrics: time tasks wait in broker
+    (from publish or eta to start), execution time and number of tasks
+    by outcome (state), per task name. Metrics are stored in redis per
+    worker, so metrics of all pool processes are exposed by worker main
+    process in prometheus text format, together with sampled length of
+    queues consumed by worker
+    """
+
+    key_prefix = "celery_metrics:"
+    # histogram buckets (in seconds)
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+    def __init__(self) -> None:
+        # worker node name, set on worker start (inherited by pool processes)
+        self.hostname = None
+        self.queue_lengths = {}
+        self.__started = {}
+
+    def get_key(self) -> str:
+        """Return redis key of worker metrics"""
+
+        return f"{self.key_prefix}{self.hostname or socket.gethostname()}"
+
+    def task_published(self, headers: dict) -> None:
+        """Add publish time to task message headers"""
+
+        headers.setdefault("enqueued_at", time.time())
+
+    def task_started(self, task_id: str, request) -> None:
+        """Remember task start, compute time task waited in broker"""
+
+        wait = None
+        if (enqueued_at := getattr(request, "enqueued_at", None)) is not None:
+            # task with eta (e.g. retry with countdown) waits from eta
+            if request.eta:
+                enqueued_at = max(
+                    enqueued_at, datetime.fromisoformat(request.eta).timestamp()
+                )
+            wait = max(0.0, time.time() - enqueued_at)
+
+        self.__started[task_id] = (time.perf_counter(), wait)
+
+    def task_finished(self, task_id: str, task_name: str, state: str) -> None:
+        """Store metrics of finished task"""
+
+        if (started := self.__started.pop(task_id, None)) is None:
+            return
+
+        started_at, wait = started
+        key = self.get_key()
+        try:
+            with REDIS.pipeline(transaction=False) as pipe:
+                if wait is not None:
+                    self.__observe(pipe, key, "wait", task_name, wait)
+                self.__observe(
+                    pipe, key, "runtime", task_name, time.perf_counter() - started_at
+                )
+                pipe.hincrby(key, f"tasks|{task_name}|{state}", 1)
+                pipe.expire(key, settings.CELERY_METRICS_EXPIRE_TIME)
+                pipe.execute()
+        except redis.RedisError as e:
+            logging.error(f"Celery metrics error: {e}")
+
+    def sample_queue_lengths(self, app, queues: list[str]) -> None:
+        """Store number of messages waiting in queues"""
+
+        with app.connection_for_read() as connection:
+            channel = connection.default_channel
+            for queue in queues:
+                self.queue_lengths[queue] = channel.queue_declare(
+                    queue=queue, passive=True
+                ).message_count
+
+    def render(self) -> str:
+        """Return metrics of worker in prometheus text format"""
+
+        histograms = {"wait": defaultdict(dict), "runtime": defaultdict(dict)}
+        tasks = {}
+        for field, value in REDIS.hgetall(self.get_key()).items():
+            metric, task_name, *rest = field.split("|")
+            if metric == "tasks":
+                tasks[(task_name, rest[0])] = int(value)
+            else:
+                histograms[metric][task_name]["|".join(rest)] = float(value)
+
+        lines = []
+        for metric, description in (
+            ("wait", "Time between task publish (or eta) and start"),
+            ("runtime", "Task execution time"),
+        ):
+            name = f"celery_task_{metric}_seconds"
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            for task_name, values in sorted(histograms[metric].items()):
+                cumulative = 0
+                for le in (*self.buckets, "+Inf"):
+                    cumulative += values.get(f"bucket|{le}", 0)
+                    lines.append(
+                        f'{name}_bucket{{task="{task_name}",le="{le}"}} {cumulative:g}'
+                    )
+                lines.append(f'{name}_sum{{task="{task_name}"}} {values.get("sum", 0)}')
+                lines.append(f'{name}_count{{task="{task_name}"}} {cumulative:g}')
+
+        lines += [
+            "# HELP celery_tasks_total Number of finished tasks by state",
+            "# TYPE celery_tasks_total counter",
+        ]
+        for (task_name, state), count in sorted(tasks.items()):
+            lines.append(
+                f'celery_tasks_total{{task="{task_name}",state="{state}"}} {count}'
+            )
+
+        lines += [
+            "# HELP celery_queue_length Number of messages waiting in queue",
+            "# TYPE celery_queue_length gauge",
+        ]
+        for queue, length in sorted(self.queue_lengths.items()):
+            lines.append(f'celery_queue_length{{queue="{queue}"}} {length}')
+
+        return "\n".join(lines) + "\n"
+
+    def start_server(self, app, queues: list[str], port: int) -> None:
+        """
+        Serve metrics over http and sample queue lengths in background
+        threads (of worker main process)
+        """
+
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = metrics.render().encode("utf8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("", port), MetricsHandler)
+        threading.Thread(
+            target=server.serve_forever, name="celery-metrics-server", daemon=True
+        ).start()
+        threading.Thread(
+            target=self.__sample_queues,
+            args=(app, queues),
+            name="celery-metrics-queues",
+            daemon=True,
+        ).start()
+
+    def __sample_queues(self, app, queues: list[str]) -> None:
+        while True:
+            try:
+                self.sample_queue_lengths(app, queues)
+            except Exception as e:
+                logging.error(f"Celery metrics queue sampling error: {e}")
+            time.sleep(settings.CELERY_METRICS_QUEUE_SAMPLE_INTERVAL)
+
+    def __observe(
+        self, pipe, key: str, metric: str, task_name: str, value: float
+    ) -> None:
+        """Add value to histogram (buckets are stored not cumulative)"""
+
+        index = bisect.bisect_left(self.buckets, value)
+        le = self.buckets[index] if index < len(self.buckets) else "+Inf"
+        pipe.hincrby(key, f"{metric}|{task_name}|bucket|{le}", 1)
+        pipe.hincrbyfloat(key, f"{metric}|{task_name}|sum", value)
+
+
+celery_metrics = CeleryMetrics()
+
+
+@before_task_publish.connect
+def record_task_published(headers: dict = None, **kwargs) -> None:
+    """Add publish time to headers of every published task"""
+
+    if headers is not None:
+        celery_metrics.task_published(headers)
+
+
+@task_prerun.connect
+def record_task_started(task_id: str = None, task=None, **kwargs) -> None:
+    """Record start of task executed by worker"""
+
+    celery_metrics.task_started(task_id, task.request)
+
+
+@task_postrun.connect
+def record_task_finished(
+    task_id: str = None, task=None, state: str = None, **kwargs
+) -> None:
+    """Record execution time and outcome of task executed by worker"""
+
+    celery_metrics.task_finished(task_id, task.name, state)
+
+
+@worker_init.connect
+def set_metrics_hostname(sender=None, **kwargs) -> None:
+    """Store metrics of worker under its node name"""
+
+    celery_metrics.hostname = sender.hostname
+
+
+@worker_ready.connect
+def start_metrics_server(sender=None, **kwargs) -> None:
+    """Expose metrics of worker (if CELERY_METRICS_PORT is set)"""
+
+    if settings.CELERY_METRICS_PORT:
+        celery_metrics.start_server(
+            sender.app,
+            list(sender.app.amqp.queues.consume_from or sender.app.amqp.queues),
+            settings.CELERY_METRICS_PORT,
+        )
@@ -11,8 +11,13 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
+from importlib.util import find_spec
+import django
 import os
+import copy
 from datetime import timedelta
+from kombu import Queue
 
 # Used when creating test environment variables
 import environ
@@ -63,6 +68,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.DatabaseMetricsMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -99,15 +106,67 @@ WSGI_APPLICATION = "src.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        # postgresql backend which records connection metrics
+        "ENGINE": "core.db.backends.postgresql",
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASS"),
         "HOST": os.environ.get("DB_HOST"),
         "PORT": os.environ.get("DATABASE_PORT"),
+        # Define how long (in seconds) connection is reused between
+        # requests, 0 closes connection at the end of each request
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        # check if reused connection is still usable before using it
+        "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+        "OPTIONS": {},
     }
 }
 
+# Use psycopg (version 3) connection pool instead of persistent
+# connections (recommended for ASGI deployments, where persistent
+# connections can't be reused between requests).
+# Requires Django >= 5.1 and "psycopg[pool]" package (not installed
+# from requirements.txt, which uses psycopg2), checked at startup
+if os.environ.get("DB_POOL") == "1":
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured("DB_POOL requires Django >= 5.1")
+    if not (find_spec("psycopg") and find_spec("psycopg_pool")):
+        raise ImproperlyConfigured(
+            'DB_POOL requires psycopg 3 with pool, install "psycopg[pool]" package'
+        )
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+        "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 10)),
+    }
+
+# Define read replicas hosts (comma separated). Read queries of safe
+# requests are sent to replicas by core.routers.PrimaryReplicaRouter
+for i, host in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(","))
+):
+    DATABASES[f"replica_{i}"] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+
+# Define time (in seconds) for which client that wrote to database
+# reads only from primary database (should be longer than replication lag)
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+REPLICA_STICKY_COOKIE_NAME = "use_primary_db"
+# frontend is served from another origin, so cookie must be sent
+# with cross site requests
+REPLICA_STICKY_COOKIE_SAMESITE = os.environ.get(
+    "REPLICA_STICKY_COOKIE_SAMESITE", "None"
+)
+
+# Return database connection metrics in Server-Timing response header
+DB_METRICS_SERVER_TIMING = os.environ.get("DB_METRICS_SERVER_TIMING") == "1"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -156,17 +215,26 @@ AUTH_USER_MODEL = "core.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "jwt_auth.authentication.CachedJWTAuthentication",
     ),
+    # throttles store request rates in redis (shared by all workers)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'core.throttling.AnonBurstRateThrottle',
+        'core.throttling.AnonSustainedRateThrottle',
+        'core.throttling.UserBurstRateThrottle',
+        'core.throttling.UserSustainedRateThrottle',
+        'core.throttling.ScopedRateThrottle',
+        'core.throttling.AnonScopedRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '5000/day',
-        'anon': '60/minute',
-        'user': '5000/day',
-        'user': '60/minute',
+        'anon_burst': '60/minute',
+        'anon_sustained': '5000/day',
+        'user_burst': '60/minute',
+        'user_sustained': '5000/day',
+        # creating temporary codespaces by anonymous users
+        'anon_create_codespace': '10/minute',
+        # retrieving codespaces with share links
+        'share_link': '120/minute',
     }
 }
 
@@ -174,14 +242,69 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=10),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=10),
     "TOKEN_OBTAIN_SERIALIZER": "jwt_auth.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "jwt_auth.serializers.TokenRefreshSerializer",
+    # tokens are checked against blacklist stored in redis
+    "AUTH_TOKEN_CLASSES": ("jwt_auth.tokens.AccessToken",),
     "USER_ID_FIELD": "uuid",
 }
+# Define number of threads used to hash and verify passwords in each
+# process (0 hashes passwords in request thread) and min time (in
+# seconds) between warnings logged when pool is saturated
+PASSWORD_HASHING_POOL_SIZE = int(
+    os.environ.get("PASSWORD_HASHING_POOL_SIZE", os.cpu_count() or 1)
+)
+PASSWORD_HASHING_POOL_LOG_INTERVAL = int(
+    os.environ.get("PASSWORD_HASHING_POOL_LOG_INTERVAL", 60)
+)
+# Define time (in seconds) for which users authenticated
+# with JWT are cached in redis
+JWT_USER_CACHE_TIMEOUT = int(os.environ.get("JWT_USER_CACHE_TIMEOUT", 60))
 
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND")
 CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+# Define celery queues, emails users wait for (reset password) are sent
+# through high priority queue, welcome and bulk emails through low
+# priority queue. Worker started without -Q consumes all queues, in
+# production queues should be consumed by separate workers, so reset
+# emails don't wait behind prefetched low priority ones, e.g.
+# celery -A src worker -Q emails_high --prefetch-multiplier=1
+# celery -A src worker -Q celery,emails_low --prefetch-multiplier=16
+EMAIL_HIGH_PRIORITY_QUEUE = os.environ.get("EMAIL_HIGH_PRIORITY_QUEUE", "emails_high")
+EMAIL_LOW_PRIORITY_QUEUE = os.environ.get("EMAIL_LOW_PRIORITY_QUEUE", "emails_low")
+CELERY_TASK_DEFAULT_QUEUE = "celery"
+CELERY_TASK_QUEUES = [
+    Queue(queue, routing_key=queue)
+    for queue in (
+        CELERY_TASK_DEFAULT_QUEUE,
+        EMAIL_HIGH_PRIORITY_QUEUE,
+        EMAIL_LOW_PRIORITY_QUEUE,
+    )
+]
+CELERY_TASK_ROUTES = {
+    "emails.tasks.EmailSender": {"queue": EMAIL_LOW_PRIORITY_QUEUE},
+    "emails.tasks.BulkEmailSender": {"queue": EMAIL_LOW_PRIORITY_QUEUE},
+    "emails.tasks.BulkEmailChunkSender": {"queue": EMAIL_LOW_PRIORITY_QUEUE},
+}
+# Define number of tasks reserved by worker process (per worker
+# default, overridden by --prefetch-multiplier of queue workers)
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(
+    os.environ.get("CELERY_WORKER_PREFETCH_MULTIPLIER", 4)
+)
+# Define port on which worker exposes task metrics in prometheus text
+# format (disabled by default, each worker running on the same host
+# needs its own port, e.g. 9808, 9809), how often (in seconds) length
+# of queues is sampled and time (in seconds) for which metrics of idle
+# worker are kept
+CELERY_METRICS_PORT = int(os.environ.get("CELERY_METRICS_PORT", 0))
+CELERY_METRICS_QUEUE_SAMPLE_INTERVAL = int(
+    os.environ.get("CELERY_METRICS_QUEUE_SAMPLE_INTERVAL", 15)
+)
+CELERY_METRICS_EXPIRE_TIME = int(
+    os.environ.get("CELERY_METRICS_EXPIRE_TIME", 60 * 60 * 24)
+)
 
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
@@ -190,6 +313,49 @@ EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = "SharePython"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
+# Define time (in seconds) after which idle SMTP connection
+# of worker process is closed
+EMAIL_CONNECTION_MAX_IDLE = int(os.environ.get("EMAIL_CONNECTION_MAX_IDLE", 60))
+# Define max number of emails sent in single batch and time (in seconds)
+# for which batch waits for emails of other tasks. Emails of concurrent
+# tasks are batched only by worker with threads pool (--pool=threads),
+# prefork process runs single task at a time, so its emails shouldn't
+# wait (0 sends emails already queued without waiting for more)
+EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", 20))
+EMAIL_BATCH_WAIT = float(os.environ.get("EMAIL_BATCH_WAIT", 0))
+# Define number of recipients of bulk email sent by single task and
+# time (in seconds) for which bulk email progress is stored in redis
+EMAIL_BULK_CHUNK_SIZE = int(os.environ.get("EMAIL_BULK_CHUNK_SIZE", 500))
+EMAIL_BULK_PROGRESS_EXPIRE_TIME = int(
+    os.environ.get("EMAIL_BULK_PROGRESS_EXPIRE_TIME", 60 * 60 * 24 * 7)
+)
+# Define max number of emails relayed from outbox to celery in single
+# transaction and time (in seconds) after which outbox relay checks
+# outbox even if it wasn't woken up by commit
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", 100))
+EMAIL_OUTBOX_RELAY_INTERVAL = int(os.environ.get("EMAIL_OUTBOX_RELAY_INTERVAL", 30))
+# Define time (in seconds) for which idempotency keys of sent
+# emails are stored in redis
+EMAIL_IDEMPOTENCY_KEY_EXPIRE_TIME = int(
+    os.environ.get("EMAIL_IDEMPOTENCY_KEY_EXPIRE_TIME", 60 * 60 * 24)
+)
+# Define timeout (in seconds) of blocking SMTP operations
+EMAIL_TIMEOUT = int(os.environ.get("EMAIL_TIMEOUT", 10))
+# Define max number of retries of failed email and base and max
+# retry backoff (in seconds)
+EMAIL_MAX_RETRIES = int(os.environ.get("EMAIL_MAX_RETRIES", 8))
+EMAIL_RETRY_BACKOFF = int(os.environ.get("EMAIL_RETRY_BACKOFF", 2))
+EMAIL_RETRY_BACKOFF_MAX = int(os.environ.get("EMAIL_RETRY_BACKOFF_MAX", 600))
+# Define number of SMTP failures after which emails aren't sent by any
+# worker (each failure within window seconds of previous one) and time
+# (in seconds) after which sending is tried again
+EMAIL_CIRCUIT_BREAKER_THRESHOLD = int(
+    os.environ.get("EMAIL_CIRCUIT_BREAKER_THRESHOLD", 5)
+)
+EMAIL_CIRCUIT_BREAKER_WINDOW = int(os.environ.get("EMAIL_CIRCUIT_BREAKER_WINDOW", 60))
+EMAIL_CIRCUIT_BREAKER_RESET_TIMEOUT = int(
+    os.environ.get("EMAIL_CIRCUIT_BREAKER_RESET_TIMEOUT", 30)
+)
 
 # Define time after which redis will clear
 # unused codespace
@@ -197,8 +363,85 @@ CODESPACE_REDIS_EXPIRE_TIME = os.environ.get("CODESPACE_REDIS_EXPIRE_TIME")
 # Define time after which redis will clear
 # unused temporary codespace
 TMP_CODESPACE_REDIS_EXPIRE_TIME = os.environ.get("CODESPACE_REDIS_EXPIRE_TIME")
+# Define how often full codespace code is stored in revision
+# history (revisions in between store only diffs)
+CODESPACE_REVISION_SNAPSHOT_INTERVAL = int(
+    os.environ.get("CODESPACE_REVISION_SNAPSHOT_INTERVAL", 20)
+)
+# Define number of last revisions kept for each codespace, older
+# revisions are deleted (0 keeps all revisions)
+CODESPACE_REVISION_MAX_COUNT = int(
+    os.environ.get("CODESPACE_REVISION_MAX_COUNT", 200)
+)
+# Define number of keys removed by single redis UNLINK
+# command when cleaning up codespaces of deleted user
+CODESPACE_REDIS_UNLINK_CHUNK_SIZE = int(
+    os.environ.get("CODESPACE_REDIS_UNLINK_CHUNK_SIZE", 500)
+)
+# Define number of codespaces above which user account
+# is deleted in background by celery worker
+USER_ASYNC_DELETE_THRESHOLD = int(os.environ.get("USER_ASYNC_DELETE_THRESHOLD", 1000))
+
+# Define keys used to encrypt codespace access tokens as
+# "id:secret" pairs separated by commas (id must be in range 0-255).
+# To rotate keys add new key, make it active and remove old key
+# when tokens created with it expire
+CODESPACE_ACCESS_TOKEN_KEYS = {
+    int(key_id): secret
+    for key_id, secret in (
+        key.split(":", 1)
+        for key in os.environ.get("CODESPACE_ACCESS_TOKEN_KEYS", "").split(",")
+        if key
+    )
+} or {0: SECRET_KEY}
+CODESPACE_ACCESS_TOKEN_ACTIVE_KEY_ID = int(
+    os.environ.get(
+        "CODESPACE_ACCESS_TOKEN_ACTIVE_KEY_ID", max(CODESPACE_ACCESS_TOKEN_KEYS)
+    )
+)
+# Accept tokens created before keyring was introduced
+# (encrypted with SECRET_KEY and without key id)
+CODESPACE_ACCESS_TOKEN_ACCEPT_LEGACY = (
+    os.environ.get("CODESPACE_ACCESS_TOKEN_ACCEPT_LEGACY", "1") == "1"
+)
+# Define max number of decrypted access tokens cached in each process
+# and min time (in seconds) between logged cache stats (hits, misses)
+CODESPACE_ACCESS_TOKEN_CACHE_SIZE = int(
+    os.environ.get("CODESPACE_ACCESS_TOKEN_CACHE_SIZE", 10000)
+)
+CODESPACE_ACCESS_TOKEN_CACHE_LOG_INTERVAL = int(
+    os.environ.get("CODESPACE_ACCESS_TOKEN_CACHE_LOG_INTERVAL", 300)
+)
+# Define max time (in seconds) for which access token can be valid
+# (expire timestamp is stored in token as unsigned 32 bit integer)
+CODESPACE_ACCESS_TOKEN_MAX_EXPIRE_TIME = int(
+    os.environ.get("CODESPACE_ACCESS_TOKEN_MAX_EXPIRE_TIME", 10 * 365 * 24 * 3600)
+)
+# Define max number of access tokens created in single request
+CODESPACE_ACCESS_TOKEN_BATCH_MAX_SIZE = int(
+    os.environ.get("CODESPACE_ACCESS_TOKEN_BATCH_MAX_SIZE", 100)
+)
+# Keep bloom filter of revoked access tokens in each process, so
+# checking not revoked tokens doesn't need redis call
+CODESPACE_REVOCATION_BLOOM_ENABLED = (
+    os.environ.get("CODESPACE_REVOCATION_BLOOM_ENABLED", "1") == "1"
+)
+CODESPACE_REVOCATION_BLOOM_CAPACITY = int(
+    os.environ.get("CODESPACE_REVOCATION_BLOOM_CAPACITY", 100000)
+)
+CODESPACE_REVOCATION_BLOOM_ERROR_RATE = 0.001
+# Define time (in seconds) after which bloom filter is rebuilt
+# (to remove expired revocations)
+CODESPACE_REVOCATION_BLOOM_REBUILD_INTERVAL = int(
+    os.environ.get("CODESPACE_REVOCATION_BLOOM_REBUILD_INTERVAL", 3600)
+)
 
 # set reset password page base url
 RESET_PASSWORD_URL = (
     lambda token, email: f"{BASE_FRONTEND_URL}reset-password/{token}/?email={email}"
 )
+# Define time (in seconds) in which only first reset password
+# request for the same email sends email
+RESET_PASSWORD_REQUEST_DEDUP_TIME = int(
+    os.environ.get("RESET_PASSWORD_REQUEST_DEDUP_TIME", 60)
+)
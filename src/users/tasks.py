@@ -0,0 +1,29 @@
+import celery
+from django.contrib.auth import get_user_model
+from src import CELERY_APP
+
+
+class UserDeleter(celery.Task):
+    """
+    This Task is used to delete users with large number
+    of codespaces in celery worker, so request deleting
+    account can return immediately
+    """
+
+    ignore_result = True
+
+    def run(self, user_uuid: str) -> None:
+        """Delete user with given uuid (and all his codespaces)"""
+
+        try:
+            user = get_user_model().objects.get(uuid=user_uuid)
+        except get_user_model().DoesNotExist:
+            # user was already deleted
+            return
+
+        # delete instance (not queryset) so codespaces redis data
+        # is unlinked in batch by user post_delete handler
+        user.delete()
+
+
+user_deleter = CELERY_APP.register_task(UserDeleter())
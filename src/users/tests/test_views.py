@@ -1,9 +1,11 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from unittest.mock import patch
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework_simplejwt.tokens import AccessToken
+from core.models import CodeSpace
 
 
 class TestRetrieveUpdateDestroyUserView(TestCase):
@@ -26,6 +28,21 @@ class TestRetrieveUpdateDestroyUserView(TestCase):
         with self.assertRaises(get_user_model().DoesNotExist):
             get_user_model().objects.get(email="test@example.com")
 
+    @override_settings(USER_ASYNC_DELETE_THRESHOLD=1)
+    @patch("users.views.user_deleter")
+    def test_user_with_many_codespaces_deleted_in_background(self, mocked_deleter):
+        """Test if user above threshold is deactivated and deleted by task"""
+
+        CodeSpace.objects.create(created_by=self.user)
+        CodeSpace.objects.create(created_by=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.delete(reverse("users:retrieve_update_destroy_user"))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        mocked_deleter.delay.assert_called_once_with(user_uuid=str(self.user.uuid))
+
     def test_can_retrieve_user(self):
         """Test if can retrieve user data"""
 
@@ -1,6 +1,9 @@
 from rest_framework import generics, permissions
 from users.serializers import UserSerializer
+from users.tasks import user_deleter
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import transaction
 
 
 class RetrieveUpdateDestroyUserView(generics.RetrieveUpdateDestroyAPIView):
@@ -15,3 +18,22 @@ class RetrieveUpdateDestroyUserView(generics.RetrieveUpdateDestroyAPIView):
         """Return request.user"""
 
         return self.request.user
+
+    def perform_destroy(self, instance: get_user_model()) -> None:
+        """
+        Delete user instance. Users with many codespaces are deactivated
+        and deleted in background, so request returns immediately
+        """
+
+        codespaces_count = instance.created_codespaces.count()
+        if codespaces_count <= settings.USER_ASYNC_DELETE_THRESHOLD:
+            instance.delete()
+            return
+
+        # deactivate user, so account can't be used until
+        # it is deleted by celery worker
+        instance.is_active = False
+        instance.save(update_fields=["is_active"])
+
+        user_uuid = str(instance.uuid)
+        transaction.on_commit(lambda: user_deleter.delay(user_uuid=user_uuid))